@@ -0,0 +1,226 @@
+"""
+Vectorized aggregation engine for the summaries in statistics.py.
+
+Rows (a list of dicts, or a dict of column arrays) are loaded into one
+(rows x fields) float matrix, and every total is taken in a single
+``np.add.reduceat`` over that matrix. Passing ``group_by`` summarizes many
+entities at once and returns ``{entity_id: summary}``.
+
+Outputs use the same keys and rounding as calculate_player_summary,
+calculate_clutch_summary and calculate_team_stats. Final rounding is done
+with Python's ``round`` so the numbers are identical, not just close.
+"""
+from operator import itemgetter
+
+import numpy as np
+
+PLAYER_FIELDS = (
+    "points", "assists", "rebounds_total",
+    "field_goals_made", "field_goals_attempted",
+    "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted",
+)
+
+CLUTCH_FIELDS = ("points", "field_goals_made", "field_goals_attempted", "win")
+
+TEAM_FIELDS = (
+    "field_goals_made", "field_goals_attempted",
+    "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted",
+    "team_score", "win", "opponent_score",
+    "assists", "blocks", "steals", "turnovers", "rebounds_total", "fouls_personal",
+)
+
+# calculate_team_stats reads these with row.get(field, 0)
+TEAM_OPTIONAL_FIELDS = {"assists", "blocks", "steals", "turnovers", "rebounds_total", "fouls_personal"}
+
+EMPTY_PLAYER_SUMMARY = {
+    "games_played": 0,
+    "avg_points": 0,
+    "avg_assists": 0,
+    "avg_rebounds": 0,
+    "fg_percent": 0,
+    "threep_percent": 0,
+    "ft_percent": 0,
+}
+
+EMPTY_CLUTCH_SUMMARY = {
+    "average_points": 0,
+    "field_goal_percentage": 0,
+    "win_percentage": 0,
+}
+
+
+def to_matrix(data, fields, optional=()):
+    """Build a (rows x fields) float64 matrix from row dicts or column arrays."""
+    if isinstance(data, dict):
+        n = len(next(iter(data.values()))) if data else 0
+        matrix = np.empty((n, len(fields)), dtype=np.float64)
+        for j, field in enumerate(fields):
+            if field in data:
+                matrix[:, j] = data[field]
+            elif field in optional:
+                matrix[:, j] = 0
+            else:
+                raise KeyError(field)
+        return matrix
+
+    if not data:
+        return np.empty((0, len(fields)), dtype=np.float64)
+    try:
+        values = list(map(itemgetter(*fields), data))
+    except KeyError:
+        values = [
+            tuple(row.get(f, 0) if f in optional else row[f] for f in fields)
+            for row in data
+        ]
+    return np.array(values, dtype=np.float64)
+
+
+def group_totals(matrix, keys=None):
+    """
+    Sum ``matrix`` per group in one reduceat.
+
+    reduceat adds rows in order, like the built-in ``sum`` in statistics.py,
+    so float totals come out bit-for-bit the same.
+
+    Returns (group_keys, counts, totals) where totals has one row per group.
+    Without keys everything is a single group keyed ``None``.
+    """
+    n = len(matrix)
+    if keys is None:
+        if not n:
+            return [], np.zeros(0, dtype=np.int64), np.zeros((0, matrix.shape[1]))
+        return [None], np.array([n]), np.add.reduceat(matrix, [0], axis=0)
+
+    keys = np.asarray(keys)
+    if not n:
+        return [], np.zeros(0, dtype=np.int64), np.zeros((0, matrix.shape[1]))
+
+    if np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        matrix = matrix[order]
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, n))
+    totals = np.add.reduceat(matrix, starts, axis=0)
+    return keys[starts].tolist(), counts, totals
+
+
+def ratio(made, attempted):
+    """made / attempted * 100 per row, 0 where nothing was attempted."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(attempted > 0, made / np.where(attempted > 0, attempted, 1) * 100, 0.0)
+
+
+def _per_game(totals, counts):
+    return totals / counts
+
+
+def player_summaries(data, group_by=None):
+    """Vectorized calculate_player_summary, optionally grouped by ``group_by``."""
+    matrix = to_matrix(data, PLAYER_FIELDS)
+    keys = _group_keys(data, group_by)
+    summaries = player_summaries_from_totals(*group_totals(matrix, keys))
+    return _single_or_grouped(summaries, group_by, EMPTY_PLAYER_SUMMARY)
+
+
+def player_summaries_from_totals(group_keys, counts, t):
+    """Format per-group PLAYER_FIELDS totals like calculate_player_summary."""
+    points, assists, rebounds = _per_game(t[:, 0], counts), _per_game(t[:, 1], counts), _per_game(t[:, 2], counts)
+    fg = ratio(t[:, 3], t[:, 4])
+    three = ratio(t[:, 5], t[:, 6])
+    ft = ratio(t[:, 7], t[:, 8])
+
+    return {
+        key: {
+            "games_played": int(counts[i]),
+            "average_points": round(float(points[i]), 1),
+            "average_assists": round(float(assists[i]), 1),
+            "average_rebounds": round(float(rebounds[i]), 1),
+            "field_goal_percentage": _percentage(fg[i], t[i, 4]),
+            "three_point_percentage": _percentage(three[i], t[i, 6]),
+            "free_throw_percentage": _percentage(ft[i], t[i, 8]),
+        }
+        for i, key in enumerate(group_keys)
+    }
+
+
+def clutch_summaries(data, group_by=None):
+    """Vectorized calculate_clutch_summary, optionally grouped by ``group_by``."""
+    matrix = to_matrix(data, CLUTCH_FIELDS)
+    keys = _group_keys(data, group_by)
+    summaries = clutch_summaries_from_totals(*group_totals(matrix, keys))
+    return _single_or_grouped(summaries, group_by, EMPTY_CLUTCH_SUMMARY)
+
+
+def clutch_summaries_from_totals(group_keys, counts, t):
+    """Format per-group CLUTCH_FIELDS totals like calculate_clutch_summary."""
+    ppg = _per_game(t[:, 0], counts)
+    fg = ratio(t[:, 1], t[:, 2])
+    wins = _per_game(t[:, 3], counts) * 100
+
+    return {
+        key: {
+            "average_points": round(float(ppg[i]), 1),
+            "field_goal_percentage": round(round(float(fg[i]), 2), 1) if t[i, 2] > 0 else 0,
+            "win_percentage": round(round(float(wins[i]), 2), 1),
+        }
+        for i, key in enumerate(group_keys)
+    }
+
+
+def team_summaries(data, group_by=None):
+    """Vectorized calculate_team_stats, optionally grouped by ``group_by``."""
+    matrix = to_matrix(data, TEAM_FIELDS, TEAM_OPTIONAL_FIELDS)
+    keys = _group_keys(data, group_by)
+    summaries = team_summaries_from_totals(*group_totals(matrix, keys))
+    return _single_or_grouped(summaries, group_by, {})
+
+
+def team_summaries_from_totals(group_keys, counts, t):
+    """Format per-group TEAM_FIELDS totals like calculate_team_stats."""
+    fg = ratio(t[:, 0], t[:, 1])
+    three = ratio(t[:, 2], t[:, 3])
+    ft = ratio(t[:, 4], t[:, 5])
+    per_game = t[:, 6:] / counts[:, None]
+
+    summaries = {}
+    for i, key in enumerate(group_keys):
+        ppg, win_rate, opp_ppg, assists, blocks, steals, turnovers, rebounds, fouls = per_game[i].tolist()
+        summaries[key] = {
+            "field_goal_percentage": _percentage(fg[i], t[i, 1]),
+            "three_point_percentage": _percentage(three[i], t[i, 3]),
+            "free_throw_percentage": _percentage(ft[i], t[i, 5]),
+            "points_per_game": round(ppg, 1),
+            "opponent_points_per_game": round(opp_ppg, 1),
+            "win_percentage": round(win_rate * 100, 1),
+            "assists_per_game": round(assists, 1),
+            "blocks_per_game": round(blocks, 1),
+            "steals_per_game": round(steals, 1),
+            "turnovers_per_game": round(turnovers, 1),
+            "rebounds_per_game": round(rebounds, 1),
+            "personal_fouls_per_game": round(fouls, 1),
+        }
+    return summaries
+
+
+def _percentage(value, attempted):
+    return round(float(value), 1) if attempted else 0
+
+
+def _group_keys(data, group_by):
+    if group_by is None:
+        return None
+    if isinstance(group_by, str):
+        if isinstance(data, dict):
+            return data[group_by]
+        return [row[group_by] for row in data]
+    return group_by
+
+
+def _single_or_grouped(summaries, group_by, empty):
+    if group_by is None:
+        return summaries.get(None, dict(empty))
+    return summaries
@@ -0,0 +1,128 @@
+"""
+JWT auth shared by every protected endpoint.
+
+``get_current_username`` is a FastAPI dependency that verifies the bearer
+token. Verified tokens are kept in a bounded cache keyed on the token
+string until their own ``exp``, so repeat requests skip the signature check.
+``UserCache`` holds ``users`` rows for a short TTL and is invalidated by the
+endpoints that write to them.
+
+The dependencies are sync (the user lookup is a blocking Supabase call),
+so FastAPI runs them on threadpool threads. Both caches take a lock around
+every dict operation, but never while decoding a token or loading a user.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY not set!")
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_USER_TTL_SECONDS = float(os.getenv("AUTH_USER_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+
+security = HTTPBearer()
+
+
+def create_access_token(data: dict, expires_delta: timedelta = None):
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class TokenCache:
+    def __init__(self, max_size=AUTH_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token):
+        """Return the token payload, raising 401 if it is invalid or expired."""
+        with self.lock:
+            cached = self.tokens.get(token)
+            if cached is not None:
+                payload, expires_at = cached
+                if expires_at > time.time():
+                    self.tokens.move_to_end(token)
+                    self.hits += 1
+                    return payload
+                del self.tokens[token]
+                raise HTTPException(status_code=401, detail="Token expired")
+            self.misses += 1
+
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        if "exp" in payload:
+            with self.lock:
+                self.tokens[token] = (payload, payload["exp"])
+                if len(self.tokens) > self.max_size:
+                    self.tokens.popitem(last=False)
+        return payload
+
+
+class UserCache:
+    def __init__(self, ttl=AUTH_USER_TTL_SECONDS, max_size=AUTH_USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username, load):
+        """Cached ``users`` row for ``username``; ``load(username)`` on a miss."""
+        with self.lock:
+            cached = self.users.get(username)
+            if cached is not None and cached[1] > time.monotonic():
+                self.users.move_to_end(username)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        user = load(username)
+        if user is not None:
+            with self.lock:
+                self.users[username] = (user, time.monotonic() + self.ttl)
+                if len(self.users) > self.max_size:
+                    self.users.popitem(last=False)
+        return user
+
+    def invalidate(self, *usernames):
+        with self.lock:
+            for username in usernames:
+                self.users.pop(username, None)
+
+
+token_cache = TokenCache()
+user_cache = UserCache()
+
+
+def get_current_username(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    username = token_cache.verify(credentials.credentials).get("sub")
+    if not username:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return username
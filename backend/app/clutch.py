@@ -0,0 +1,42 @@
+"""
+Final-margin index used to classify clutch games.
+
+Historical box scores never change, so the final margin of every
+(game_id, home) side is fetched once and kept in a dict. Classifying a
+player's games is then one dict lookup per game instead of scanning every
+(game_id, home) pair for every team row. Games with no team rows are
+remembered too, so they are not fetched again; they are never clutch.
+"""
+CLUTCH_MARGIN = 5
+
+
+class ClutchIndex:
+    def __init__(self):
+        self.margins = {}
+        self.game_ids = set()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, rows):
+        for row in rows:
+            self.game_ids.add(row["game_id"])
+            self.margins[(row["game_id"], row["home"])] = abs(row["team_score"] - row["opponent_score"])
+
+    async def ensure(self, repository, game_ids):
+        """Fetch margins for any game not yet in the index."""
+        game_ids = set(game_ids)
+        missing = {game_id for game_id in game_ids if game_id not in self.game_ids}
+        self.hits += len(game_ids) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            self.add(await repository.team_games_by_ids(
+                missing, ["game_id", "home", "team_score", "opponent_score"]
+            ))
+            self.game_ids.update(missing)
+
+    def is_clutch(self, game_id, home, margin=CLUTCH_MARGIN):
+        final_margin = self.margins.get((game_id, home))
+        return final_margin is not None and final_margin <= margin
+
+    def clutch_games(self, player_rows, margin=CLUTCH_MARGIN):
+        return [row for row in player_rows if self.is_clutch(row["game_id"], row["home"], margin)]
@@ -0,0 +1,123 @@
+"""
+Streaming per-game log for /player_statistics/games.
+
+A player's games are read one keyset page at a time, ordered by
+(game_date, game_id), using ``repository.player_games_after``. Each page
+is written out before the next one is fetched, so memory holds one page
+however long the range is. The first page is small
+(GAME_LOG_FIRST_PAGE_SIZE), so the first bytes go out after one short
+query.
+
+Events, in order:
+
+    {"type": "game", ...box score}
+    {"type": "summary", "season": "2023-24", "final": false, "stats": {...}}
+    {"type": "end", "games": 1234, "stats": {...career...}}
+
+A season-to-date summary follows every page, and a final one closes each
+season. ``stats`` uses the calculate_player_summary keys and rounding.
+Output is NDJSON (one event per line) or SSE (``event: <type>``). A
+failure mid-stream ends it with an ``{"type": "error"}`` event.
+"""
+import os
+
+import numpy as np
+
+from app.aggregation import EMPTY_PLAYER_SUMMARY, PLAYER_FIELDS, player_summaries_from_totals, to_matrix
+from app.log import get_logger
+from app.responses import dumps
+
+logger = get_logger(__name__)
+
+GAME_LOG_FIRST_PAGE_SIZE = int(os.getenv("GAME_LOG_FIRST_PAGE_SIZE", "100"))
+GAME_LOG_PAGE_SIZE = int(os.getenv("GAME_LOG_PAGE_SIZE", "1000"))
+
+GAME_LOG_COLUMNS = ["game_id", "game_date", "home", "win", *PLAYER_FIELDS]
+
+NDJSON_FORMAT = "ndjson"
+SSE_FORMAT = "sse"
+GAME_LOG_MEDIA_TYPES = {NDJSON_FORMAT: "application/x-ndjson", SSE_FORMAT: "text/event-stream"}
+
+# Seasons start in October, except 2020-21: the 2019-20 season ran into October 2020.
+SEASON_START = "10-01"
+LATE_SEASON_STARTS = {2020: "12-01"}
+
+
+def season_of(game_date):
+    """NBA season label ("2023-24") of a game date."""
+    day = str(game_date)[:10]
+    year = int(day[:4])
+    if day[5:] < LATE_SEASON_STARTS.get(year, SEASON_START):
+        year -= 1
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+class RunningSummary:
+    def __init__(self):
+        self.games = 0
+        self.totals = np.zeros(len(PLAYER_FIELDS))
+
+    def add(self, values):
+        self.games += len(values)
+        self.totals = self.totals + values.sum(axis=0)
+
+    def stats(self):
+        if not self.games:
+            return dict(EMPTY_PLAYER_SUMMARY)
+        return player_summaries_from_totals([None], np.array([self.games]), self.totals[None, :])[None]
+
+
+async def game_log_events(repository, player_id, start_date=None, end_date=None):
+    """Yield one list of events per fetched page."""
+    career = RunningSummary()
+    season, season_summary = None, RunningSummary()
+    after = None
+    limit = GAME_LOG_FIRST_PAGE_SIZE
+
+    while True:
+        rows = await repository.player_games_after(
+            player_id, start_date, end_date, GAME_LOG_COLUMNS, after=after, limit=limit
+        )
+        events = []
+        values = to_matrix(rows, PLAYER_FIELDS)
+        for i, row in enumerate(rows):
+            row_season = season_of(row["game_date"])
+            if row_season != season:
+                if season is not None:
+                    events.append({"type": "summary", "season": season, "final": True, "stats": season_summary.stats()})
+                season, season_summary = row_season, RunningSummary()
+            season_summary.add(values[i:i + 1])
+            events.append({"type": "game", **row})
+        career.add(values)
+
+        if len(rows) < limit:
+            if season is not None:
+                events.append({"type": "summary", "season": season, "final": True, "stats": season_summary.stats()})
+            events.append({"type": "end", "games": career.games, "stats": career.stats()})
+            yield events
+            return
+
+        events.append({"type": "summary", "season": season, "final": False, "stats": season_summary.stats()})
+        yield events
+        after = (rows[-1]["game_date"], rows[-1]["game_id"])
+        limit = GAME_LOG_PAGE_SIZE
+
+
+def encode_ndjson(events):
+    return b"".join(dumps(event) + b"\n" for event in events)
+
+
+def encode_sse(events):
+    return b"".join(b"event: " + event["type"].encode() + b"\ndata: " + dumps(event) + b"\n\n" for event in events)
+
+
+async def game_log_stream(repository, player_id, start_date=None, end_date=None, stream_format=NDJSON_FORMAT):
+    """Encoded chunks, one per page, for a StreamingResponse."""
+    encode = encode_sse if stream_format == SSE_FORMAT else encode_ndjson
+    try:
+        async for events in game_log_events(repository, player_id, start_date, end_date):
+            yield encode(events)
+    except Exception as e:
+        # The 200 status is already sent; end the stream with an error event instead.
+        logger.exception("game log stream failed", player_id=player_id)
+        yield encode([{"type": "error", "detail": str(e)}])
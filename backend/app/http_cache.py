@@ -0,0 +1,62 @@
+"""
+HTTP caching for the GET variants of the stat endpoints.
+
+Every response gets a strong ETag derived from the dataset version, the
+reference data version, the path and the canonicalized query parameters,
+plus a ``Cache-Control`` header. A request whose ``If-None-Match`` matches
+gets a 304 before anything is computed.
+
+These endpoints require a bearer token, so responses are ``private`` (only
+the client may keep them, never a shared proxy or CDN) and vary on
+``Authorization``.
+
+The dataset version is the store version with ``STATS_BACKEND=store``.
+Live Supabase tables have none, so it is ``DATASET_VERSION`` when set
+(bump it after an ingest) and otherwise the current UTC date, which caps
+staleness at one day of ingests.
+"""
+import hashlib
+import json
+import os
+import time
+
+from fastapi import Response
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "3600"))
+HTTP_CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", f"private, max-age={HTTP_CACHE_MAX_AGE}")
+DATASET_VERSION = os.getenv("DATASET_VERSION")
+
+
+def data_version(repository):
+    """Version of the box-score data alone (also keys app/shared_cache.py)."""
+    return repository.version or DATASET_VERSION or time.strftime("%Y-%m-%d", time.gmtime())
+
+
+def dataset_version(repository, reference_version):
+    return f"{data_version(repository)}.{reference_version}"
+
+
+def make_etag(version, path, params):
+    """Strong ETag; parameter order and unset parameters don't change it."""
+    canonical = json.dumps(
+        [version, path, sorted((key, value) for key, value in params.items() if value is not None)],
+        separators=(",", ":"),
+        default=str,
+    )
+    return '"' + hashlib.sha1(canonical.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix still matches.
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(etag):
+    return {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL, "Vary": "Authorization"}
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,366 @@
+"""
+Streaming loader for the Kaggle box-score CSVs.
+
+Loads PlayerStatistics.csv / TeamStatistics.csv (historical NBA data and
+player box scores) into ``player_statistics`` / ``team_statistics``:
+
+    python -m app.ingest player_statistics PlayerStatistics.csv
+    python -m app.ingest team_statistics TeamStatistics.csv --target store
+
+The file is read in chunks of ``--chunk-size`` rows, so memory stays
+bounded no matter how large the CSV is. Headers are mapped to the table's
+column names (camelCase -> snake_case) and values are coerced once here,
+so the API never has to re-parse numeric strings in new rows (older rows
+are still parsed by app/team_form.py). Supabase gets bulk
+inserts of ``--batch-size`` rows. For the local store (app/store.py) each
+chunk is saved as .npy segments as it arrives; at the end the segments are
+concatenated into memory-mapped columns on disk, written out sorted one
+column at a time and swapped in atomically.
+
+Loads are incremental by default. Rows older than the latest game_date
+already in the target are skipped. Rows from that date on are skipped when
+their (game_id, player_id / teamId) pair is already there. ``--full`` loads
+every row; use it for a first load into Supabase or to rebuild a store table.
+"""
+import argparse
+import csv
+import os
+import resource
+import shutil
+import time
+from itertools import islice
+
+import numpy as np
+
+from app.store import (
+    PAGE_SIZE,
+    STORE_DIR,
+    TABLE_KEYS,
+    ColumnarStore,
+    column_array,
+    swap_store,
+    write_arrays,
+)
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "50000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+# Kaggle headers whose column name isn't the plain snake_case form. The
+# player file spells "playerteam" / "opponentteam" as one word, and newer
+# releases of the dataset name the date column gameDateTimeEst.
+COLUMN_RENAMES = {
+    "personId": "player_id",
+    "teamId": "teamId",
+    "gameDateTimeEst": "game_date",
+    "playerteamCity": "player_team_city",
+    "playerteamName": "player_team_name",
+    "opponentteamCity": "opponent_team_city",
+    "opponentteamName": "opponent_team_name",
+}
+
+
+def column_name(header):
+    """'fieldGoalsMade' -> 'field_goals_made', 'q1Points' -> 'q1_points'."""
+    header = header.strip()
+    if header in COLUMN_RENAMES:
+        return COLUMN_RENAMES[header]
+    return "".join(f"_{ch.lower()}" if ch.isupper() else ch for ch in header).lstrip("_")
+
+
+def coerce(value):
+    """CSV string -> None, bool, int or float; anything else stays a string."""
+    if value == "":
+        return None
+    if value in ("True", "true"):
+        return True
+    if value in ("False", "false"):
+        return False
+    if value[0].isdigit() or value[0] in "-+.":
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                number = float(value)
+            except ValueError:
+                return value
+            # "25.0" is stored in integer columns, which reject 25.0.
+            return int(number) if number.is_integer() else number
+    return value
+
+
+def read_chunks(path, chunk_size=INGEST_CHUNK_SIZE):
+    """Yield the CSV as dicts of coerced column lists, ``chunk_size`` rows at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        names = [column_name(header) for header in next(reader)]
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield {
+                name: [coerce(row[i]) if i < len(row) else None for row in rows]
+                for i, name in enumerate(names)
+            }
+
+
+def _day(value):
+    return None if value is None else str(value)[:10]
+
+
+class SupabaseSink:
+    def __init__(self, supabase, table, batch_size=INGEST_BATCH_SIZE):
+        self.supabase = supabase
+        self.table = table
+        self.key = TABLE_KEYS[table]
+        self.batch_size = batch_size
+
+    def latest_date(self):
+        rows = (
+            self.supabase.table(self.table)
+            .select("game_date")
+            .order("game_date", desc=True)
+            .limit(1)
+            .execute()
+        ).data
+        return _day(rows[0]["game_date"]) if rows else None
+
+    def existing_pairs(self, since):
+        pairs = set()
+        offset = 0
+        while True:
+            page = (
+                self.supabase.table(self.table)
+                .select(f"game_id,{self.key}")
+                .gte("game_date", since)
+                .order("game_id")
+                .order(self.key)
+                .range(offset, offset + PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            pairs.update((row["game_id"], row[self.key]) for row in page)
+            offset += len(page)
+            if len(page) < PAGE_SIZE:
+                return pairs
+
+    def write(self, columns):
+        names = list(columns)
+        rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+        for start in range(0, len(rows), self.batch_size):
+            self.supabase.table(self.table).insert(rows[start:start + self.batch_size]).execute()
+
+    def close(self):
+        pass
+
+
+class StoreSink:
+    """Appends to (or with ``replace`` rebuilds) one table of the local store on close."""
+
+    def __init__(self, table, store_dir=STORE_DIR, replace=False):
+        self.table = table
+        self.replace = replace
+        self.key = TABLE_KEYS[table]
+        self.store_dir = store_dir
+        self.table_dir = os.path.join(store_dir, table)
+        self.spool_dir = f"{store_dir}.{table}.spool"
+        # One {column: .npy path} per chunk written.
+        self.segments = []
+
+    def _existing_column(self, name):
+        return np.load(os.path.join(self.table_dir, f"{name}.npy"), mmap_mode="r")
+
+    def _has_table(self):
+        return os.path.exists(os.path.join(self.table_dir, f"{self.key}.npy"))
+
+    def latest_date(self):
+        if not self._has_table():
+            return None
+        # Rows without a game_date would make the max NaT.
+        dates = self._existing_column("game_date")
+        dates = dates[~np.isnat(dates)]
+        return str(dates.max()) if len(dates) else None
+
+    def existing_pairs(self, since):
+        dates = self._existing_column("game_date")
+        mask = dates >= np.datetime64(since, "D")
+        return set(zip(
+            self._existing_column("game_id")[mask].tolist(),
+            self._existing_column(self.key)[mask].tolist(),
+        ))
+
+    def write(self, columns):
+        # Straight to disk, so only the current chunk is ever held in memory.
+        if not self.segments:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            os.makedirs(self.spool_dir)
+        segment = {}
+        for name, values in columns.items():
+            path = os.path.join(self.spool_dir, f"{len(self.segments):06d}.{name}.npy")
+            np.save(path, column_array(name, values))
+            segment[name] = path
+        self.segments.append(segment)
+
+    def close(self):
+        if not self.segments:
+            return
+        meta = {"tables": {}}
+        if os.path.exists(os.path.join(self.store_dir, "meta.json")):
+            meta = ColumnarStore(self.store_dir).meta
+        segments = list(self.segments)
+        if self._has_table() and not self.replace:
+            segments.insert(0, {
+                name: os.path.join(self.table_dir, f"{name}.npy")
+                for name in meta["tables"][self.table]["columns"]
+            })
+
+        tmp_dir = f"{self.store_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for other in meta["tables"]:
+            if other != self.table:
+                shutil.copytree(os.path.join(self.store_dir, other), os.path.join(tmp_dir, other))
+
+        meta["version"] = time.strftime("%Y%m%d%H%M%S")
+        columns = _concat(segments, self.spool_dir)
+        meta["tables"][self.table] = write_arrays(tmp_dir, self.table, columns)
+        del columns
+        swap_store(tmp_dir, self.store_dir, meta)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        self.segments = []
+
+
+def _concat(segments, out_dir):
+    """Concatenate .npy column segments into memory-mapped columns in ``out_dir``.
+
+    Columns missing from a segment are filled with NaT / NaN. Only one
+    segment of one column is in memory at a time.
+    """
+    names = list(dict.fromkeys(name for segment in segments for name in segment))
+    lengths = [len(np.load(next(iter(segment.values())), mmap_mode="r")) for segment in segments]
+    columns = {}
+    for name in names:
+        def parts():
+            for segment, rows in zip(segments, lengths):
+                if name in segment:
+                    yield np.load(segment[name], mmap_mode="r")
+                elif name == "game_date":
+                    yield np.full(rows, np.datetime64("NaT", "D"))
+                else:
+                    yield np.full(rows, np.nan)
+
+        kinds = {part.dtype.kind for part in parts()}
+        if "U" in kinds:
+            convert = _as_strings
+            dtype = max((convert(part).dtype for part in parts()), key=lambda d: d.itemsize)
+        elif "f" in kinds:
+            convert = lambda part: part.astype(np.float64)
+            dtype = np.dtype(np.float64)
+        else:
+            convert = np.asarray
+            dtype = np.result_type(*{part.dtype for part in parts()})
+
+        column = np.lib.format.open_memmap(
+            os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=(sum(lengths),)
+        )
+        start = 0
+        for part in parts():
+            column[start:start + len(part)] = convert(part)
+            start += len(part)
+        column.flush()
+        columns[name] = column
+    return columns
+
+
+def _as_strings(part):
+    if part.dtype.kind == "U":
+        return np.asarray(part)
+    return np.array(["" if v is None or v != v else str(v) for v in part.tolist()], dtype=str)
+
+
+def _new_rows(columns, key, since, seen):
+    """Row indexes of ``columns`` that are not in the target yet."""
+    keep = []
+    for i, (game_id, key_value, game_date) in enumerate(
+        zip(columns["game_id"], columns[key], columns["game_date"])
+    ):
+        if game_id is None or key_value is None:
+            continue
+        if since is not None:
+            day = _day(game_date)
+            if day is None or day < since:
+                continue
+            if (game_id, key_value) in seen:
+                continue
+            seen.add((game_id, key_value))
+        keep.append(i)
+    return keep
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def ingest(path, table, sink, chunk_size=INGEST_CHUNK_SIZE, full=False):
+    """Stream ``path`` into ``sink``; returns the load report."""
+    key = TABLE_KEYS[table]
+    since = None if full else sink.latest_date()
+    seen = sink.existing_pairs(since) if since is not None else set()
+    if since is not None:
+        print(f"{table}: appending games from {since} on ({len(seen)} rows already there)")
+
+    started = time.perf_counter()
+    read = written = 0
+    for columns in read_chunks(path, chunk_size):
+        rows = len(columns["game_id"])
+        read += rows
+        keep = _new_rows(columns, key, since, seen)
+        if len(keep) < rows:
+            columns = {name: [values[i] for i in keep] for name, values in columns.items()}
+        if keep:
+            sink.write(columns)
+        written += len(keep)
+        elapsed = time.perf_counter() - started
+        print(f"{table}: read {read} rows, wrote {written} ({read / elapsed:,.0f} rows/s, peak RSS {peak_rss_mb():.0f} MB)")
+
+    sink.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "table": table,
+        "rows_read": read,
+        "rows_written": written,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(read / elapsed) if elapsed else 0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a Kaggle box-score CSV")
+    parser.add_argument("table", choices=list(TABLE_KEYS))
+    parser.add_argument("path")
+    parser.add_argument("--target", choices=["supabase", "store"], default="supabase")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--full", action="store_true", help="load every row instead of only new games")
+    args = parser.parse_args()
+
+    if args.target == "store":
+        sink = StoreSink(args.table, args.store_dir, replace=args.full)
+    else:
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv()
+        supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        sink = SupabaseSink(supabase, args.table, args.batch_size)
+
+    report = ingest(args.path, args.table, sink, args.chunk_size, args.full)
+    print(
+        f"{report['table']}: {report['rows_written']} of {report['rows_read']} rows loaded in "
+        f"{report['seconds']}s ({report['rows_per_second']:,} rows/s, peak RSS {report['peak_rss_mb']} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+League-wide leaderboards over the calculate_player_summary stats.
+
+The repository sums every active player's games in a date range with
+``players_range_totals``, giving (players x PLAYER_FIELDS) totals for the
+range without materializing rows: a GROUP BY in Postgres, or one reduceat
+per column over the columnar store's (player_id, game_date) spans. A stat is then one
+vector over all players. The top ``limit`` are picked with
+``np.partition`` rather than by sorting the whole league, and only those
+players are formatted into summaries, so ``stats`` matches
+calculate_player_summary exactly.
+
+Players are ranked on unrounded values. Ties are broken by player_id. Players below
+``min_games`` are left out of both the ranking and the percentiles. A
+player's percentile is the share of ranked players below them, counting
+ties as half:
+
+    percentile = 100 * (below + 0.5 * tied) / ranked
+
+Range totals are cached per (version, start_date, end_date) and finished
+boards per (version, stat, range, min_games, limit), both for
+LEADERBOARD_TTL_SECONDS. ``version`` is app/http_cache.py's
+``dataset_version``, so an ingest, a store rebuild or a roster reload
+starts new entries. Nothing is cached while the roster is still empty.
+"""
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.aggregation import PLAYER_FIELDS, player_summaries_from_totals, ratio
+
+LEADERBOARD_TTL_SECONDS = float(os.getenv("LEADERBOARD_TTL_SECONDS", "3600"))
+LEADERBOARD_MAX_RANGES = int(os.getenv("LEADERBOARD_MAX_RANGES", "32"))
+LEADERBOARD_MAX_BOARDS = int(os.getenv("LEADERBOARD_MAX_BOARDS", "512"))
+LEADERBOARD_DEFAULT_LIMIT = 25
+LEADERBOARD_MAX_LIMIT = 100
+LEADERBOARD_MIN_GAMES = 10
+
+FIELD = {field: i for i, field in enumerate(PLAYER_FIELDS)}
+
+# Summary stat -> its unrounded value for every player, from (counts, totals).
+LEADERBOARD_STATS = {
+    "games_played": lambda counts, t: counts.astype(np.float64),
+    "average_points": lambda counts, t: t[:, FIELD["points"]] / counts,
+    "average_assists": lambda counts, t: t[:, FIELD["assists"]] / counts,
+    "average_rebounds": lambda counts, t: t[:, FIELD["rebounds_total"]] / counts,
+    "field_goal_percentage": lambda counts, t: ratio(
+        t[:, FIELD["field_goals_made"]], t[:, FIELD["field_goals_attempted"]]
+    ),
+    "three_point_percentage": lambda counts, t: ratio(
+        t[:, FIELD["three_pointers_made"]], t[:, FIELD["three_pointers_attempted"]]
+    ),
+    "free_throw_percentage": lambda counts, t: ratio(
+        t[:, FIELD["free_throws_made"]], t[:, FIELD["free_throws_attempted"]]
+    ),
+}
+
+
+class RangeTotals:
+    def __init__(self, player_ids, counts, totals):
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.counts = np.asarray(counts)
+        self.totals = np.asarray(totals, dtype=np.float64).reshape(len(self.player_ids), len(PLAYER_FIELDS))
+        self.created_at = time.monotonic()
+
+    def board(self, stat, min_games, limit):
+        """Top ``limit`` players by ``stat`` among those with at least ``min_games``."""
+        eligible = np.flatnonzero(self.counts >= min_games)
+        values = LEADERBOARD_STATS[stat](self.counts[eligible], self.totals[eligible])
+        ranked = len(eligible)
+        k = min(limit, ranked)
+        if not k:
+            return {"ranked": ranked, "leaders": []}
+
+        # Everything tied with the k-th best is a candidate, so ties are cut by player_id.
+        kth = np.partition(values, ranked - k)[ranked - k]
+        candidates = np.flatnonzero(values >= kth)
+        order = np.lexsort((self.player_ids[eligible[candidates]], -values[candidates]))[:k]
+        top = candidates[order]
+
+        top_values = values[top]
+        below = (values[None, :] < top_values[:, None]).sum(axis=1)
+        tied = (values[None, :] == top_values[:, None]).sum(axis=1)
+        percentiles = 100 * (below + 0.5 * tied) / ranked
+
+        rows = eligible[top]
+        summaries = player_summaries_from_totals(list(range(k)), self.counts[rows], self.totals[rows])
+        leaders = [
+            {
+                "rank": i + 1,
+                "player_id": int(self.player_ids[row]),
+                "value": summaries[i][stat],
+                "percentile": round(float(percentiles[i]), 1),
+                "stats": summaries[i],
+            }
+            for i, row in enumerate(rows)
+        ]
+        return {"ranked": ranked, "leaders": leaders}
+
+
+class LeaderboardIndex:
+    def __init__(
+        self,
+        ttl=LEADERBOARD_TTL_SECONDS,
+        max_ranges=LEADERBOARD_MAX_RANGES,
+        max_boards=LEADERBOARD_MAX_BOARDS,
+    ):
+        self.ttl = ttl
+        self.max_ranges = max_ranges
+        self.max_boards = max_boards
+        self.ranges = OrderedDict()
+        self.boards = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, cache, key):
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+    def _store(self, cache, key, value, limit):
+        cache[key] = (time.monotonic(), value)
+        if len(cache) > limit:
+            cache.popitem(last=False)
+
+    async def range_totals(self, repository, player_ids, version, start_date, end_date):
+        key = (version, start_date, end_date)
+        totals = self._fresh(self.ranges, key)
+        if totals is None:
+            totals = RangeTotals(*await repository.players_range_totals(player_ids, start_date, end_date))
+            if player_ids:
+                self._store(self.ranges, key, totals, self.max_ranges)
+        return totals
+
+    async def board(self, repository, player_ids, stat, version, start_date=None, end_date=None,
+                    min_games=LEADERBOARD_MIN_GAMES, limit=LEADERBOARD_DEFAULT_LIMIT):
+        if stat not in LEADERBOARD_STATS:
+            raise ValueError(f"Unsupported stat '{stat}'")
+        key = (version, stat, start_date, end_date, min_games, limit)
+        board = self._fresh(self.boards, key)
+        if board is not None:
+            self.hits += 1
+            return board
+        self.misses += 1
+        totals = await self.range_totals(repository, player_ids, version, start_date, end_date)
+        board = totals.board(stat, min_games, limit)
+        # An empty roster (reference data not loaded yet) must not pin an empty board.
+        if player_ids:
+            self._store(self.boards, key, board, self.max_boards)
+        return board
@@ -0,0 +1,94 @@
+"""
+Structured, leveled, sampled logging.
+
+Each record is one JSON line (time, level, logger, event, plus any keyword
+fields). Records go through a queue, and a background thread writes them
+to stdout, so request handlers never block on terminal I/O.
+
+LOG_LEVEL sets the minimum level (default INFO). LOG_SAMPLE_RATE (0..1)
+keeps that fraction of DEBUG and INFO records. Warnings and errors are
+always written.
+
+    logger = get_logger(__name__)
+    logger.info("login succeeded", username=username)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import traceback
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+_ROOT = "app"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, default=str)
+
+
+def _configure():
+    root = logging.getLogger(_ROOT)
+    if root.handlers:
+        return
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(records, stream)
+    listener.start()
+    atexit.register(listener.stop)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+
+class StructuredLogger:
+    def __init__(self, name, sample_rate=LOG_SAMPLE_RATE):
+        self.logger = logging.getLogger(name)
+        self.sample_rate = sample_rate
+
+    def _log(self, level, event, fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        self.logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """ERROR record with the current traceback attached."""
+        # Formatted here: the queue handler would fold exc_info into the message.
+        self._log(logging.ERROR, event, {**fields, "exc": traceback.format_exc()})
+
+
+def get_logger(name):
+    """Logger for an ``app.*`` module; configures the shared handler on first use."""
+    _configure()
+    if not name.startswith(_ROOT):
+        name = f"{_ROOT}.{name}"
+    return StructuredLogger(name)
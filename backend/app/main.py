@@ -1,46 +1,176 @@
+import time
+
+# Import time is reported at startup; see app/warmup.py.
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import os
-import traceback
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi import Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, EmailStr
-import bcrypt
-import jwt
-from datetime import datetime, timedelta, timezone
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from fastapi import Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-
-from app.statistics import *
+from fastapi import Depends, Query
+from datetime import date
+
+from app.statistics import calculate_clutch_summary
+from app.auth import create_access_token, get_current_username, token_cache, user_cache
+from app.passwords import PasswordHasher
+from app.repository import create_async_supabase, create_repository
+from app.pushdown import create_summaries
+from app.clutch import CLUTCH_MARGIN, ClutchIndex
+from app.reference import PLACEHOLDER_IMAGE_URL, ReferenceCache, decode_cursor, encode_cursor, player_full_name
+from app.search import SEARCH_DEFAULT_LIMIT, normalize
+from app.prefix_index import PrefixSumIndex
+from app.matchups import MATCHUP_CATEGORIES, MatchupIndex, columnar_series
+from app.responses import (
+    COLUMNAR_FORMAT,
+    GZIP_COMPRESS_LEVEL,
+    GZIP_MINIMUM_SIZE,
+    RESPONSE_FORMATS,
+    ROWS_FORMAT,
+    FastJSONResponse,
+)
+from app.team_form import TEAM_FORM_GAMES, TeamFormIndex
+from app.game_log import GAME_LOG_MEDIA_TYPES, NDJSON_FORMAT, game_log_stream
+from app.leaderboard import (
+    LEADERBOARD_DEFAULT_LIMIT,
+    LEADERBOARD_MAX_LIMIT,
+    LEADERBOARD_MIN_GAMES,
+    LEADERBOARD_STATS,
+    LeaderboardIndex,
+)
+from app.http_cache import cache_headers, data_version, dataset_version, etag_matches, make_etag, not_modified
+from app.log import get_logger
+from app.shared_cache import open_shared_cache, shared_key
+from app.single_flight import CoalescingRepository, SingleFlight, normalize_key
+from app.warmup import Warmup
+from app import metrics
+from app.aggregation import (
+    EMPTY_CLUTCH_SUMMARY,
+    EMPTY_PLAYER_SUMMARY,
+    PLAYER_FIELDS,
+    clutch_summaries,
+    player_summaries,
+)
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise RuntimeError("Supabase credentials not found in environment variables!")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+_supabase = None
+stats_repository = None
+summaries = None
+shared_results = None
+clutch_index = ClutchIndex()
+reference_cache = ReferenceCache()
+prefix_index = PrefixSumIndex()
+matchup_index = MatchupIndex()
+team_form_index = TeamFormIndex()
+leaderboard_index = LeaderboardIndex()
+password_hasher = PasswordHasher()
+query_flight = SingleFlight("queries")
+response_flight = SingleFlight("responses")
+
+metrics.track_caches({
+    "reference": reference_cache,
+    "prefix_sums": prefix_index,
+    "matchups": matchup_index,
+    "team_form": team_form_index,
+    "leaderboards": leaderboard_index,
+    "clutch_margins": clutch_index,
+    "auth_tokens": token_cache,
+    "auth_users": user_cache,
+    "single_flight_queries": query_flight,
+    "single_flight_responses": response_flight,
+})
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+BATCH_MAX_ENTITIES = int(os.getenv("BATCH_MAX_ENTITIES", "100"))
+
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "100"))
+
+# Fields of /teams and /players rows, selectable with ?fields=.
+TEAM_LIST_FIELDS = {
+    "id": lambda t: t["id"],
+    "full_name": lambda t: t["full_name"],
+    "logo_url": lambda t: t["logo_url"],
+}
+PLAYER_LIST_FIELDS = {
+    "player_id": lambda p: p["player_id"],
+    "first_name": lambda p: p["first_name"],
+    "last_name": lambda p: p["last_name"],
+    "jersey": lambda p: p["jersey"],
+    "image_url": lambda p: reference_cache.image_url(p["player_id"]),
+    "name": player_full_name,
+}
+
+
+def get_supabase():
+    """Sync client for the users table, created on first use."""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
+
+
+async def warm_reference():
+    await reference_cache.load(stats_repository)
+
+
+async def warm_team_form():
+    """Recent-form windows of every team."""
+    await asyncio.gather(
+        *(team_form_index.team(stats_repository, team_id) for team_id in reference_cache.teams_by_id)
+    )
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-if not SECRET_KEY:
-    raise RuntimeError("SECRET_KEY not set!")
 
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+async def warm_leaderboards():
+    """Career range totals, and the default board of every stat."""
+    player_ids = list(reference_cache.players_by_id)
+    version = dataset_version(stats_repository, reference_cache.version)
+    for stat in LEADERBOARD_STATS:
+        await leaderboard_index.board(stats_repository, player_ids, stat, version)
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (
-        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-security = HTTPBearer()
-app = FastAPI()
+warmup = Warmup(IMPORT_STARTED)
+warmup.step("reference", warm_reference, required=True)
+warmup.step("team_form", warm_team_form)
+warmup.step("leaderboards", warm_leaderboards)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global stats_repository, summaries, shared_results
+    async_supabase = await create_async_supabase(SUPABASE_URL, SUPABASE_KEY)
+    stats_repository = CoalescingRepository(create_repository(async_supabase), query_flight)
+    summaries = create_summaries(async_supabase)
+    shared_results = open_shared_cache()
+    if shared_results is not None:
+        metrics.track_caches({"shared_results": shared_results})
+    await warmup.start()
+    yield
+    await warmup.stop()
+    await stats_repository.aclose()
+    if shared_results is not None:
+        shared_results.close()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 app.add_middleware(
@@ -49,7 +179,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.http_in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.http_in_flight.dec()
+        route = request.scope.get("route")
+        route = route.path if route is not None else "unmatched"
+        elapsed = time.perf_counter() - started
+        metrics.http_request_duration.observe(request.method, route, status, value=elapsed)
+        metrics.http_requests.inc(request.method, route, status)
 
 
 class UserCreate(BaseModel):
@@ -67,35 +217,53 @@ class UserLogin(BaseModel):
     password: str
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the worker is up, warm or not."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 503 until warm-up has finished, with per-step timings."""
+    status = warmup.status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.get("/")
 def read_root():
     return {"message": "Backend connected to Supabase successfully!"}
 
 
 @app.post("/register")
-def register_user(user: UserCreate):
+async def register_user(user: UserCreate):
     try:
-        print(f"Checking if user '{user.username}' or email '{user.email}' exists...")
+        logger.debug("register lookup", username=user.username)
 
-        existing = (
-            supabase.table("users") \
+        existing = await run_in_threadpool(
+            get_supabase().table("users") \
             .select("*") \
             .or_(f"username.eq.{user.username}, email.eq.{user.email}") \
-            .execute() \
+            .execute
         )
 
         if existing.data and len(existing.data) > 0:
-            print("Existing user found:", existing.data)
+            logger.info("register conflict", username=user.username)
             if existing.data[0]["username"] == user.username:
                 raise HTTPException(status_code=400, detail="Username already exists")
             if existing.data[0]["email"] == user.email:
                 raise HTTPException(status_code=400, detail="Email already exists")
 
-        pw_bytes = user.password.encode("utf-8")[:72]
-        hashed_pw = bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
+        hashed_pw = await password_hasher.hash(user.password)
 
-        result = (
-            supabase.table("users")
+        result = await run_in_threadpool(
+            get_supabase().table("users")
             .insert(
                 {
                     "first_name": user.first_name,
@@ -105,54 +273,45 @@ def register_user(user: UserCreate):
                     "hashed_password": hashed_pw,
                 }
             )
-            .execute()
+            .execute
         )
 
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to insert user")
 
         new_user = result.data[0]
-        print("User created successfully:", new_user)
-
         token = create_access_token({"sub": new_user["username"]})
-        print("JWT Token created for:", new_user["username"])
+        logger.info("user registered", username=new_user["username"], user_id=new_user["id"])
 
         return {"token": token, "user": new_user}
 
     except HTTPException:
         raise
     except Exception as e:
-        print("REGISTER ERROR:")
-        traceback.print_exc()
+        logger.exception("register failed", username=user.username)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
 @app.post("/login")
-def login(user: UserLogin):
+async def login(user: UserLogin):
     try:
-        print(f"Searching for user '{user.username}'...")
+        logger.debug("login lookup", username=user.username)
 
-        response = (
-            supabase.table("users") \
-            .select("*") \
-            .eq("username", user.username) \
-            .execute()
-        )
+        db_user = await run_in_threadpool(fetch_user_row, user.username)
 
-        if not response.data or len(response.data) == 0:
-            print("No user found.")
+        if not db_user:
+            logger.info("login failed", username=user.username, reason="unknown user")
             raise HTTPException(status_code=400, detail="Invalid username or password")
 
-        db_user = response.data[0]
-
-        pw_bytes = user.password.encode("utf-8")[:72]
-
-        if not bcrypt.checkpw(pw_bytes, db_user["hashed_password"].encode("utf-8")):
-            print("Password mismatch for:", db_user["username"])
+        if not await password_hasher.verify(user.password, db_user["hashed_password"]):
+            logger.info("login failed", username=user.username, reason="password mismatch")
             raise HTTPException(status_code=400, detail="Invalid username or password")
 
+        if password_hasher.needs_rehash(db_user["hashed_password"]):
+            await rehash_password(db_user["username"], user.password)
+
         token = create_access_token({"sub": db_user["username"]})
-        print("Login successful for:", db_user["username"])
+        logger.info("login succeeded", username=db_user["username"])
 
         user_data = {
             "id": db_user["id"],
@@ -167,23 +326,48 @@ def login(user: UserLogin):
     except HTTPException:
         raise
     except Exception as e:
-        print("LOGIN ERROR:")
-        traceback.print_exc()
+        logger.exception("login failed", username=user.username)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
+async def rehash_password(username, password):
+    """Upgrade a stored hash to the current BCRYPT_ROUNDS; never fails the login."""
+    try:
+        hashed_pw = await password_hasher.hash(password)
+        await run_in_threadpool(
+            get_supabase().table("users")
+            .update({"hashed_password": hashed_pw})
+            .eq("username", username)
+            .execute
+        )
+        user_cache.invalidate(username)
+        logger.info("password rehashed", username=username)
+    except Exception:
+        logger.exception("password rehash failed", username=username)
+
+
+def fetch_user_row(username):
+    response = (
+        get_supabase().table("users")
+        .select("*")
+        .eq("username", username)
+        .execute()
+    )
+    return response.data[0] if response.data else None
+
+
+def get_authenticated_user(username: str = Depends(get_current_username)):
+    user = user_cache.get(username, fetch_user_row)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
 @app.put("/setup-team-and-player")
 def update_profile(
     data: dict,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
         favourite_team = data.get("favourite_team_name")
         favourite_player = data.get("favourite_player_name")
         favourite_player_id = data.get("favourite_player_id")
@@ -200,206 +384,164 @@ def update_profile(
             updates["favourite_player_id"] = favourite_player_id
 
         result = (
-            supabase.table("users")
+            get_supabase().table("users")
             .update(updates)
             .eq("username", username)
             .execute()
         )
+        user_cache.invalidate(username)
 
         if not result.data:
             raise HTTPException(status_code=404, detail="User not found")
 
-        print("Profile updated successfully:", result.data[0])
+        logger.info("profile updated", username=username, fields=sorted(updates))
         return {"message": "Profile updated successfully", "user": result.data[0]}
 
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException:
+        raise
     except Exception as e:
-        print("UPDATE PROFILE ERROR:")
-        traceback.print_exc()
+        logger.exception("profile update failed", username=username)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
     
-@app.get("/teams")
-def get_teams(search: str = ""):
-    """Search teams by full_name"""
+def list_projection(fields, available):
+    """Getters of the comma-separated ``fields`` (all of them when empty)."""
+    if not fields:
+        return available
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {name: available[name] for name in names}
+
+
+def list_page(response, table, cursor, limit):
+    """One keyset page of ``table``; the next cursor and the total go in headers."""
     try:
-        print(f"Searching teams for query: '{search}'")
-        query = supabase.table("teams").select("id, full_name, logo_url")
-        if search:
-            query = query.ilike("full_name", f"%{search}%")
-        response = query.execute()
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows, total, last_id = reference_cache.page(table, after, max(1, min(limit, LIST_MAX_LIMIT)))
+    response.headers["X-Total-Count"] = str(total)
+    if last_id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(last_id)
+    return rows
 
-        return response.data or []
+
+@app.get("/teams")
+async def get_teams(
+    response: Response,
+    search: str = "",
+    limit: int = SEARCH_DEFAULT_LIMIT,
+    cursor: str | None = None,
+    fields: str | None = None,
+):
+    """Search teams by full_name, or page through all teams by id"""
+    try:
+        logger.debug("teams search", query=search)
+        projection = list_projection(fields, TEAM_LIST_FIELDS)
+        teams = reference_cache.search_teams(search, limit) if search else list_page(response, "teams", cursor, limit)
+        return [{name: get(t) for name, get in projection.items()} for t in teams]
+    except HTTPException:
+        raise
     except Exception as e:
-        print("TEAMS SEARCH ERROR:")
-        traceback.print_exc()
+        logger.exception("teams search failed", query=search)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/players")
-def get_players(search: str = ""):
-    """Search players by first or last name and attach image URLs"""
+async def get_players(
+    response: Response,
+    search: str = "",
+    limit: int = SEARCH_DEFAULT_LIMIT,
+    cursor: str | None = None,
+    fields: str | None = None,
+):
+    """Search players by first or last name, or page through all players by id"""
     try:
-        print(f"Searching players for query: '{search}'")
-        query = supabase.table("active_players").select(
-            "player_id, first_name, last_name, jersey"
+        logger.debug("players search", query=search)
+        projection = list_projection(fields, PLAYER_LIST_FIELDS)
+        players = (
+            reference_cache.search_players(search, limit) if search
+            else list_page(response, "players", cursor, limit)
         )
-        if search:
-            query = query.or_(
-                f"first_name.ilike.%{search}%,last_name.ilike.%{search}%"
-            )
-        response = query.execute()
-        players = response.data or []
-
-        for p in players:
-            image_path = f"{p['player_id']}.png"
-            try:
-                image_url = supabase.storage.from_("Player images").get_public_url(image_path)
-                p["image_url"] = image_url
-            except Exception:
-                p["image_url"] = "https://upload.wikimedia.org/wikipedia/commons/8/89/Portrait_Placeholder.png"
-
-            p["name"] = f"{p['first_name']} {p['last_name']}"
-        return players
+        return [{name: get(p) for name, get in projection.items()} for p in players]
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print("PLAYER SEARCH ERROR:")
-        traceback.print_exc()
+        logger.exception("players search failed", query=search)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/player-image")
-def get_player_image(name: str):
+async def get_player_image(name: str):
     try:
         if not name:
             raise HTTPException(status_code=400, detail="Player name is required")
-        
-        cleaned = name.strip()
-        parts = cleaned.split()
 
-        if len(parts) == 1:
-            first = parts[0]
-            last = parts[0]
-        else:
-            first = parts[0]
-            last = " ".join(parts[1:])   
-
-        query = (
-            supabase.table("active_players")
-            .select("player_id, first_name, last_name")
-            .or_(
-                f"first_name.ilike.%{first}%,last_name.ilike.%{last}%"
+        player = reference_cache.player_by_name(name)
+        if player is None:
+            player = reference_cache.cached(
+                ("player-image", normalize(name)),
+                lambda: next(iter(reference_cache.search_players(name, 1)), None),
             )
-        )
-
-        response = query.execute()
-        players = response.data or []
 
-        if not players:
+        if not player:
             return {
-                "image_url": "https://upload.wikimedia.org/wikipedia/commons/8/89/Portrait_Placeholder.png",
+                "image_url": PLACEHOLDER_IMAGE_URL,
                 "player_id": None,
             }
 
-        normalized_target = cleaned.lower().replace(".", "")
-        def normalize(fn, ln):
-            return f"{fn} {ln}".lower().replace(".", "")
-
-        player = next(
-            (p for p in players if normalize(p["first_name"], p["last_name"]) == normalized_target),
-            players[0]
-        )
-
         player_id = player["player_id"]
-        image_path = f"{player_id}.png"
-
-        try:
-            image_url = supabase.storage.from_("Player images").get_public_url(image_path)
-        except Exception:
-            image_url = "https://upload.wikimedia.org/wikipedia/commons/8/89/Portrait_Placeholder.png"
-
-        return {"image_url": image_url, "player_id": player_id}
+        return {"image_url": reference_cache.image_url(player_id), "player_id": player_id}
 
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("player image lookup failed", name=name)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
-@app.get("/check-if-setup-completed")
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
+@app.get("/admin/reference-cache")
+def get_reference_cache_stats(x_admin_token: str | None = Header(default=None)):
+    check_admin_token(x_admin_token)
+    return reference_cache.stats()
 
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
 
-        response = (
-            supabase.table("users")
-            .select("*")
-            .eq("username", username)
-            .execute()
-        )
+@app.post("/admin/reference-cache/invalidate")
+def invalidate_reference_cache(x_admin_token: str | None = Header(default=None)):
+    check_admin_token(x_admin_token)
+    reference_cache.invalidate()
+    return {"message": "Reference cache invalidated", "stats": reference_cache.stats()}
 
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=404, detail="User not found")
 
-        return response.data[0]
+@app.get("/admin/password-hasher")
+def get_password_hasher_stats(x_admin_token: str | None = Header(default=None)):
+    check_admin_token(x_admin_token)
+    return password_hasher.stats()
 
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
+def check_admin_token(token):
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
 
-@app.get("/users/info")
-def get_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
 
-        response = (
-            supabase.table("users")
-            .select("*")
-            .eq("username", username)
-            .single()
-            .execute()
-        )
+@app.get("/check-if-setup-completed")
+def get_current_user(current_user: dict = Depends(get_authenticated_user)):
+    return current_user
 
-        return response.data
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+
+@app.get("/users/info")
+def get_user_info(current_user: dict = Depends(get_authenticated_user)):
+    return current_user
 
 
 @app.put("/user/update")
 def update_user_profile(
     data: dict,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_authenticated_user),
 ):
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        current_user = (
-            supabase.table("users").select("*").eq("username", username).single().execute()
-        ).data
-
-        if not current_user:
-            raise HTTPException(status_code=404, detail="User not found")
+        username = current_user["username"]
 
         new_username = data.get("username")
         new_email = data.get("email")
@@ -411,7 +553,7 @@ def update_user_profile(
 
         if new_username and new_username != current_user["username"]:
             existing_username = (
-                supabase.table("users")
+                get_supabase().table("users")
                 .select("id")
                 .eq("username", new_username)
                 .execute()
@@ -422,7 +564,7 @@ def update_user_profile(
 
         if new_email and new_email != current_user["email"]:
             existing_email = (
-                supabase.table("users").select("id").eq("email", new_email).execute()
+                get_supabase().table("users").select("id").eq("email", new_email).execute()
             )
             if existing_email.data:
                 raise HTTPException(status_code=400, detail="Email already exists")
@@ -432,17 +574,19 @@ def update_user_profile(
             raise HTTPException(status_code=400, detail="No valid changes detected")
 
         result = (
-            supabase.table("users")
+            get_supabase().table("users")
             .update(updates)
             .eq("username", username)
             .execute()
         )
 
+        user_cache.invalidate(username, updates.get("username"))
+
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to update user")
 
         updated_user = result.data[0]
-        print("User profile updated successfully:", updated_user)
+        logger.info("user profile updated", username=username, fields=sorted(updates))
 
         new_token = None
         if "username" in updates:
@@ -454,309 +598,642 @@ def update_user_profile(
 
         return response
 
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except HTTPException:
         raise
     except Exception as e:
-        print("UPDATE USER PROFILE ERROR:")
-        traceback.print_exc()
+        logger.exception("user profile update failed")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
+
+async def teams_statistics_data(data):
+    """Head-to-head series for /teams_statistics (POST body or GET query)."""
+    first_team_id = data.get("teamAId")
+    second_team_id = data.get("teamBId")
+    last_n_games = data.get("numGames")
+    category = data.get("statistic")
+
+    all_categories = data.get("all_categories", False)
+    columnar = response_format(data) == COLUMNAR_FORMAT
+
+    first_series, second_series = await asyncio.gather(
+        matchup_index.series(stats_repository, first_team_id, second_team_id),
+        matchup_index.series(stats_repository, second_team_id, first_team_id),
+    )
+
+    if category in MATCHUP_CATEGORIES:
+        first_team_games = first_series.last_games(category, last_n_games, columnar)
+        second_team_games = second_series.last_games(category, last_n_games, columnar)
+    else:
+        series_columns = ["game_date", "teamId", category]
+        first_team_stats, second_team_stats = await asyncio.gather(
+            stats_repository.team_matchup_games(
+                first_team_id, second_team_id, category, last_n_games, series_columns
+            ),
+            stats_repository.team_matchup_games(
+                second_team_id, first_team_id, category, last_n_games, series_columns
+            ),
+        )
+        if columnar:
+            first_team_games = columnar_series([row[category] for row in first_team_stats[::-1]])
+            second_team_games = columnar_series([row[category] for row in second_team_stats[::-1]])
+        else:
+            first_team_games = [
+                {category: row[category], "game_order": i}
+                for i, row in enumerate(first_team_stats[::-1], start=1)
+            ]
+            second_team_games = [
+                {category: row[category], "game_order": i}
+                for i, row in enumerate(second_team_stats[::-1], start=1)
+            ]
+
+    first_team_name, second_team_name = await asyncio.gather(
+        team_name_rows(first_team_id),
+        team_name_rows(second_team_id),
+    )
+
+    response = {
+        "first_team": {
+            "id": first_team_id,
+            "name": {"data": first_team_name, "count": None},
+            "stats": first_team_games
+        },
+        "second_team": {
+            "id": second_team_id,
+            "name": {"data": second_team_name, "count": None},
+            "stats": second_team_games
+        }
+    }
+    if all_categories:
+        response["first_team"]["all_stats"] = first_series.all_categories(last_n_games, columnar)
+        response["second_team"]["all_stats"] = second_series.all_categories(last_n_games, columnar)
+    return response
+
+
 @app.post("/teams_statistics")
 async def get_teams_stats(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
     # assists, turnovers, team score (ovo su poeni), field goals percentage, three pointers percentage, 
     # free throws percentage, rebounds_total, q1_points, q2_points, q3_points, q4_points
     try:
         data = await request.json()
+        return FastJSONResponse(await teams_statistics_data(data))
 
-        first_team_id = data.get("teamAId")
-        second_team_id = data.get("teamBId")
-        last_n_games = data.get("numGames")
-        category = data.get("statistic")
-
-        first_team_stats_response = supabase.table("team_statistics") \
-            .select(f"game_date, teamId, {category}", count="exact") \
-            .eq("teamId", first_team_id) \
-            .eq("opponent_team_id", second_team_id) \
-            .neq(category, -1) \
-            .order("game_date", desc=True) \
-            .limit(last_n_games)  \
-            .execute()
-        
-        first_team_name = supabase.table("teams") \
-            .select("full_name") \
-            .eq("id", first_team_id) \
-            .execute()
-
-        second_team_stats_response = supabase.table("team_statistics") \
-            .select(f"game_date, teamId, {category}", count="exact") \
-            .eq("teamId", second_team_id) \
-            .eq("opponent_team_id", first_team_id) \
-            .neq(category, -1) \
-            .order("game_date", desc=True) \
-            .limit(last_n_games)  \
-            .execute()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("request failed", handler="get_teams_stats")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        second_team_name = supabase.table("teams") \
-            .select("full_name") \
-            .eq("id", second_team_id) \
-            .execute()
 
-        first_team_games = first_team_stats_response.data[::-1]
-        for i, row in enumerate(first_team_games, start=1):
-            row["game_order"] = i
-            del row["game_date"]
-            del row["teamId"]  
-
-        second_team_games = second_team_stats_response.data[::-1]
-        for i, row in enumerate(second_team_games, start=1):
-            row["game_order"] = i
-            del row["game_date"]
-            del row["teamId"]  
-
-        response = {
-            "first_team": {
-                "id": first_team_id,
-                "name": first_team_name,
-                "stats": first_team_games
-            },
-            "second_team": {
-                "id": second_team_id,
-                "name": second_team_name,
-                "stats": second_team_games
-            }
-        }
-        return response
+@app.get("/teams_statistics")
+async def get_teams_stats_cached(
+    request: Request,
+    teamAId: int,
+    teamBId: int,
+    numGames: int,
+    statistic: str,
+    all_categories: bool = False,
+    series_format: str = Query(ROWS_FORMAT, alias="format"),
+    username: str = Depends(get_current_username)
+):
+    params = {
+        "teamAId": teamAId,
+        "teamBId": teamBId,
+        "numGames": numGames,
+        "statistic": statistic,
+        "all_categories": all_categories,
+        "format": series_format,
+    }
+    return await conditional_get(request, params, teams_statistics_data)
+
+
+async def conditional_get(request, params, compute):
+    """Serve a GET variant with an ETag, answering a matching If-None-Match with 304."""
+    try:
+        version = dataset_version(stats_repository, reference_cache.version)
+        etag = make_etag(version, request.url.path, params)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        content = await response_flight.do(etag, lambda: compute(params))
+        return FastJSONResponse(content, headers=cache_headers(etag))
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(traceback.format_exc())
+        logger.exception("request failed", path=request.url.path)
         raise HTTPException(status_code=500, detail=str(e))
 
+
+async def shared_result(namespace, params, compute):
+    """``await compute()``, or the result another worker already stored for the same params."""
+    if shared_results is None:
+        return await compute()
+    key = shared_key(data_version(stats_repository), namespace, params)
+    return await shared_results.get_or_compute(key, compute)
+
+
+def date_params(start_date, end_date):
+    return {
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+    }
+
+
+def response_format(data):
+    """Series shape requested with the optional "format" field."""
+    response_format = data.get("format") or ROWS_FORMAT
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{response_format}'")
+    return response_format
+
+
+async def team_name_rows(team_id):
+    team = reference_cache.team(team_id)
+    if team is None:
+        return await stats_repository.team(team_id, ["full_name"])
+    return [{"full_name": team["full_name"]}]
+
+
+async def player_statistics_data(data):
+    """Date-range summary for /player_statistics."""
+    first_player_id = data.get("player_id")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+
+    async def compute():
+        if summaries is not None:
+            return await summaries.player_summary(first_player_id, start_date, end_date)
+        return await prefix_index.summary(stats_repository, first_player_id, start_date, end_date)
+
+    first_player_stats = await shared_result(
+        "player_summary", [first_player_id, start_date, end_date], compute
+    )
+
+    response = {
+        "id": first_player_id,
+        "stats": first_player_stats
+    }
+    return response
+
+
 @app.post("/player_statistics")
 async def get_players_stats(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
     try: 
         data = await request.json()
+        return await player_statistics_data(data)
 
-        first_player_id = data.get("player_id")
-        start_date = data.get("start_date")
-        end_date = data.get("end_date")
-
-        categories = "points, assists, rebounds_total, field_goals_attempted, field_goals_made, three_pointers_attempted," \
-                    "three_pointers_made, free_throws_attempted, free_throws_made"
-        
-        first_player_stats = (
-            supabase.table("player_statistics")
-            .select(f"player_id, player_team_name, game_date, {categories}") \
-            .eq("player_id", first_player_id) \
-            .gte("game_date", start_date) \
-            .lte("game_date", end_date) \
-            .order("game_date", desc=True) \
-            .execute()
-        ).data
-
-        first_player_stats = calculate_player_summary(first_player_stats)
-        
-        response = {
-            "id": first_player_id,
-            "stats": first_player_stats
-        }
-        return response
-    
     except Exception as e:
-        print(traceback.format_exc())
+        logger.exception("request failed", handler="get_players_stats")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/player_statistics")
+async def get_players_stats_cached(
+    request: Request,
+    player_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    username: str = Depends(get_current_username)
+):
+    params = {"player_id": player_id, **date_params(start_date, end_date)}
+    return await conditional_get(request, params, player_statistics_data)
+
+
+@app.get("/player_statistics/games")
+async def stream_player_games(
+    player_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    stream_format: str = Query(NDJSON_FORMAT, alias="format"),
+    username: str = Depends(get_current_username)
+):
+    """Per-game log with running season summaries, streamed as NDJSON or SSE."""
+    if stream_format not in GAME_LOG_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{stream_format}'")
+    dates = date_params(start_date, end_date)
+    return StreamingResponse(
+        game_log_stream(stats_repository, player_id, dates["start_date"], dates["end_date"], stream_format),
+        media_type=GAME_LOG_MEDIA_TYPES[stream_format],
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def clutch_margin(data):
+    """The "margin" field as a non-negative int; 400 when it is anything else."""
+    margin = data.get("margin", CLUTCH_MARGIN)
+    try:
+        if isinstance(margin, bool) or (isinstance(margin, float) and not margin.is_integer()):
+            raise ValueError(margin)
+        margin = int(margin)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="margin must be a non-negative integer")
+    if margin < 0:
+        raise HTTPException(status_code=400, detail="margin must be a non-negative integer")
+    return margin
+
+
+async def clutch_factor_data(data):
+    """Clutch summary for /get_clutch_factor."""
+    player_id = data.get("player_id")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+
+    margin = clutch_margin(data)
+
+    async def compute():
+        if summaries is not None:
+            return await summaries.clutch_summary(player_id, start_date, end_date, margin)
+
+        categories = ["player_id", "points", "field_goals_attempted", "field_goals_made", "game_id", "win", "home"]
+
+        player_statistics = await stats_repository.player_games(player_id, start_date, end_date, categories)
+
+        await clutch_index.ensure(stats_repository, {row["game_id"] for row in player_statistics})
+        clutch_player_stats = clutch_index.clutch_games(player_statistics, margin)
+
+        return calculate_clutch_summary(clutch_player_stats)
+
+    clutch_player_stats = await shared_result(
+        "clutch_summary", [player_id, start_date, end_date, margin], compute
+    )
+
+    response = {
+        "player": {
+            "player_id": player_id,
+            "clutch_stats": clutch_player_stats
+        }
+    }
+    return response
+
+
 @app.post("/get_clutch_factor")
 async def get_clutch_factor_stats(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
     try:
         data = await request.json()
+        return await clutch_factor_data(data)
 
-        player_id = data.get("player_id")
-        start_date = data.get("start_date")
-        end_date = data.get("end_date")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("request failed", handler="get_clutch_factor_stats")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        categories = "player_id, points, field_goals_attempted, field_goals_made, game_id, win, home"
 
-        player_statistics = (supabase.table("player_statistics") \
-            .select(categories) \
-            .eq("player_id", player_id) \
-            .gte("game_date", start_date) \
-            .lte("game_date", end_date) \
-            .execute()
-        ).data
-        
-        #print(player_statistics)
-        game_home_pairs = [(row['game_id'], row['home']) for row in player_statistics]
-        print(game_home_pairs)
-
-        # extract just game_ids for the .in_() filter
-        game_ids = [p[0] for p in game_home_pairs]  # index 0 is game_id
-
-        games = (supabase.table("team_statistics")
-            .select("game_id, home, team_score, opponent_score")
-            .in_("game_id", game_ids)
-            .execute()
-        ).data
+@app.get("/get_clutch_factor")
+async def get_clutch_factor_stats_cached(
+    request: Request,
+    player_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    margin: int = CLUTCH_MARGIN,
+    username: str = Depends(get_current_username)
+):
+    params = {"player_id": player_id, **date_params(start_date, end_date), "margin": margin}
+    return await conditional_get(request, params, clutch_factor_data)
+    
 
-        clutch_game_ids = [
-            row["game_id"]
-            for row in games
-            if any(row["game_id"] == p[0] and row["home"] == p[1] for p in game_home_pairs)
-            and abs(row["team_score"] - row["opponent_score"]) <= 5
-        ]
+def batch_id(value, field):
+    """An id from a batch body as an int ("201939" is fine); 400 when it isn't one."""
+    try:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(value)
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{field}: {value!r} is not an integer id")
+
+
+def batch_ranges(data, ids):
+    """Per-entity (start_date, end_date), falling back to the shared range."""
+    overrides = {batch_id(key, "ranges"): value for key, value in (data.get("ranges") or {}).items()}
+    ranges = {}
+    for entity_id in ids:
+        override = overrides.get(entity_id) or {}
+        ranges[entity_id] = (
+            override.get("start_date", data.get("start_date")),
+            override.get("end_date", data.get("end_date")),
+        )
+    return ranges
 
-        clutch_player_stats = [
-            row for row in player_statistics
-                if row["game_id"] in clutch_game_ids
-        ]
 
-        clutch_player_stats = calculate_clutch_summary(clutch_player_stats)
+def fetch_window(ranges):
+    """Smallest single date window covering every entity's range."""
+    starts = [start for start, _ in ranges.values()]
+    ends = [end for _, end in ranges.values()]
+    start = None if None in starts else min(starts)
+    end = None if None in ends else max(ends)
+    return start, end
+
+
+def in_range(row, date_range):
+    start, end = date_range
+    game_date = str(row["game_date"])[:10]
+    return (start is None or game_date >= start) and (end is None or game_date <= end)
+
+
+async def fetch_batch_player_games(data, columns):
+    player_ids = data.get("player_ids") or []
+    if not player_ids:
+        raise HTTPException(status_code=400, detail="player_ids is required")
+    if len(player_ids) > BATCH_MAX_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ENTITIES} ids per request")
+    player_ids = [batch_id(player_id, "player_ids") for player_id in player_ids]
+
+    ranges = batch_ranges(data, player_ids)
+    start_date, end_date = fetch_window(ranges)
+    rows = await stats_repository.players_games(player_ids, start_date, end_date, columns)
+    if data.get("ranges"):
+        rows = [row for row in rows if in_range(row, ranges[row["player_id"]])]
+    return player_ids, rows
+
+
+@app.post("/player_statistics/batch")
+async def get_players_stats_batch(
+    request: Request,
+    username: str = Depends(get_current_username)
+):
+    """Player summaries for many players, fetched in one query and grouped in one pass."""
+    try:
+        data = await request.json()
+
+        columns = ["player_id", "game_date", *PLAYER_FIELDS]
+        player_ids, rows = await fetch_batch_player_games(data, columns)
 
-        response = {
-            "player": {
-                "player_id": player_id,
-                "clutch_stats": clutch_player_stats
+        by_player = player_summaries(rows, group_by="player_id")
+        return {
+            "stats": {
+                player_id: by_player.get(player_id, dict(EMPTY_PLAYER_SUMMARY))
+                for player_id in player_ids
             }
         }
-        return response
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(traceback.format_exc())
+        logger.exception("request failed", handler="get_players_stats_batch")
         raise HTTPException(status_code=500, detail=str(e))
-    
 
-@app.post("/favourite_team_data")
-async def get_favourite_team_data(
+
+@app.post("/get_clutch_factor/batch")
+async def get_clutch_factor_stats_batch(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
+    """Clutch summaries for many players, fetched in one query and grouped in one pass."""
     try:
         data = await request.json()
+        margin = clutch_margin(data)
 
-        team_id = data.get("team_id")
-
-        trivia_categories = "id, full_name, city, year_founded, logo_url"
-
-        statistical_categories = "teamId, home, game_date, win, assists, blocks, steals, turnovers, team_score, " \
-                                 "opponent_score, field_goals_made, field_goals_attempted, three_pointers_made, " \
-                                 "three_pointers_attempted, free_throws_made, free_throws_attempted, " \
-                                 "rebounds_total, fouls_personal"
-        last_n_games = 10
-
-        team_trivia_data = (supabase.table("teams") \
-                            .select(trivia_categories) \
-                            .eq("id", team_id) \
-                            .execute()
-                        ).data
-
-        team_form_stats = (supabase.table("team_statistics") \
-                           .select(statistical_categories)
-                           .eq("teamId", team_id)
-                           .order("game_date", desc=True)
-                           .limit(last_n_games)
-                           .execute()
-                        ).data
-        
-        for row in team_form_stats:
-            for key, value in row.items():
-                if isinstance(value, str):
-                    try:
-                        if value.isdigit():
-                            row[key] = int(value)
-                        else:
-                            row[key] = float(value)
-                    except:
-                        pass
-
-        team_stats_data = calculate_team_stats(team_form_stats)
-        form_string = "".join(["W" if row["win"] == 1 else "L" for row in team_form_stats])
-        form_string = form_string[::-1]
-
-        response = {
-            "team_id": team_id,
-            "trivia": team_trivia_data,
-            "stats": team_stats_data,
-            "form": form_string
+        columns = ["player_id", "game_date", "points", "field_goals_attempted", "field_goals_made",
+                   "game_id", "win", "home"]
+        player_ids, rows = await fetch_batch_player_games(data, columns)
+
+        await clutch_index.ensure(stats_repository, {row["game_id"] for row in rows})
+        by_player = clutch_summaries(clutch_index.clutch_games(rows, margin), group_by="player_id")
+        return {
+            "clutch_stats": {
+                player_id: by_player.get(player_id, dict(EMPTY_CLUTCH_SUMMARY))
+                for player_id in player_ids
+            }
         }
 
-        return response
-    
+    except HTTPException:
+        raise
     except Exception as e:
-        print(traceback.format_exc())
+        logger.exception("request failed", handler="get_clutch_factor_stats_batch")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/teams_statistics/batch")
+async def get_teams_stats_batch(
+    request: Request,
+    username: str = Depends(get_current_username)
+):
+    """Head-to-head series for many team pairs from a single team_statistics query."""
+    try:
+        data = await request.json()
+
+        pairs = [
+            (batch_id(pair.get("teamAId"), "teamAId"), batch_id(pair.get("teamBId"), "teamBId"))
+            for pair in data.get("pairs") or []
+        ]
+        last_n_games = data.get("numGames")
+        category = data.get("statistic")
+        all_categories = data.get("all_categories", False)
+        columnar = response_format(data) == COLUMNAR_FORMAT
+
+        if not pairs:
+            raise HTTPException(status_code=400, detail="pairs is required")
+        if len(pairs) > BATCH_MAX_ENTITIES:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ENTITIES} pairs per request")
+        if category not in MATCHUP_CATEGORIES:
+            raise HTTPException(status_code=400, detail=f"Unsupported statistic '{category}'")
+
+        directed = {key for a, b in pairs for key in ((a, b), (b, a))}
+        series = {key: matchup_index.cached(*key) for key in directed}
+        missing = [key for key, entry in series.items() if entry is None]
+        if missing:
+            team_ids = {team_id for key in missing for team_id in key}
+            rows = await stats_repository.teams_head_to_head(
+                team_ids, ["game_date", "teamId", "opponent_team_id", *MATCHUP_CATEGORIES]
+            )
+            series.update(matchup_index.prime(missing, rows))
+
+        matchups = {}
+        for first_team_id, second_team_id in pairs:
+            matchup = {}
+            for side, team_id, opponent_id in (
+                ("first_team", first_team_id, second_team_id),
+                ("second_team", second_team_id, first_team_id),
+            ):
+                team_series = series[(team_id, opponent_id)]
+                team = reference_cache.team(team_id)
+                matchup[side] = {
+                    "id": team_id,
+                    "name": {"data": [{"full_name": team["full_name"]}] if team else [], "count": None},
+                    "stats": team_series.last_games(category, last_n_games, columnar),
+                }
+                if all_categories:
+                    matchup[side]["all_stats"] = team_series.all_categories(last_n_games, columnar)
+            matchups[f"{first_team_id}-{second_team_id}"] = matchup
+
+        return FastJSONResponse({"matchups": matchups})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("request failed", handler="get_teams_stats_batch")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def favourite_team_data(data):
+    """Trivia and recent form for /favourite_team_data."""
+    team_id = data.get("team_id")
+
+    trivia_categories = ["id", "full_name", "city", "year_founded", "logo_url"]
+
+    last_n_games = TEAM_FORM_GAMES
+
+    team_trivia_data, team_form = await asyncio.gather(
+        stats_repository.team(team_id, trivia_categories),
+        shared_result(
+            "team_form",
+            [team_id, last_n_games],
+            lambda: team_form_index.record(stats_repository, team_id, last_n_games),
+        ),
+    )
+
+    response = {
+        "team_id": team_id,
+        "trivia": team_trivia_data,
+        "stats": team_form["stats"],
+        "form": team_form["form"]
+    }
+
+    return response
+
+
+@app.post("/favourite_team_data")
+async def get_favourite_team_data(
+    request: Request,
+    username: str = Depends(get_current_username)
+):
+    try:
+        data = await request.json()
+        return await response_flight.do((request.url.path, normalize_key(data)), lambda: favourite_team_data(data))
+
+    except Exception as e:
+        logger.exception("request failed", handler="get_favourite_team_data")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/favourite_team_data")
+async def get_favourite_team_data_cached(
+    request: Request,
+    team_id: int,
+    username: str = Depends(get_current_username)
+):
+    return await conditional_get(request, {"team_id": team_id}, favourite_team_data)
+
+
+async def favourite_player_data(data):
+    """Trivia and team logos for /favourite_player_data."""
+    player_id = data.get("player_id")
+
+    trivia_categories = [
+        "first_name", "last_name", "country", "birthdate", "height", "position",
+        "jersey", "team_id", "draft_team_id", "draft_number", "draft_year",
+    ]
+
+    player = reference_cache.player(player_id)
+    if player is None:
+        player_trivia_data = await stats_repository.active_player(player_id, trivia_categories)
+    else:
+        player_trivia_data = [{key: player.get(key) for key in trivia_categories}]
+
+    if not player_trivia_data:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    player = player_trivia_data[0]
+    team_id = player.get("team_id")
+    draft_team_id = player.get("draft_team_id")
+
+    team_logo_url = reference_cache.team_logo_url(team_id)
+
+    draft_team_logo_url = None
+    if draft_team_id and draft_team_id != -1:
+        draft_team_logo_url = reference_cache.team_logo_url(draft_team_id)
+
+    return {
+        "player_id": player_id,
+        "trivia": player_trivia_data,
+        "team_logo_url": team_logo_url,
+        "draft_team_logo_url": draft_team_logo_url,
+    }
+
+
 @app.post("/favourite_player_data")
 async def get_player_trivia_data(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    username: str = Depends(get_current_username)
 ):
     try:
         data = await request.json()
-        player_id = data.get("player_id")
+        return await response_flight.do((request.url.path, normalize_key(data)), lambda: favourite_player_data(data))
 
-        trivia_categories = (
-            "first_name, last_name, country, birthdate, height, position, "
-            "jersey, team_id, draft_team_id, draft_number, draft_year"
-        )
+    except Exception as e:
+        logger.exception("request failed", handler="get_player_trivia_data")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        player_trivia_data = (
-            supabase.table("active_players")
-            .select(trivia_categories)
-            .eq("player_id", player_id)
-            .execute()
-        ).data
 
-        if not player_trivia_data:
-            raise HTTPException(status_code=404, detail="Player not found")
+@app.get("/favourite_player_data")
+async def get_player_trivia_data_cached(
+    request: Request,
+    player_id: int,
+    username: str = Depends(get_current_username)
+):
+    return await conditional_get(request, {"player_id": player_id}, favourite_player_data)
+
+
+async def leaderboard_data(data):
+    """Active players ranked by one summary stat for /leaderboard."""
+    stat = data.get("stat")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    min_games = data.get("min_games", LEADERBOARD_MIN_GAMES)
+    limit = data.get("limit", LEADERBOARD_DEFAULT_LIMIT)
+
+    if stat not in LEADERBOARD_STATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported stat '{stat}'")
+    if not 1 <= limit <= LEADERBOARD_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {LEADERBOARD_MAX_LIMIT}")
+
+    board = await leaderboard_index.board(
+        stats_repository,
+        list(reference_cache.players_by_id),
+        stat,
+        dataset_version(stats_repository, reference_cache.version),
+        start_date,
+        end_date,
+        min_games,
+        limit,
+    )
 
-        player = player_trivia_data[0]
-        team_id = player.get("team_id")
-        draft_team_id = player.get("draft_team_id")
+    leaders = []
+    for leader in board["leaders"]:
+        player = reference_cache.player(leader["player_id"])
+        leaders.append({**leader, "name": player_full_name(player) if player else None})
 
-        team_logo_url = None
-        team_data = (
-            supabase.table("teams")
-            .select("logo_url")
-            .eq("id", team_id)
-            .maybe_single()
-            .execute()
-        )
+    return {
+        "stat": stat,
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_games": min_games,
+        "ranked_players": board["ranked"],
+        "leaders": leaders,
+    }
 
-        if team_data and team_data.data:
-            team_logo_url = team_data.data.get("logo_url")
 
-        draft_team_logo_url = None
-        if draft_team_id and draft_team_id != -1:
-            draft_team_data = (
-                supabase.table("teams")
-                .select("logo_url")
-                .eq("id", draft_team_id)
-                .maybe_single()
-                .execute()
-            )
-            if draft_team_data and draft_team_data.data:
-                draft_team_logo_url = draft_team_data.data.get("logo_url")
+@app.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    stat: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    min_games: int = LEADERBOARD_MIN_GAMES,
+    limit: int = LEADERBOARD_DEFAULT_LIMIT,
+    username: str = Depends(get_current_username)
+):
+    params = {"stat": stat, **date_params(start_date, end_date), "min_games": min_games, "limit": limit}
+    return await conditional_get(request, params, leaderboard_data)
 
-        return {
-            "player_id": player_id,
-            "trivia": player_trivia_data,
-            "team_logo_url": team_logo_url,
-            "draft_team_logo_url": draft_team_logo_url,
-        }
 
-    except Exception as e:
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+warmup.record("import", time.perf_counter() - IMPORT_STARTED)
+logger.info("app imported", seconds=warmup.timings["import"])
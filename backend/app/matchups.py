@@ -0,0 +1,97 @@
+"""
+Head-to-head matchup series for /teams_statistics.
+
+For each (team, opponent) pair the index keeps the full chronological game
+list of every tracked category, with the -1 "missing" markers already
+filtered out, so "last N games of category X" is a list slice. Pairs are
+loaded on first request, refreshed after MATCHUP_TTL_SECONDS and kept in
+an LRU of MATCHUP_INDEX_MAX_PAIRS entries (the 30-team league has 870).
+"""
+import os
+import time
+from collections import OrderedDict
+
+MATCHUP_TTL_SECONDS = float(os.getenv("MATCHUP_TTL_SECONDS", "3600"))
+MATCHUP_INDEX_MAX_PAIRS = int(os.getenv("MATCHUP_INDEX_MAX_PAIRS", "1000"))
+
+# Statistics the team comparison chart can switch between.
+MATCHUP_CATEGORIES = (
+    "assists", "turnovers", "team_score",
+    "q1_points", "q2_points", "q3_points", "q4_points",
+    "field_goals_percentage", "three_pointers_percentage", "free_throws_percentage",
+    "rebounds_total",
+)
+
+
+class MatchupSeries:
+    def __init__(self, rows):
+        self.loaded_at = time.monotonic()
+        self.values = {
+            category: [row[category] for row in rows if row.get(category) not in (None, -1)]
+            for category in MATCHUP_CATEGORIES
+        }
+
+    def last_games(self, category, last_n_games, columnar=False):
+        """Last N values of ``category``, oldest first, in the response row shape."""
+        values = self.values[category][-last_n_games:] if last_n_games else []
+        if columnar:
+            return columnar_series(values)
+        return [{category: value, "game_order": i} for i, value in enumerate(values, start=1)]
+
+    def all_categories(self, last_n_games, columnar=False):
+        return {
+            category: self.last_games(category, last_n_games, columnar)
+            for category in MATCHUP_CATEGORIES
+        }
+
+
+def columnar_series(values):
+    """Chart series as parallel arrays instead of one dict per game."""
+    return {"game_order": list(range(1, len(values) + 1)), "values": list(values)}
+
+
+class MatchupIndex:
+    def __init__(self, ttl=MATCHUP_TTL_SECONDS, max_pairs=MATCHUP_INDEX_MAX_PAIRS):
+        self.ttl = ttl
+        self.max_pairs = max_pairs
+        self.pairs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def series(self, repository, team_id, opponent_id):
+        key = (team_id, opponent_id)
+        entry = self.pairs.get(key)
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            self.misses += 1
+            rows = await repository.team_matchup_history(
+                team_id, opponent_id, ["game_date", *MATCHUP_CATEGORIES]
+            )
+            entry = MatchupSeries(rows)
+            self.pairs[key] = entry
+            if len(self.pairs) > self.max_pairs:
+                self.pairs.popitem(last=False)
+        else:
+            self.hits += 1
+        self.pairs.move_to_end(key)
+        return entry
+
+    def prime(self, pairs, rows):
+        """Load many pairs from one head-to-head result set (oldest first)."""
+        grouped = {pair: [] for pair in pairs}
+        for row in rows:
+            key = (row["teamId"], row["opponent_team_id"])
+            if key in grouped:
+                grouped[key].append(row)
+        series = {key: MatchupSeries(pair_rows) for key, pair_rows in grouped.items()}
+        for key, entry in series.items():
+            self.pairs[key] = entry
+            self.pairs.move_to_end(key)
+        while len(self.pairs) > self.max_pairs:
+            self.pairs.popitem(last=False)
+        return series
+
+    def cached(self, team_id, opponent_id):
+        entry = self.pairs.get((team_id, opponent_id))
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+        return entry
@@ -0,0 +1,201 @@
+"""
+In-process metrics served in the Prometheus text format at /metrics.
+
+- ``http_request_duration_seconds`` histogram and ``http_requests_total``
+  counter per (method, route, status), plus an ``http_requests_in_flight``
+  gauge;
+- ``backend_query_duration_seconds`` histogram and
+  ``backend_rows_fetched_total`` counter per (backend, query), recorded by
+  ``InstrumentedRepository`` around every repository call;
+- cache hits, misses and hit ratio per cache, read from the caches'
+  own counters at scrape time;
+- ``single_flight_calls_total`` per flight and outcome, counted by
+  app/single_flight.py;
+- ``startup_seconds`` per phase and a ``ready`` gauge, set by
+  app/warmup.py.
+
+Routes are labelled with their path template (``/teams_statistics``), not
+the raw URL, so label cardinality stays bounded. Each uvicorn worker keeps
+its own numbers.
+"""
+import functools
+import inspect
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, *labels, value):
+        """Mirror a count kept elsewhere (the caches keep their own hits/misses)."""
+        self.values[labels] = value
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., sum, count]
+        self.values = {}
+
+    def observe(self, *labels, value):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[i] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def samples(self):
+        names = (*self.label_names, "le")
+        for labels, entry in self.values.items():
+            for bound, count in zip(self.buckets, entry):
+                yield f"{self.name}_bucket", _labels(names, (*labels, bound)), count
+            yield f"{self.name}_bucket", _labels(names, (*labels, "+Inf")), entry[-1]
+            yield f"{self.name}_sum", _labels(self.label_names, labels), entry[-2]
+            yield f"{self.name}_count", _labels(self.label_names, labels), entry[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect):
+        """``collect()`` runs at scrape time, to copy counters kept elsewhere."""
+        self.collectors.append(collect)
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status")
+)
+http_requests = registry.counter(
+    "http_requests_total", "Requests served by route.", ("method", "route", "status")
+)
+http_in_flight = registry.gauge("http_requests_in_flight", "Requests currently being served.")
+backend_query_duration = registry.histogram(
+    "backend_query_duration_seconds", "Repository call latency.", ("backend", "query")
+)
+backend_rows = registry.counter(
+    "backend_rows_fetched_total", "Rows returned by repository calls.", ("backend", "query")
+)
+backend_errors = registry.counter(
+    "backend_query_errors_total", "Repository calls that raised.", ("backend", "query")
+)
+cache_hits = registry.counter("cache_hits_total", "Cache hits.", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Cache misses.", ("cache",))
+cache_hit_ratio = registry.gauge("cache_hit_ratio", "Cache hits / lookups.", ("cache",))
+single_flight_calls = registry.counter(
+    "single_flight_calls_total", "Coalesced calls by outcome (leader, coalesced, recent).", ("flight", "outcome")
+)
+startup_seconds = registry.gauge(
+    "startup_seconds", "Import, warm-up step, warm-up and import-to-ready durations.", ("phase",)
+)
+ready = registry.gauge("ready", "1 once warm-up has finished.")
+ready.set(value=0)
+
+
+def track_caches(caches):
+    """Publish ``hits``/``misses`` of each object in ``caches`` (name -> cache) on scrape."""
+    def collect():
+        for name, cache in caches.items():
+            lookups = cache.hits + cache.misses
+            cache_hits.set(name, value=cache.hits)
+            cache_misses.set(name, value=cache.misses)
+            cache_hit_ratio.set(name, value=round(cache.hits / lookups, 4) if lookups else 0)
+
+    registry.add_collector(collect)
+
+
+class InstrumentedRepository:
+    """Wraps a repository so every async call is timed and its rows counted."""
+
+    def __init__(self, repository, backend):
+        self.repository = repository
+        self.backend = backend
+
+    def __getattr__(self, name):
+        attribute = getattr(self.repository, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await attribute(*args, **kwargs)
+            except Exception:
+                backend_errors.inc(self.backend, name)
+                raise
+            finally:
+                backend_query_duration.observe(self.backend, name, value=time.perf_counter() - started)
+            if isinstance(result, list):
+                backend_rows.inc(self.backend, name, amount=len(result))
+            return result
+
+        return timed
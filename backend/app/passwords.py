@@ -0,0 +1,92 @@
+"""
+bcrypt hashing off the event loop.
+
+Hashes run on a dedicated thread pool of PASSWORD_HASH_WORKERS threads
+(bcrypt releases the GIL while hashing). At most PASSWORD_HASH_MAX_PENDING
+hashes may be running or queued; past that the request fails fast with a
+503 instead of piling up behind a login burst and starving stats requests.
+
+BCRYPT_ROUNDS sets the cost of new hashes. Stored hashes with a different
+cost are re-hashed on the next successful login (see ``needs_rehash``).
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+# bcrypt ignores everything past 72 bytes; newer versions raise instead.
+MAX_PASSWORD_BYTES = 72
+
+
+def password_bytes(password):
+    return password.encode("utf-8")[:MAX_PASSWORD_BYTES]
+
+
+def hash_cost(hashed):
+    """Cost factor of a '$2b$12$...' hash, or None if it can't be parsed."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = None
+
+    def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many login attempts, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        self.pending -= 1
+        self.completed += 1
+
+    async def hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._submit(bcrypt.hashpw, password_bytes(password), salt)
+        return hashed.decode("utf-8")
+
+    async def verify(self, password, hashed):
+        return await self._submit(bcrypt.checkpw, password_bytes(password), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed):
+        return hash_cost(hashed) != self.rounds
+
+    def stats(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,121 @@
+"""
+Per-player prefix sums for O(1) date-range summaries.
+
+For each player the index keeps the sorted game dates and a cumulative sum
+of the PLAYER_FIELDS columns with a leading zero row, so the totals for any
+date range are two binary searches and one subtraction:
+
+    lo, hi = searchsorted(dates, start), searchsorted(dates, end, "right")
+    totals = cumsum[hi] - cumsum[lo]
+
+Box-score values are whole numbers, so the sums are exact and the summary
+matches calculate_player_summary. A player whose history contains
+fractional values keeps the raw rows and is summed directly instead.
+
+A player's history is loaded on first request. Once it is older than
+PREFIX_INDEX_TTL_SECONDS only the games after the last indexed date are
+fetched and appended, without recomputing the existing sums.
+"""
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.aggregation import EMPTY_PLAYER_SUMMARY, PLAYER_FIELDS, group_totals, player_summaries_from_totals
+from app.store import parse_day
+
+PREFIX_INDEX_TTL_SECONDS = float(os.getenv("PREFIX_INDEX_TTL_SECONDS", "3600"))
+PREFIX_INDEX_MAX_PLAYERS = int(os.getenv("PREFIX_INDEX_MAX_PLAYERS", "2000"))
+
+HISTORY_COLUMNS = ["game_id", "game_date", *PLAYER_FIELDS]
+
+
+class PlayerPrefixSums:
+    def __init__(self, rows):
+        self.game_ids = set()
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.raw = np.empty((0, len(PLAYER_FIELDS)))
+        self.cumsum = np.zeros((1, len(PLAYER_FIELDS)))
+        self.exact = True
+        self.refreshed_at = time.monotonic()
+        self.append(rows)
+
+    def append(self, rows):
+        """Add new games; only the appended rows are summed."""
+        rows = [row for row in rows if row["game_id"] not in self.game_ids]
+        if not rows:
+            return
+
+        dates = np.array([parse_day(row["game_date"]) for row in rows], dtype="datetime64[D]")
+        values = np.array([[row.get(field) or 0 for field in PLAYER_FIELDS] for row in rows], dtype=np.float64)
+        order = np.argsort(dates, kind="stable")
+        dates, values = dates[order], values[order]
+        self.game_ids.update(row["game_id"] for row in rows)
+
+        if len(self.dates) and dates[0] < self.dates[-1]:
+            # Out of order: re-sort everything, still without refetching.
+            dates = np.concatenate((self.dates, dates))
+            values = np.concatenate((self.raw, values))
+            order = np.argsort(dates, kind="stable")
+            self.dates, self.raw = dates[order], values[order]
+            self.exact = bool(np.all(self.raw == np.round(self.raw)))
+            self.cumsum = np.vstack((np.zeros((1, len(PLAYER_FIELDS))), np.cumsum(self.raw, axis=0)))
+            return
+
+        self.dates = np.concatenate((self.dates, dates))
+        self.raw = np.concatenate((self.raw, values))
+        self.exact = self.exact and bool(np.all(values == np.round(values)))
+        self.cumsum = np.vstack((self.cumsum, self.cumsum[-1] + np.cumsum(values, axis=0)))
+
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def totals(self, start_date=None, end_date=None):
+        """(games, totals) for the inclusive date range."""
+        lo = int(np.searchsorted(self.dates, parse_day(start_date), side="left")) if start_date else 0
+        hi = int(np.searchsorted(self.dates, parse_day(end_date), side="right")) if end_date else len(self.dates)
+        if hi <= lo:
+            return 0, None
+        if self.exact:
+            return hi - lo, self.cumsum[hi] - self.cumsum[lo]
+        _, _, totals = group_totals(self.raw[lo:hi])
+        return hi - lo, totals[0]
+
+    def summary(self, start_date=None, end_date=None):
+        games, totals = self.totals(start_date, end_date)
+        if not games:
+            return dict(EMPTY_PLAYER_SUMMARY)
+        return player_summaries_from_totals([None], np.array([games]), totals[None, :])[None]
+
+
+class PrefixSumIndex:
+    def __init__(self, ttl=PREFIX_INDEX_TTL_SECONDS, max_players=PREFIX_INDEX_MAX_PLAYERS):
+        self.ttl = ttl
+        self.max_players = max_players
+        self.players = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def player(self, repository, player_id):
+        entry = self.players.get(player_id)
+        if entry is None:
+            self.misses += 1
+            rows = await repository.player_games(player_id, None, None, HISTORY_COLUMNS)
+            entry = PlayerPrefixSums(rows)
+            self.players[player_id] = entry
+            if len(self.players) > self.max_players:
+                self.players.popitem(last=False)
+        elif time.monotonic() - entry.refreshed_at > self.ttl:
+            last_date = entry.last_date()
+            since = None if last_date is None else str(last_date)
+            entry.append(await repository.player_games(player_id, since, None, HISTORY_COLUMNS))
+            entry.refreshed_at = time.monotonic()
+        else:
+            self.hits += 1
+        self.players.move_to_end(player_id)
+        return entry
+
+    async def summary(self, repository, player_id, start_date, end_date):
+        entry = await self.player(repository, player_id)
+        return entry.summary(start_date, end_date)
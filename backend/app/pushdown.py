@@ -0,0 +1,240 @@
+"""
+Summary queries pushed down to a SQL engine.
+
+Instead of fetching every box-score row of a date range and summing it in
+Python, /player_statistics and /get_clutch_factor can ask the database for
+the totals: one statement per request, aggregated with GROUP BY (and, for
+clutch games, joined with ``team_statistics`` on (game_id, home) to read
+the final margin). Only one row of totals comes back. It is formatted
+with the app/aggregation.py helpers, so the output is identical to
+statistics.py.
+
+The engine is picked with the ``SUMMARY_BACKEND`` environment variable:
+
+- ``index`` (default): no push-down. Keep the in-process prefix sums and
+  clutch index.
+- ``postgres``: call the ``player_summary_totals`` and
+  ``clutch_summary_totals`` functions over Supabase RPC. Create them once
+  with backend/sql/summary_functions.sql.
+- ``sqlite``: query an embedded SQLite file, for local runs without
+  Supabase. Build it from the columnar store or from Supabase with:
+
+    python -m app.pushdown build --source store
+
+Dates are compared by day (the first ten characters of ``game_date``), like
+the prefix-sum index. A range without clutch games summarizes to zeros.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.aggregation import (
+    CLUTCH_FIELDS,
+    EMPTY_CLUTCH_SUMMARY,
+    EMPTY_PLAYER_SUMMARY,
+    PLAYER_FIELDS,
+    clutch_summaries_from_totals,
+    player_summaries_from_totals,
+)
+from app.clutch import CLUTCH_MARGIN
+from app.metrics import InstrumentedRepository
+from app.store import STORE_DIR, ColumnarStore, column_array, fetch_table, to_python
+
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "index")
+SUMMARY_SQLITE_PATH = os.getenv(
+    "SUMMARY_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "summaries.sqlite"),
+)
+
+SQLITE_COLUMNS = {
+    "player_statistics": ["player_id", "game_id", "game_date", "home", *PLAYER_FIELDS, "win"],
+    "team_statistics": ["game_id", "home", "team_score", "opponent_score"],
+}
+
+SQLITE_INDEXES = (
+    "CREATE INDEX player_statistics_player_date ON player_statistics (player_id, game_date)",
+    "CREATE INDEX team_statistics_game_home ON team_statistics (game_id, home)",
+)
+
+# Same statements as backend/sql/summary_functions.sql, in SQLite's dialect.
+PLAYER_TOTALS_SQL = f"""
+SELECT player_id, COUNT(*), {", ".join(f"SUM({field})" for field in PLAYER_FIELDS)}
+FROM player_statistics
+WHERE player_id = :player_id
+  AND (:start_date IS NULL OR game_date >= :start_date)
+  AND (:end_date IS NULL OR game_date <= :end_date)
+GROUP BY player_id
+"""
+
+CLUTCH_TOTALS_SQL = f"""
+SELECT p.player_id, COUNT(*), {", ".join(f"SUM(p.{field})" for field in CLUTCH_FIELDS)}
+FROM player_statistics p
+JOIN team_statistics t ON t.game_id = p.game_id AND t.home = p.home
+WHERE p.player_id = :player_id
+  AND (:start_date IS NULL OR p.game_date >= :start_date)
+  AND (:end_date IS NULL OR p.game_date <= :end_date)
+  AND ABS(t.team_score - t.opponent_score) <= :margin
+GROUP BY p.player_id
+"""
+
+
+def _day(value):
+    return None if value in (None, "") else str(value)[:10]
+
+
+def _totals(row):
+    """(games, totals) from a [games, sum, sum, ...] result row."""
+    if not row or not row[0]:
+        return 0, None
+    return int(row[0]), np.array([0 if value is None else value for value in row[1:]], dtype=np.float64)
+
+
+class SqlSummaries:
+    """Formats the totals a subclass fetches with ``_player_totals``/``_clutch_totals``."""
+
+    async def player_summary(self, player_id, start_date=None, end_date=None):
+        games, totals = await self._player_totals(int(player_id), _day(start_date), _day(end_date))
+        if not games:
+            return dict(EMPTY_PLAYER_SUMMARY)
+        return player_summaries_from_totals([None], np.array([games]), totals[None, :])[None]
+
+    async def clutch_summary(self, player_id, start_date=None, end_date=None, margin=CLUTCH_MARGIN):
+        games, totals = await self._clutch_totals(int(player_id), _day(start_date), _day(end_date), margin)
+        if not games:
+            return dict(EMPTY_CLUTCH_SUMMARY)
+        return clutch_summaries_from_totals([None], np.array([games]), totals[None, :])[None]
+
+    async def aclose(self):
+        pass
+
+
+class PostgresSummaries(SqlSummaries):
+    """Totals from the SQL functions in backend/sql/summary_functions.sql."""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def _rpc(self, function, params, fields):
+        rows = (await self.supabase.rpc(function, params).execute()).data or []
+        if not rows:
+            return 0, None
+        row = rows[0]
+        return _totals([row["games"], *(row[field] for field in fields)])
+
+    async def _player_totals(self, player_id, start_date, end_date):
+        return await self._rpc(
+            "player_summary_totals",
+            {"p_player_id": player_id, "p_start_date": start_date, "p_end_date": end_date},
+            PLAYER_FIELDS,
+        )
+
+    async def _clutch_totals(self, player_id, start_date, end_date, margin):
+        return await self._rpc(
+            "clutch_summary_totals",
+            {"p_player_id": player_id, "p_start_date": start_date, "p_end_date": end_date, "p_margin": margin},
+            CLUTCH_FIELDS,
+        )
+
+
+class SqliteSummaries(SqlSummaries):
+    """Totals from a local SQLite file, queried on worker threads."""
+
+    def __init__(self, path=SUMMARY_SQLITE_PATH):
+        if not os.path.exists(path):
+            raise RuntimeError(f"No summary database at {path}; build it with python -m app.pushdown build")
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across threads; open one per worker thread.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+
+    def _query(self, sql, params):
+        row = self._connection().execute(sql, params).fetchone()
+        return _totals(row[1:] if row else None)
+
+    async def _player_totals(self, player_id, start_date, end_date):
+        params = {"player_id": player_id, "start_date": start_date, "end_date": end_date}
+        return await asyncio.to_thread(self._query, PLAYER_TOTALS_SQL, params)
+
+    async def _clutch_totals(self, player_id, start_date, end_date, margin):
+        params = {"player_id": player_id, "start_date": start_date, "end_date": end_date, "margin": margin}
+        return await asyncio.to_thread(self._query, CLUTCH_TOTALS_SQL, params)
+
+
+def create_summaries(async_supabase, backend=SUMMARY_BACKEND):
+    """SQL summary backend for ``backend``, or None to keep the in-process indexes."""
+    if backend == "index":
+        return None
+    if backend == "postgres":
+        return InstrumentedRepository(PostgresSummaries(async_supabase), backend)
+    if backend == "sqlite":
+        return InstrumentedRepository(SqliteSummaries(), backend)
+    raise RuntimeError(f"Unknown SUMMARY_BACKEND '{backend}'")
+
+
+def _source_arrays(source, table):
+    """Typed column arrays of ``table`` from the columnar store or Supabase."""
+    columns = SQLITE_COLUMNS[table]
+    if source == "store":
+        store_table = ColumnarStore(STORE_DIR).table(table)
+        return {name: store_table.column(name) for name in columns}
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    raw = fetch_table(supabase, table)
+    return {name: column_array(name, raw[name]) for name in columns}
+
+
+def build_sqlite(source, path=SUMMARY_SQLITE_PATH):
+    """Write a fresh summary database next to ``path`` and swap it in."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    counts = {}
+    with sqlite3.connect(tmp_path) as connection:
+        for table, columns in SQLITE_COLUMNS.items():
+            arrays = _source_arrays(source, table)
+            connection.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+            values = zip(*(to_python(arrays[name]) for name in columns))
+            placeholders = ", ".join("?" * len(columns))
+            connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", values)
+            counts[table] = len(arrays[columns[0]])
+        for statement in SQLITE_INDEXES:
+            connection.execute(statement)
+    connection.close()
+    os.replace(tmp_path, path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SQLite database for SUMMARY_BACKEND=sqlite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--source", choices=["store", "supabase"], default="store")
+    build.add_argument("--out", default=SUMMARY_SQLITE_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = build_sqlite(args.source, args.out)
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+    print(f"Summary database written to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+In-process cache for the ``teams`` and ``active_players`` tables.
+
+Both tables change about once a day, so they are loaded at startup and
+served from memory by id and by name. Once ``REFERENCE_TTL_SECONDS`` have
+passed the next lookup triggers a background reload while the current data
+keeps being served. Derived entries (search results and the like) live in
+a small LRU so they can't grow without bound. Name searches go through
+the typeahead indexes in app/search.py.
+
+Both tables can also be paged through in id order with ``page``. Its
+keyset cursor is the last id of the previous page, encoded as an opaque
+string by ``encode_cursor``, so a page stays correct across reloads.
+The ids are sorted and counted once per load.
+
+Player image URLs are resolved in bulk on each load: the image bucket is
+listed once, every active player gets a public URL, and players without an
+image file get the placeholder. The map is only rebuilt when the roster or
+the bucket listing changed.
+"""
+import asyncio
+import base64
+import bisect
+import os
+import time
+from collections import OrderedDict
+
+from app.log import get_logger
+from app.search import NameIndex, normalize
+
+logger = get_logger(__name__)
+
+REFERENCE_TTL_SECONDS = float(os.getenv("REFERENCE_TTL_SECONDS", "3600"))
+REFERENCE_LRU_SIZE = int(os.getenv("REFERENCE_LRU_SIZE", "1024"))
+
+PLAYER_IMAGE_BUCKET = "Player images"
+PLACEHOLDER_IMAGE_URL = "https://upload.wikimedia.org/wikipedia/commons/8/89/Portrait_Placeholder.png"
+
+
+def player_full_name(player):
+    return f"{player['first_name']} {player['last_name']}"
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Id a cursor from ``encode_cursor`` points after; ValueError if it is malformed."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class ReferenceCache:
+    def __init__(self, ttl=REFERENCE_TTL_SECONDS, lru_size=REFERENCE_LRU_SIZE):
+        self.ttl = ttl
+        self.lru_size = lru_size
+        self.repository = None
+        self.loaded_at = None
+        self.version = 0
+        self.teams = []
+        self.players = []
+        self.teams_by_id = {}
+        self.teams_by_name = {}
+        self.players_by_id = {}
+        self.players_by_name = {}
+        self.sorted_ids = {"teams": [], "players": []}
+        self.team_index = NameIndex([])
+        self.player_index = NameIndex([])
+        self.image_urls = {}
+        self.missing_images = set()
+        self._image_signature = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+    async def load(self, repository):
+        """Load both tables. Called from the app lifespan and on refresh."""
+        self.repository = repository
+        async with self._lock:
+            teams, players, image_files = await asyncio.gather(
+                repository.all_rows("teams", "id"),
+                repository.all_rows("active_players", "player_id"),
+                self._image_files(repository),
+            )
+            self.teams = teams
+            self.players = players
+            self.teams_by_id = {team["id"]: team for team in teams}
+            self.teams_by_name = {normalize(team["full_name"]): team for team in teams}
+            self.players_by_id = {player["player_id"]: player for player in players}
+            self.players_by_name = {normalize(player_full_name(player)): player for player in players}
+            self.sorted_ids = {"teams": sorted(self.teams_by_id), "players": sorted(self.players_by_id)}
+            self.team_index = NameIndex((team["id"], team["full_name"]) for team in teams)
+            self.player_index = NameIndex(
+                (player["player_id"], player_full_name(player)) for player in players
+            )
+            await self._build_image_urls(repository, image_files)
+            self.entries.clear()
+            self.loaded_at = time.monotonic()
+            self.version += 1
+            self.refreshes += 1
+
+    async def _image_files(self, repository):
+        try:
+            return await repository.storage_files(PLAYER_IMAGE_BUCKET)
+        except Exception:
+            # Without a listing every player is assumed to have an image.
+            logger.exception("player image listing failed")
+            return None
+
+    async def _build_image_urls(self, repository, image_files):
+        signature = (
+            frozenset(self.players_by_id),
+            None if image_files is None else frozenset(
+                (f["name"], f.get("updated_at")) for f in image_files
+            ),
+        )
+        if signature == self._image_signature:
+            return
+
+        existing = None if image_files is None else {f["name"] for f in image_files}
+        image_urls = {}
+        missing_images = set()
+        for player_id in self.players_by_id:
+            image_path = f"{player_id}.png"
+            if existing is not None and image_path not in existing:
+                missing_images.add(player_id)
+                image_urls[player_id] = PLACEHOLDER_IMAGE_URL
+            else:
+                image_urls[player_id] = await repository.public_url(PLAYER_IMAGE_BUCKET, image_path)
+
+        self.image_urls = image_urls
+        self.missing_images = missing_images
+        self._image_signature = signature
+
+    def invalidate(self):
+        """Drop everything; the next lookup reloads in the background."""
+        self.entries.clear()
+        self._image_signature = None
+        self.loaded_at = None
+
+    def is_stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    def _refresh_if_stale(self):
+        if not self.is_stale() or self.repository is None:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+
+    async def _refresh(self):
+        try:
+            await self.load(self.repository)
+        except Exception:
+            logger.exception("reference cache refresh failed")
+
+    def _lookup(self, mapping, key):
+        self._refresh_if_stale()
+        value = mapping.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def team(self, team_id):
+        return self._lookup(self.teams_by_id, team_id)
+
+    def team_by_name(self, name):
+        return self._lookup(self.teams_by_name, normalize(name))
+
+    def player(self, player_id):
+        return self._lookup(self.players_by_id, player_id)
+
+    def player_by_name(self, name):
+        return self._lookup(self.players_by_name, normalize(name))
+
+    def page(self, table, after, limit):
+        """(rows, total, last id or None) of the ``table`` page after id ``after``."""
+        self._refresh_if_stale()
+        ids = self.sorted_ids[table]
+        by_id = self.teams_by_id if table == "teams" else self.players_by_id
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        page_ids = ids[start:start + limit]
+        last_id = page_ids[-1] if start + limit < len(ids) else None
+        return [by_id[row_id] for row_id in page_ids], len(ids), last_id
+
+    def search_teams(self, query, limit):
+        self._refresh_if_stale()
+        return [self.teams_by_id[team_id] for team_id, _ in self.team_index.search(query, limit)]
+
+    def search_players(self, query, limit):
+        self._refresh_if_stale()
+        return [self.players_by_id[player_id] for player_id, _ in self.player_index.search(query, limit)]
+
+    def image_url(self, player_id):
+        return self.image_urls.get(player_id, PLACEHOLDER_IMAGE_URL)
+
+    def team_logo_url(self, team_id):
+        team = self.team(team_id)
+        return team.get("logo_url") if team else None
+
+    def cached(self, key, compute):
+        """LRU-bounded secondary entry derived from the reference tables."""
+        self._refresh_if_stale()
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        value = compute()
+        self.entries[key] = value
+        if len(self.entries) > self.lru_size:
+            self.entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "teams": len(self.teams),
+            "players": len(self.players),
+            "entries": len(self.entries),
+            "missing_images": len(self.missing_images),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            "refreshes": self.refreshes,
+            "age_seconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+        }
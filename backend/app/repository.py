@@ -0,0 +1,353 @@
+"""
+Data access for the box-score and reference tables.
+
+The stat endpoints read through a repository instead of calling Supabase
+directly. Every method is async: Supabase is queried with the async client
+over one pooled keep-alive ``httpx.AsyncClient``, so a slow query no longer
+blocks the event loop and independent queries can run concurrently.
+
+The box-score source can be switched with the ``STATS_BACKEND``
+environment variable:
+
+- ``supabase`` (default): query the Supabase tables.
+- ``store``: read the local memory-mapped columnar store (see app/store.py).
+  The ``teams`` and ``active_players`` tables still come from Supabase.
+"""
+import asyncio
+import os
+
+import httpx
+import numpy as np
+
+from app.aggregation import PLAYER_FIELDS, group_totals, to_matrix
+from app.log import get_logger
+from app.metrics import InstrumentedRepository
+from app.store import STORE_DIR, ColumnarStore, parse_day
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+logger = get_logger(__name__)
+
+STATS_BACKEND = os.getenv("STATS_BACKEND", "supabase")
+
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+
+# Keeps .in_() filters well under PostgREST's URL length limit.
+IN_FILTER_CHUNK = 200
+
+# PostgREST caps a response at 1000 rows by default.
+PAGE_SIZE = 1000
+
+
+async def create_async_supabase(url, key):
+    """Async Supabase client sharing one bounded, keep-alive connection pool."""
+    # supabase pulls in auth, realtime and storage clients; import it on first use, not with the app.
+    from supabase import AsyncClientOptions, acreate_client
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+        ),
+        timeout=SUPABASE_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        # httpx needs the h2 package for HTTP/2 (httpx[http2]); fall back to HTTP/1.1.
+        http2=h2 is not None,
+    )
+    return await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+
+
+class SupabaseRepository:
+    def __init__(self, supabase):
+        self.supabase = supabase
+        # Live tables carry no version; app/http_cache.py falls back to DATASET_VERSION.
+        self.version = None
+        # Cleared when the players_range_totals SQL function is missing.
+        self.range_totals_rpc = True
+
+    async def _paged(self, build_query):
+        """Run ``build_query()`` page by page so results aren't cut at PAGE_SIZE."""
+        rows = []
+        while True:
+            # Query builders are mutable, so each page gets a fresh one.
+            page = (await build_query().range(len(rows), len(rows) + PAGE_SIZE - 1).execute()).data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+
+    def _player_games_query(self, columns, start_date, end_date, desc):
+        query = self.supabase.table("player_statistics").select(", ".join(columns))
+        if start_date:
+            query = query.gte("game_date", start_date)
+        if end_date:
+            query = query.lte("game_date", end_date)
+        return query.order("game_date", desc=desc).order("game_id", desc=desc)
+
+    async def player_games(self, player_id, start_date, end_date, columns, desc=False):
+        return await self._paged(
+            lambda: self._player_games_query(columns, start_date, end_date, desc).eq("player_id", player_id)
+        )
+
+    async def player_games_after(self, player_id, start_date, end_date, columns, after=None, limit=PAGE_SIZE):
+        """
+        One keyset page of a player's games in (game_date, game_id) order.
+
+        ``after`` is the (game_date, game_id) of the last row already read;
+        unlike .range() offsets, each page is an index seek however deep it is.
+        """
+        query = self._player_games_query(columns, start_date, end_date, False).eq("player_id", player_id)
+        if after is not None:
+            game_date, game_id = after
+            query = query.or_(f'game_date.gt."{game_date}",and(game_date.eq."{game_date}",game_id.gt.{game_id})')
+        return (await query.limit(limit).execute()).data or []
+
+    async def players_games(self, player_ids, start_date, end_date, columns):
+        """Box scores of many players in one (chunked) query."""
+        player_ids = list(player_ids)
+        chunks = await asyncio.gather(*(
+            self._paged(
+                lambda ids=player_ids[i:i + IN_FILTER_CHUNK]:
+                    self._player_games_query(columns, start_date, end_date, False).in_("player_id", ids)
+            )
+            for i in range(0, len(player_ids), IN_FILTER_CHUNK)
+        ))
+        return [row for chunk in chunks for row in chunk]
+
+    async def players_range_totals(self, player_ids, start_date, end_date):
+        """
+        (player_ids, counts, totals over PLAYER_FIELDS) of every player with games in the range.
+
+        Summed in Postgres by ``players_range_totals`` from
+        backend/sql/summary_functions.sql, one call per IN_FILTER_CHUNK players.
+        Without that function the rows are fetched and summed here instead.
+        """
+        player_ids = [int(player_id) for player_id in player_ids]
+        params = {"p_start_date": start_date or None, "p_end_date": end_date or None}
+        chunks = None
+        if self.range_totals_rpc:
+            try:
+                chunks = await asyncio.gather(*(
+                    self.supabase.rpc(
+                        "players_range_totals", {"p_player_ids": player_ids[i:i + IN_FILTER_CHUNK], **params}
+                    ).execute()
+                    for i in range(0, len(player_ids), IN_FILTER_CHUNK)
+                ))
+            except Exception:
+                logger.exception("players_range_totals unavailable, summing rows in the app")
+                self.range_totals_rpc = False
+        if chunks is None:
+            rows = await self.players_games(player_ids, start_date, end_date, ["player_id", *PLAYER_FIELDS])
+            keys, counts, totals = group_totals(to_matrix(rows, PLAYER_FIELDS), [row["player_id"] for row in rows])
+            return np.asarray(keys, dtype=np.int64), counts, totals
+
+        rows = sorted((row for chunk in chunks for row in chunk.data or []), key=lambda row: row["player_id"])
+        return (
+            np.array([row["player_id"] for row in rows], dtype=np.int64),
+            np.array([row["games"] for row in rows], dtype=np.int64),
+            to_matrix(rows, PLAYER_FIELDS),
+        )
+
+    async def team_matchup_games(self, team_id, opponent_id, category, last_n_games, columns):
+        return (await (
+            self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .eq("teamId", team_id)
+            .eq("opponent_team_id", opponent_id)
+            .neq(category, -1)
+            .order("game_date", desc=True)
+            .limit(last_n_games)
+            .execute()
+        )).data or []
+
+    async def team_matchup_history(self, team_id, opponent_id, columns):
+        """Every game of team_id against opponent_id, oldest first."""
+        return (await (
+            self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .eq("teamId", team_id)
+            .eq("opponent_team_id", opponent_id)
+            .order("game_date")
+            .execute()
+        )).data or []
+
+    async def teams_head_to_head(self, team_ids, columns):
+        """Every game between any two of ``team_ids``."""
+        team_ids = list(team_ids)
+        return await self._paged(
+            lambda: self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .in_("teamId", team_ids)
+            .in_("opponent_team_id", team_ids)
+            .order("game_date")
+            .order("game_id")
+        )
+
+    async def team_recent_games(self, team_id, last_n_games, columns):
+        return (await (
+            self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .eq("teamId", team_id)
+            .order("game_date", desc=True)
+            .limit(last_n_games)
+            .execute()
+        )).data or []
+
+    async def team_games_since(self, team_id, since, columns):
+        """Games of team_id on or after ``since``, oldest first."""
+        return await self._paged(
+            lambda: self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .eq("teamId", team_id)
+            .gte("game_date", since)
+            .order("game_date")
+            .order("game_id")
+        )
+
+    async def team_games_by_ids(self, game_ids, columns):
+        game_ids = list(game_ids)
+        chunks = await asyncio.gather(*(
+            self.supabase.table("team_statistics")
+            .select(", ".join(columns))
+            .in_("game_id", game_ids[i:i + IN_FILTER_CHUNK])
+            .execute()
+            for i in range(0, len(game_ids), IN_FILTER_CHUNK)
+        ))
+        return [row for chunk in chunks for row in chunk.data or []]
+
+    async def team(self, team_id, columns):
+        return (await (
+            self.supabase.table("teams")
+            .select(", ".join(columns))
+            .eq("id", team_id)
+            .execute()
+        )).data or []
+
+    async def active_player(self, player_id, columns):
+        return (await (
+            self.supabase.table("active_players")
+            .select(", ".join(columns))
+            .eq("player_id", player_id)
+            .execute()
+        )).data or []
+
+    async def all_rows(self, table, order, columns="*"):
+        """Page through a whole (small) table ordered by ``order``."""
+        return await self._paged(lambda: self.supabase.table(table).select(columns).order(order))
+
+    async def storage_files(self, bucket):
+        """Every object in a storage bucket, as returned by the storage API."""
+        files = []
+        while True:
+            page = await self.supabase.storage.from_(bucket).list(
+                options={"limit": PAGE_SIZE, "offset": len(files)}
+            )
+            files.extend(page)
+            if len(page) < PAGE_SIZE:
+                return files
+
+    async def public_url(self, bucket, path):
+        return await self.supabase.storage.from_(bucket).get_public_url(path)
+
+    async def aclose(self):
+        await self.supabase.postgrest.aclose()
+
+
+class StoreRepository:
+    def __init__(self, store, reference):
+        self.store = store
+        self.reference = reference
+        self.version = store.version
+        self.players = store.table("player_statistics")
+        self.teams = store.table("team_statistics")
+
+    async def player_games(self, player_id, start_date, end_date, columns, desc=False):
+        span = self.players.key_range(int(player_id), start_date, end_date)
+        return self.players.rows(span, columns, desc=desc)
+
+    async def player_games_after(self, player_id, start_date, end_date, columns, after=None, limit=PAGE_SIZE):
+        if after is not None:
+            start_date = after[0]
+        lo, hi = self.players.key_range(int(player_id), start_date, end_date)
+        positions = np.arange(lo, hi)
+        if after is not None:
+            day = parse_day(after[0])
+            dates = self.players.column("game_date")[positions]
+            game_ids = self.players.column("game_id")[positions]
+            positions = positions[(dates > day) | ((dates == day) & (game_ids > after[1]))]
+        return self.players.rows(positions[:limit], columns)
+
+    async def players_games(self, player_ids, start_date, end_date, columns):
+        spans = [self.players.key_range(int(player_id), start_date, end_date) for player_id in player_ids]
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in spans]) if spans else np.empty(0, dtype=np.int64)
+        return self.players.rows(positions, columns)
+
+    async def players_range_totals(self, player_ids, start_date, end_date):
+        player_ids = np.unique(np.asarray(list(player_ids), dtype=np.int64))
+        spans = [self.players.key_range(int(player_id), start_date, end_date) for player_id in player_ids]
+        counts, totals = self.players.span_sums(spans, PLAYER_FIELDS)
+        played = counts > 0
+        return player_ids[played], counts[played], totals[played]
+
+    async def team_matchup_games(self, team_id, opponent_id, category, last_n_games, columns):
+        span = self.teams.key_range(int(team_id))
+        return self.teams.rows(
+            span,
+            columns,
+            eq={"opponent_team_id": int(opponent_id)},
+            neq={category: -1},
+            desc=True,
+            limit=last_n_games,
+        )
+
+    async def team_matchup_history(self, team_id, opponent_id, columns):
+        span = self.teams.key_range(int(team_id))
+        return self.teams.rows(span, columns, eq={"opponent_team_id": int(opponent_id)})
+
+    async def teams_head_to_head(self, team_ids, columns):
+        team_ids = [int(team_id) for team_id in team_ids]
+        positions = np.concatenate([np.arange(*self.teams.key_range(team_id)) for team_id in team_ids])
+        opponents = self.teams.column("opponent_team_id")[positions]
+        return self.teams.rows(positions[np.isin(opponents, team_ids)], columns)
+
+    async def team_recent_games(self, team_id, last_n_games, columns):
+        span = self.teams.key_range(int(team_id))
+        return self.teams.rows(span, columns, desc=True, limit=last_n_games)
+
+    async def team_games_since(self, team_id, since, columns):
+        span = self.teams.key_range(int(team_id), since, None)
+        return self.teams.rows(span, columns)
+
+    async def team_games_by_ids(self, game_ids, columns):
+        return self.teams.rows(self.teams.game_rows(game_ids), columns)
+
+    async def team(self, team_id, columns):
+        return await self.reference.team(team_id, columns)
+
+    async def active_player(self, player_id, columns):
+        return await self.reference.active_player(player_id, columns)
+
+    async def all_rows(self, table, order, columns="*"):
+        return await self.reference.all_rows(table, order, columns)
+
+    async def storage_files(self, bucket):
+        return await self.reference.storage_files(bucket)
+
+    async def public_url(self, bucket, path):
+        return await self.reference.public_url(bucket, path)
+
+    async def aclose(self):
+        await self.reference.aclose()
+
+
+def create_repository(async_supabase, backend=STATS_BACKEND):
+    reference = SupabaseRepository(async_supabase)
+    if backend == "store":
+        return InstrumentedRepository(StoreRepository(ColumnarStore(STORE_DIR), reference), backend)
+    if backend == "supabase":
+        return InstrumentedRepository(reference, backend)
+    raise RuntimeError(f"Unknown STATS_BACKEND '{backend}'")
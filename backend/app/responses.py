@@ -0,0 +1,42 @@
+"""
+Response serialization settings.
+
+Responses are rendered with orjson when it is installed (stdlib json
+otherwise), and bodies of at least GZIP_MINIMUM_SIZE bytes are gzipped for
+clients that accept it. Chart endpoints that return large series build
+FastJSONResponse directly, which also skips FastAPI's jsonable_encoder pass.
+"""
+import json
+import os
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "5"))
+
+# Values for the "format" field of the chart endpoints.
+ROWS_FORMAT = "rows"
+COLUMNAR_FORMAT = "columnar"
+RESPONSE_FORMATS = (ROWS_FORMAT, COLUMNAR_FORMAT)
+
+
+def dumps(content):
+    """Compact JSON bytes, as FastJSONResponse renders them."""
+    if orjson is None:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    # Non-string keys (player ids in the batch responses) become strings, like json.dumps.
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def loads(data):
+    return json.loads(data) if orjson is None else orjson.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,123 @@
+"""
+In-memory typeahead index over player and team names.
+
+Names are normalized (accents folded, punctuation dropped, lowercased) and
+indexed two ways:
+
+- a sorted token list, so prefix queries are a binary search;
+- trigram postings, so substrings and typos still find candidates.
+  Typos are scored by trigram similarity to the full name or to its
+  closest word.
+
+Results are ranked exact match > full-name prefix > word prefix >
+substring > trigram similarity, and capped at ``limit``.
+"""
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "20"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "50"))
+# Minimum trigram similarity for a fuzzy (typo) match.
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.3"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = 4.0, 3.0, 2.0, 1.0
+
+
+def normalize(text):
+    """'Luka Dončić' -> 'luka doncic', 'P.J. Tucker' -> 'pj tucker'."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _PUNCTUATION.sub("", text.lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _jaccard(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class NameIndex:
+    def __init__(self, entries):
+        """``entries`` is an iterable of (id, name) pairs."""
+        self.ids = []
+        self.names = []
+        self.exact = {}
+        self.tokens = []
+        self.postings = {}
+        self.grams = []
+
+        for position, (entry_id, name) in enumerate(entries):
+            normalized = normalize(name)
+            self.ids.append(entry_id)
+            self.names.append(normalized)
+            self.exact.setdefault(normalized, position)
+
+            self.tokens.append((normalized, position))
+            for token in normalized.split(" ")[1:]:
+                self.tokens.append((token, position))
+
+            grams = trigrams(normalized)
+            self.grams.append([grams] + [trigrams(word) for word in normalized.split(" ")])
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+        self.tokens.sort()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _prefix_matches(self, query):
+        """Positions whose full name or any later word starts with ``query``."""
+        matches = {}
+        i = bisect_left(self.tokens, (query, -1))
+        while i < len(self.tokens) and self.tokens[i][0].startswith(query):
+            token, position = self.tokens[i]
+            score = PREFIX if token == self.names[position] else WORD_PREFIX
+            matches[position] = max(matches.get(position, 0), score)
+            i += 1
+        return matches
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """Return up to ``limit`` (id, score) pairs, best first."""
+        query = normalize(query)
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        if not query:
+            return []
+
+        scores = self._prefix_matches(query)
+        if query in self.exact:
+            scores[self.exact[query]] = EXACT
+
+        if len(query) >= 3:
+            query_grams = trigrams(query)
+            shared = set()
+            for gram in query_grams:
+                shared.update(self.postings.get(gram, ()))
+
+            for position in shared:
+                if position in scores:
+                    continue
+                if query in self.names[position]:
+                    scores[position] = SUBSTRING
+                    continue
+                similarity = max(_jaccard(query_grams, grams) for grams in self.grams[position])
+                if similarity >= SEARCH_MIN_SIMILARITY:
+                    scores[position] = similarity
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        return [(self.ids[position], score) for position, score in ranked[:limit]]
+
+    def best(self, query):
+        """Id of the best match for ``query``, or None."""
+        results = self.search(query, limit=1)
+        return results[0][0] if results else None
@@ -0,0 +1,208 @@
+"""
+Result cache shared by every uvicorn worker on a node.
+
+Each worker has its own in-process indexes, so a summary computed in one
+worker would otherwise be computed again, from a cold index, in all the
+others. This tier holds finished JSON payloads (player range summaries,
+clutch summaries and team form) in one memory-mapped file. By default the
+file is in /dev/shm. Every worker maps the same file.
+
+The file is named after SHARED_CACHE_PATH and its layout, so workers with
+other settings never share it. It is a fixed hash table of
+SHARED_CACHE_SLOTS slots, each SHARED_CACHE_SLOT_BYTES long:
+
+    header: magic, slots, slot_bytes
+    slot:   seq, key_hash, written_at, key_len, value_len, crc32 | key | value
+
+A key is hashed to a home slot and may live in any of the next
+SHARED_CACHE_PROBES slots. A write goes to the slot already holding the
+key, else an empty slot, else the oldest one (which evicts it). Payloads
+that don't fit in a slot are not cached.
+
+Reads take no lock. A writer holds an fcntl lock on its slot and bumps
+``seq`` to odd before writing and to even after. A reader copies the
+slot and checks that ``seq`` did not change, that the CRC matches and that
+the stored key is the key it asked for. Otherwise it treats the read as a
+miss, so a torn read is never returned.
+
+Keys start with the data version (app/http_cache.py ``data_version``), so
+entries from before an ingest or store rebuild are never read. Entries
+older than SHARED_CACHE_TTL_SECONDS are ignored as well.
+SHARED_CACHE=0 turns the tier off.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from app.log import get_logger
+from app.responses import dumps, loads
+from app.single_flight import normalize_key
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE", "1") != "0"
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "nba_visualizations"),
+)
+SHARED_CACHE_SLOTS = int(os.getenv("SHARED_CACHE_SLOTS", "8192"))
+SHARED_CACHE_SLOT_BYTES = int(os.getenv("SHARED_CACHE_SLOT_BYTES", "8192"))
+SHARED_CACHE_PROBES = int(os.getenv("SHARED_CACHE_PROBES", "8"))
+SHARED_CACHE_TTL_SECONDS = float(os.getenv("SHARED_CACHE_TTL_SECONDS", "3600"))
+
+MAGIC = b"NBARES01"
+FILE_HEADER = struct.Struct("<8sII")
+SLOT_HEADER = struct.Struct("<QQdIII")
+SEQ = struct.Struct("<Q")
+
+
+def shared_key(version, namespace, params):
+    """Cache key for ``namespace`` results with ``params`` under data ``version``."""
+    return dumps([str(version), namespace, normalize_key(params)])
+
+
+def _key_hash(key):
+    # 0 marks an empty slot.
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class SharedResultCache:
+    def __init__(
+        self,
+        path=SHARED_CACHE_PATH,
+        slots=SHARED_CACHE_SLOTS,
+        slot_bytes=SHARED_CACHE_SLOT_BYTES,
+        probes=SHARED_CACHE_PROBES,
+        ttl=SHARED_CACHE_TTL_SECONDS,
+    ):
+        self.path = f"{path}.{slots}x{slot_bytes}.cache"
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.capacity = slot_bytes - SLOT_HEADER.size
+        self.probes = min(probes, slots)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.too_large = 0
+
+        size = FILE_HEADER.size + slots * slot_bytes
+        header = FILE_HEADER.pack(MAGIC, slots, slot_bytes)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Workers start together; the first one to take the lock lays out the file.
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size < size or os.pread(self.fd, FILE_HEADER.size, 0) != header:
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, header, 0)
+                logger.info("shared cache created", path=self.path, slots=slots, slot_bytes=slot_bytes)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.mm = mmap.mmap(self.fd, size)
+
+    def _offsets(self, key_hash):
+        home = key_hash % self.slots
+        for i in range(self.probes):
+            yield FILE_HEADER.size + ((home + i) % self.slots) * self.slot_bytes
+
+    def _read(self, offset, key, key_hash):
+        seq, stored_hash, written_at, key_len, value_len, crc = SLOT_HEADER.unpack_from(self.mm, offset)
+        if seq & 1 or stored_hash != key_hash or key_len + value_len > self.capacity:
+            return None
+        start = offset + SLOT_HEADER.size
+        data = self.mm[start:start + key_len + value_len]
+        if SEQ.unpack_from(self.mm, offset)[0] != seq or zlib.crc32(data) != crc or data[:key_len] != key:
+            return None
+        if time.time() - written_at > self.ttl:
+            return None
+        return data[key_len:]
+
+    def get(self, key):
+        """Cached value of ``key`` (bytes, from shared_key) or None."""
+        key_hash = _key_hash(key)
+        for offset in self._offsets(key_hash):
+            value = self._read(offset, key, key_hash)
+            if value is not None:
+                self.hits += 1
+                return loads(value)
+        self.misses += 1
+        return None
+
+    def _victim(self, key_hash):
+        """Slot for a new entry: the key's own, else an empty one, else the oldest."""
+        oldest = None
+        for offset in self._offsets(key_hash):
+            _, stored_hash, written_at, _, _, _ = SLOT_HEADER.unpack_from(self.mm, offset)
+            if stored_hash == key_hash or stored_hash == 0:
+                return offset, False
+            if oldest is None or written_at < oldest[1]:
+                oldest = (offset, written_at)
+        return oldest[0], True
+
+    def set(self, key, value):
+        data = key + dumps(value)
+        if len(data) > self.capacity:
+            self.too_large += 1
+            return
+        key_hash = _key_hash(key)
+        offset, evicts = self._victim(key_hash)
+
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, self.slot_bytes, offset)
+        try:
+            seq = SEQ.unpack_from(self.mm, offset)[0]
+            # Odd while the slot is being written, so readers skip it.
+            SEQ.pack_into(self.mm, offset, seq | 1)
+            start = offset + SLOT_HEADER.size
+            self.mm[start:start + len(data)] = data
+            SLOT_HEADER.pack_into(
+                self.mm, offset, (seq | 1) + 1, key_hash, time.time(), len(key), len(data) - len(key), zlib.crc32(data)
+            )
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.slot_bytes, offset)
+        self.stores += 1
+        self.evictions += evicts
+
+    async def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "too_large": self.too_large,
+        }
+
+    def close(self):
+        # The file stays for the other workers; it is rebuilt only when its layout changes.
+        self.mm.close()
+        os.close(self.fd)
+
+
+def open_shared_cache(enabled=SHARED_CACHE_ENABLED):
+    """The node's SharedResultCache, or None when disabled or unsupported."""
+    if not enabled or fcntl is None:
+        return None
+    try:
+        return SharedResultCache()
+    except OSError:
+        logger.exception("shared cache unavailable", path=SHARED_CACHE_PATH)
+        return None
@@ -0,0 +1,134 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+When many users load the same page at once, each request would run the
+same backend query and the same computation. ``SingleFlight.do(key,
+compute)`` runs ``compute()`` once per key. Callers that arrive while it
+is in flight await the same future, and callers within
+SINGLE_FLIGHT_WINDOW_SECONDS after it finished get the same result.
+Failures are shared with the callers that were waiting, but they are not
+kept for the window.
+
+The computation runs in its own task. If the caller that started it
+disconnects, the callers still waiting are not cancelled.
+
+Two flights are used by app/main.py:
+
+- ``CoalescingRepository`` wraps the stats repository, keyed by method
+  name and normalized arguments;
+- GET variants (keyed by their ETag) and the favourite team/player
+  payloads, keyed by the normalized request body.
+
+Every call is counted in ``single_flight_calls_total`` per flight, with
+outcome ``leader`` (ran the work), ``coalesced`` (joined an in-flight
+call) or ``recent`` (served from the window).
+"""
+import asyncio
+import datetime
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app import metrics
+
+SINGLE_FLIGHT_WINDOW_SECONDS = float(os.getenv("SINGLE_FLIGHT_WINDOW_SECONDS", "1"))
+SINGLE_FLIGHT_MAX_RECENT = int(os.getenv("SINGLE_FLIGHT_MAX_RECENT", "1024"))
+
+
+def normalize_key(value):
+    """Hashable form of ``value``, so equal queries map to one key."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(normalize_key(item) for item in value))
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        # Ids arrive as "1610612737" in JSON bodies and as ints from path parameters.
+        return int(value)
+    return value
+
+
+class SingleFlight:
+    def __init__(self, name, window=SINGLE_FLIGHT_WINDOW_SECONDS, max_recent=SINGLE_FLIGHT_MAX_RECENT):
+        self.name = name
+        self.window = window
+        self.max_recent = max_recent
+        self.in_flight = {}
+        self.recent = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, outcome):
+        if outcome == "leader":
+            self.misses += 1
+        else:
+            self.hits += 1
+        metrics.single_flight_calls.inc(self.name, outcome)
+
+    async def do(self, key, compute):
+        """Result of ``await compute()``, shared with identical concurrent calls."""
+        entry = self.recent.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] <= self.window:
+                self._count("recent")
+                return entry[1]
+            del self.recent[key]
+
+        future = self.in_flight.get(key)
+        if future is None:
+            self._count("leader")
+            future = self.in_flight[key] = asyncio.ensure_future(self._run(key, compute))
+            # Nobody may be left to await a failure; don't let asyncio warn about it.
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(future)
+
+    async def _run(self, key, compute):
+        try:
+            result = await compute()
+        finally:
+            self.in_flight.pop(key, None)
+        if self.window > 0:
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key, result):
+        now = time.monotonic()
+        self.recent[key] = (now, result)
+        self.recent.move_to_end(key)
+        # Entries are in finishing order, so the expired ones are at the front.
+        while self.recent:
+            oldest_key, (finished_at, _) = next(iter(self.recent.items()))
+            if now - finished_at <= self.window and len(self.recent) <= self.max_recent:
+                break
+            del self.recent[oldest_key]
+
+
+class CoalescingRepository:
+    """Wraps a repository so identical concurrent reads share one query."""
+
+    def __init__(self, repository, flight):
+        self.repository = repository
+        self.flight = flight
+
+    def __getattr__(self, name):
+        attribute = getattr(self.repository, name)
+        if name == "aclose" or not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def coalesced(*args, **kwargs):
+            key = (name, normalize_key(args), normalize_key(kwargs))
+            return await self.flight.do(key, lambda: attribute(*args, **kwargs))
+
+        return coalesced
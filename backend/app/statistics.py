@@ -1,3 +1,9 @@
+from app.aggregation import EMPTY_CLUTCH_SUMMARY
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+
 def calculate_player_summary(player_stats):
     if not player_stats:
         return {
@@ -39,19 +45,20 @@ def calculate_player_summary(player_stats):
 
 
 def calculate_clutch_summary(clutch_player_stats):
+    num_games = len(clutch_player_stats)
+    if not num_games:
+        return dict(EMPTY_CLUTCH_SUMMARY)
+
     total_fg_made = sum(row["field_goals_made"] for row in clutch_player_stats)
     total_fg_attempted = sum(row["field_goals_attempted"] for row in clutch_player_stats)
     total_points = sum(row["points"] for row in clutch_player_stats)
     total_wins = sum(row["win"] for row in clutch_player_stats)
-    num_games = len(clutch_player_stats)
 
     fg_percentage = round((total_fg_made / total_fg_attempted) * 100, 2) if total_fg_attempted > 0 else 0
     ppg = round(total_points / num_games, 2) if num_games > 0 else 0
     win_percentage = round((total_wins / num_games) * 100, 2) if num_games > 0 else 0
 
-    print(f"FG%: {fg_percentage}%")
-    print(f"PPG: {ppg}")
-    print(f"Win%: {win_percentage}%")
+    logger.debug("clutch summary", fg_percentage=fg_percentage, ppg=ppg, win_percentage=win_percentage)
 
     return {
         "average_points": round(total_points /num_games, 1),
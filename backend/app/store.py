@@ -0,0 +1,298 @@
+"""
+Read-only columnar box-score store on local disk.
+
+Each table is saved as one ``.npy`` file per column, sorted by
+(key, game_date) where key is ``player_id`` for ``player_statistics`` and
+``teamId`` for ``team_statistics``. Columns are opened with
+``np.load(mmap_mode="r")`` so every uvicorn worker on the node maps the
+same files and shares the OS page cache instead of holding its own copy.
+
+Build it from Supabase with:
+
+    python -m app.store build --out data/store
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+STORE_DIR = os.getenv(
+    "STATS_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "store"),
+)
+
+TABLE_KEYS = {
+    "player_statistics": "player_id",
+    "team_statistics": "teamId",
+}
+
+PAGE_SIZE = 1000
+
+
+def parse_day(value):
+    """'2024-01-02' (or a longer timestamp) -> datetime64[D]; NaT for None and ""."""
+    if value is None or value == "":
+        return np.datetime64("NaT", "D")
+    return np.datetime64(str(value)[:10], "D")
+
+
+def column_array(name, values):
+    """Convert a list of raw Supabase values into a typed array."""
+    if name == "game_date":
+        return np.array([parse_day(v) for v in values], dtype="datetime64[D]")
+
+    present = [v for v in values if v is not None]
+    if not present:
+        # An all-null chunk of a numeric column (three_pointers_made before
+        # 1979); strings are kept only for values that aren't numbers.
+        return np.full(len(values), np.nan)
+    if all(isinstance(v, bool) for v in present):
+        if len(present) == len(values):
+            return np.array(values, dtype=np.int8)
+        return np.array([np.nan if v is None else int(v) for v in values], dtype=np.float64)
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        if len(present) == len(values):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if all(isinstance(v, (int, float)) for v in present):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return np.array(["" if v is None else str(v) for v in values], dtype=str)
+
+
+def to_python(array):
+    """Turn a column slice back into JSON friendly Python values."""
+    if array.dtype.kind == "M":
+        return [None if np.isnat(v) else str(v) for v in array]
+    if array.dtype.kind == "f":
+        return [None if v != v else v for v in array.tolist()]
+    return array.tolist()
+
+
+def fetch_table(supabase, table):
+    """Page through a whole Supabase table and return it as column lists."""
+    key = TABLE_KEYS[table]
+    columns = {}
+    offset = 0
+    while True:
+        page = (
+            supabase.table(table)
+            .select("*")
+            .order(key)
+            .order("game_date")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+
+        for row in page:
+            for name in row:
+                if name not in columns:
+                    columns[name] = [None] * offset
+            for name, values in columns.items():
+                values.append(row.get(name))
+
+        offset += len(page)
+        print(f"{table}: fetched {offset} rows")
+        if len(page) < PAGE_SIZE:
+            return columns
+
+
+def write_table(out_dir, table, columns):
+    """Sort the columns by (key, game_date) and save them as .npy files."""
+    arrays = {name: column_array(name, values) for name, values in columns.items()}
+    return write_arrays(out_dir, table, arrays)
+
+
+def write_arrays(out_dir, table, arrays):
+    """write_table for columns that are already typed arrays."""
+    key = TABLE_KEYS[table]
+    order = np.lexsort((arrays["game_date"], arrays[key]))
+
+    table_dir = os.path.join(out_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+    dtypes = {}
+    for name, array in arrays.items():
+        array = array[order]
+        np.save(os.path.join(table_dir, f"{name}.npy"), array)
+        dtypes[name] = array.dtype.str
+
+    # Secondary index so rows can also be found by game_id.
+    if "game_id" in arrays:
+        game_order = np.argsort(arrays["game_id"][order], kind="stable")
+        np.save(os.path.join(table_dir, "_game_id_order.npy"), game_order)
+        np.save(os.path.join(table_dir, "_game_id_sorted.npy"), arrays["game_id"][order][game_order])
+
+    return {"rows": int(len(order)), "key": key, "columns": dtypes}
+
+
+def build_store(supabase, out_dir=STORE_DIR):
+    """Build a fresh store and atomically swap it into ``out_dir``."""
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    meta = {"version": time.strftime("%Y%m%d%H%M%S"), "tables": {}}
+    for table in TABLE_KEYS:
+        meta["tables"][table] = write_table(tmp_dir, table, fetch_table(supabase, table))
+
+    swap_store(tmp_dir, out_dir, meta)
+    return meta
+
+
+def swap_store(tmp_dir, out_dir, meta):
+    """Write ``meta.json`` into ``tmp_dir`` and atomically move it to ``out_dir``."""
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = f"{out_dir}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class ColumnarTable:
+    def __init__(self, path, key, column_names):
+        self.path = path
+        self.key = key
+        self.column_names = list(column_names)
+        self._columns = {}
+        self._game_order = None
+        self._game_ids_sorted = None
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = np.load(
+                os.path.join(self.path, f"{name}.npy"), mmap_mode="r"
+            )
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self.column(self.key))
+
+    def span_sums(self, spans, fields):
+        """
+        (counts, totals) of ``fields`` over row spans [lo, hi).
+
+        The spans must be sorted and disjoint, like the key_range of
+        ascending keys. Each column is summed in one reduceat over the
+        span bounds, so no rows are materialized.
+        """
+        spans = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+        counts = spans[:, 1] - spans[:, 0]
+        totals = np.zeros((len(spans), len(fields)))
+        nonempty = np.flatnonzero(counts > 0)
+        if not len(nonempty):
+            return counts, totals
+        # reduceat sums [bounds[i], bounds[i + 1]); the even segments are the spans.
+        bounds = spans[nonempty].ravel()
+        if bounds[-1] == len(self):
+            # A span that ends the table runs to the end without a closing bound.
+            bounds = bounds[:-1]
+        for j, field in enumerate(fields):
+            totals[nonempty, j] = np.add.reduceat(self.column(field), bounds)[0::2]
+        return counts, totals
+
+    def key_range(self, key_value, start_date=None, end_date=None):
+        """
+        Return the [lo, hi) row range for one key and optional date range.
+
+        A None or "" bound is ignored, as the Supabase queries ignore it.
+        """
+        keys = self.column(self.key)
+        lo = int(np.searchsorted(keys, key_value, side="left"))
+        hi = int(np.searchsorted(keys, key_value, side="right"))
+        if lo == hi or (not start_date and not end_date):
+            return lo, hi
+
+        dates = self.column("game_date")[lo:hi]
+        if start_date:
+            lo_offset = int(np.searchsorted(dates, parse_day(start_date), side="left"))
+        else:
+            lo_offset = 0
+        if end_date:
+            hi_offset = int(np.searchsorted(dates, parse_day(end_date), side="right"))
+        else:
+            hi_offset = len(dates)
+        return lo + lo_offset, lo + hi_offset
+
+    def game_rows(self, game_ids):
+        """Row positions of every row whose game_id is in ``game_ids``."""
+        if self._game_order is None:
+            self._game_order = np.load(
+                os.path.join(self.path, "_game_id_order.npy"), mmap_mode="r"
+            )
+            self._game_ids_sorted = np.load(
+                os.path.join(self.path, "_game_id_sorted.npy"), mmap_mode="r"
+            )
+        sorted_ids = self._game_ids_sorted
+        wanted = np.unique(np.asarray(list(game_ids), dtype=sorted_ids.dtype))
+        if not len(wanted):
+            return np.empty(0, dtype=np.int64)
+        lo = np.searchsorted(sorted_ids, wanted, side="left")
+        hi = np.searchsorted(sorted_ids, wanted, side="right")
+        return np.sort(np.concatenate(
+            [self._game_order[a:b] for a, b in zip(lo, hi)]
+        ))
+
+    def rows(self, positions, columns, eq=None, neq=None, desc=False, limit=None):
+        """Materialize selected row positions as a list of dicts."""
+        if isinstance(positions, tuple):
+            positions = np.arange(*positions)
+
+        mask = np.ones(len(positions), dtype=bool)
+        for name, value in (eq or {}).items():
+            mask &= self.column(name)[positions] == value
+        for name, value in (neq or {}).items():
+            mask &= self.column(name)[positions] != value
+        positions = positions[mask]
+
+        if desc:
+            positions = positions[::-1]
+        if limit is not None:
+            positions = positions[:limit]
+
+        values = {name: to_python(self.column(name)[positions]) for name in columns}
+        return [dict(zip(columns, row)) for row in zip(*values.values())]
+
+
+class ColumnarStore:
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version = self.meta["version"]
+        self.tables = {
+            name: ColumnarTable(os.path.join(path, name), info["key"], info["columns"])
+            for name, info in self.meta["tables"].items()
+        }
+
+    def table(self, name):
+        return self.tables[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local columnar box-score store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--out", default=STORE_DIR)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    started = time.perf_counter()
+    meta = build_store(supabase, args.out)
+    for table, info in meta["tables"].items():
+        print(f"{table}: {info['rows']} rows")
+    print(f"Store {meta['version']} written to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Materialized recent-form records for /favourite_team_data.
+
+For each team the index keeps its last max(TEAM_FORM_WINDOWS) games and a
+running TEAM_FIELDS total per window. A new game is added to every window
+total, and the game that falls out of each window is subtracted, so an
+update costs one vector add/subtract per window and never re-sums the
+window. After each update a record is stored per window:
+
+    {"games": n, "stats": <calculate_team_stats output>, "form": "WLWWL..."}
+
+The form string is oldest game first, as the endpoint always returned it.
+Box-score values are whole numbers, so the running totals are exact. A
+window holding fractional values is re-summed from the games it keeps.
+
+Rows loaded before app/ingest.py typed values at load time still hold
+numeric strings in Supabase; they are parsed here until that data is
+migrated.
+
+Teams are loaded on first request. After TEAM_FORM_TTL_SECONDS only the
+games from the last indexed date on are fetched and appended.
+"""
+import os
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from app.aggregation import TEAM_FIELDS, TEAM_OPTIONAL_FIELDS, team_summaries_from_totals, to_matrix
+from app.store import parse_day
+
+# Games in the /favourite_team_data form; always one of the windows.
+TEAM_FORM_GAMES = 10
+TEAM_FORM_WINDOWS = tuple(sorted(
+    {TEAM_FORM_GAMES, *(int(n) for n in os.getenv("TEAM_FORM_WINDOWS", "5,10,20").split(",") if n.strip())}
+))
+if TEAM_FORM_WINDOWS[0] < 1:
+    raise RuntimeError(f"TEAM_FORM_WINDOWS must be positive, got {TEAM_FORM_WINDOWS}")
+TEAM_FORM_TTL_SECONDS = float(os.getenv("TEAM_FORM_TTL_SECONDS", "3600"))
+TEAM_FORM_MAX_TEAMS = int(os.getenv("TEAM_FORM_MAX_TEAMS", "100"))
+
+FORM_COLUMNS = ["game_id", "game_date", *TEAM_FIELDS]
+
+WIN = TEAM_FIELDS.index("win")
+
+
+class TeamForm:
+    def __init__(self, rows, windows=TEAM_FORM_WINDOWS):
+        self.windows = windows
+        self.size = max(windows)
+        # (game_id, day, values) for the last ``size`` games, oldest first.
+        self.games = deque()
+        self.totals = {n: np.zeros(len(TEAM_FIELDS)) for n in windows}
+        self.records = {}
+        self.refreshed_at = time.monotonic()
+        self.append(rows)
+
+    def append(self, rows):
+        """Add newly played games and refresh the per-window records."""
+        known = {game_id for game_id, _, _ in self.games}
+        rows = [_parse_numbers(row) for row in rows]
+        rows = [row for row in rows if row["game_id"] not in known]
+        if not rows:
+            return
+
+        values = to_matrix(rows, TEAM_FIELDS, TEAM_OPTIONAL_FIELDS)
+        games = sorted(
+            ((row["game_id"], parse_day(row["game_date"]), values[i]) for i, row in enumerate(rows)),
+            key=lambda game: game[1],
+        )
+
+        if self.games and games[0][1] < self.games[-1][1]:
+            # Out of order: rebuild the (small) windows from the kept games.
+            merged = sorted([*self.games, *games], key=lambda game: game[1])[-self.size:]
+            self.games = deque(merged)
+            for n in self.windows:
+                self.totals[n] = self._window_sum(n)
+        else:
+            for game in games:
+                self._push(game)
+        self._materialize()
+
+    def _push(self, game):
+        self.games.append(game)
+        for n in self.windows:
+            self.totals[n] = self.totals[n] + game[2]
+            if len(self.games) > n:
+                self.totals[n] = self.totals[n] - self.games[-n - 1][2]
+        if len(self.games) > self.size:
+            self.games.popleft()
+
+    def _window_sum(self, n):
+        window = [values for _, _, values in list(self.games)[-n:]]
+        return np.sum(window, axis=0) if window else np.zeros(len(TEAM_FIELDS))
+
+    def _record(self, n, totals):
+        window = list(self.games)[-n:]
+        if not window:
+            return {"games": 0, "stats": {}, "form": ""}
+        if not np.all(totals == np.round(totals)):
+            totals = self._window_sum(n)
+        stats = team_summaries_from_totals([None], np.array([len(window)]), totals[None, :])[None]
+        form = "".join("W" if values[WIN] == 1 else "L" for _, _, values in window)
+        return {"games": len(window), "stats": stats, "form": form}
+
+    def _materialize(self):
+        self.records = {n: self._record(n, self.totals[n]) for n in self.windows}
+
+    def last_date(self):
+        return self.games[-1][1] if self.games else None
+
+    def record(self, last_n_games):
+        """Precomputed record for one of the windows (any N up to the largest works)."""
+        if last_n_games in self.records:
+            return self.records[last_n_games]
+        if not 0 < last_n_games <= self.size:
+            raise ValueError(f"last_n_games must be between 1 and {self.size}")
+        return self._record(last_n_games, self._window_sum(last_n_games))
+
+
+def _parse_numbers(row):
+    """``row`` with numeric strings ("12", "0.45") turned into numbers."""
+    if not any(isinstance(value, str) for value in row.values()):
+        return row
+    parsed = {}
+    for key, value in row.items():
+        if isinstance(value, str):
+            try:
+                value = int(value) if value.isdigit() else float(value)
+            except ValueError:
+                pass
+        parsed[key] = value
+    return parsed
+
+
+class TeamFormIndex:
+    def __init__(self, windows=TEAM_FORM_WINDOWS, ttl=TEAM_FORM_TTL_SECONDS, max_teams=TEAM_FORM_MAX_TEAMS):
+        self.windows = windows
+        self.ttl = ttl
+        self.max_teams = max_teams
+        self.teams = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def team(self, repository, team_id):
+        entry = self.teams.get(team_id)
+        if entry is None:
+            self.misses += 1
+            rows = await repository.team_recent_games(team_id, max(self.windows), FORM_COLUMNS)
+            entry = TeamForm(rows, self.windows)
+            self.teams[team_id] = entry
+            if len(self.teams) > self.max_teams:
+                self.teams.popitem(last=False)
+        elif time.monotonic() - entry.refreshed_at > self.ttl:
+            last_date = entry.last_date()
+            if last_date is None:
+                rows = await repository.team_recent_games(team_id, max(self.windows), FORM_COLUMNS)
+            else:
+                rows = await repository.team_games_since(team_id, str(last_date), FORM_COLUMNS)
+            entry.append(rows)
+            entry.refreshed_at = time.monotonic()
+        else:
+            self.hits += 1
+        self.teams.move_to_end(team_id)
+        return entry
+
+    async def record(self, repository, team_id, last_n_games):
+        entry = await self.team(repository, team_id)
+        return entry.record(last_n_games)
@@ -0,0 +1,105 @@
+"""
+Background cache warm-up and readiness.
+
+The app lifespan registers warm-up steps and starts them in a background
+task, so the worker begins answering right away. ``/healthz`` reports
+liveness from the start, and ``/readyz`` returns 503 until the steps are
+done. A load balancer that routes on ``/readyz`` only sends traffic to
+warm workers.
+
+Steps run in order. A ``required`` step (the reference data) is retried
+every WARMUP_RETRY_SECONDS until it succeeds. If an optional step (a hot
+index) fails, it is logged and skipped. Step names in ``WARMUP_SKIP``
+(comma separated) are not run. With ``WARMUP_IN_BACKGROUND=0`` the
+lifespan waits for warm-up before serving instead.
+
+Each step's duration, the total warm-up time and the seconds from import to
+ready are published as ``startup_seconds`` gauges and logged.
+"""
+import asyncio
+import os
+import time
+
+from app import metrics
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+WARMUP_IN_BACKGROUND = os.getenv("WARMUP_IN_BACKGROUND", "1") != "0"
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_SKIP = {name.strip() for name in os.getenv("WARMUP_SKIP", "").split(",") if name.strip()}
+
+
+class Warmup:
+    def __init__(self, started_at, skip=WARMUP_SKIP, retry_seconds=WARMUP_RETRY_SECONDS):
+        # perf_counter() at the top of app/main.py, so "ready" counts import time too.
+        self.started_at = started_at
+        self.skip = skip
+        self.retry_seconds = retry_seconds
+        self.steps = []
+        self.timings = {}
+        self.failed = {}
+        self.ready = False
+        self.task = None
+
+    def step(self, name, run, required=False):
+        """Add ``await run()`` as a warm-up step."""
+        self.steps.append((name, run, required))
+
+    def record(self, phase, seconds):
+        self.timings[phase] = round(seconds, 4)
+        metrics.startup_seconds.set(phase, value=self.timings[phase])
+
+    async def _run_step(self, name, run, required):
+        while True:
+            started = time.perf_counter()
+            try:
+                await run()
+            except Exception as e:
+                logger.exception("warm-up step failed", step=name, required=required)
+                self.failed[name] = str(e)
+                if not required:
+                    return
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            self.failed.pop(name, None)
+            self.record(name, time.perf_counter() - started)
+            logger.info("warm-up step done", step=name, seconds=self.timings[name])
+            return
+
+    async def run(self):
+        started = time.perf_counter()
+        for name, run, required in self.steps:
+            if name in self.skip:
+                continue
+            await self._run_step(name, run, required)
+        self.record("warmup", time.perf_counter() - started)
+        self.record("ready", time.perf_counter() - self.started_at)
+        self.ready = True
+        metrics.ready.set(value=1)
+        logger.info("worker ready", **self.timings, failed=sorted(self.failed))
+
+    async def start(self, background=WARMUP_IN_BACKGROUND):
+        if background:
+            self.task = asyncio.create_task(self.run())
+        else:
+            await self.run()
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "pending": [
+                name for name, _, _ in self.steps
+                if name not in self.timings and name not in self.failed and name not in self.skip
+            ],
+            "failed": self.failed,
+            "timings": self.timings,
+        }
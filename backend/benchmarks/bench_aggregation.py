@@ -0,0 +1,131 @@
+"""
+Microbenchmarks: statistics.py summaries vs the vectorized engine.
+
+Run from the backend folder:
+
+    python -m benchmarks.bench_aggregation
+"""
+import random
+import time
+
+import numpy as np
+
+from app import aggregation
+from app.statistics import calculate_clutch_summary, calculate_player_summary, calculate_team_stats
+
+SIZES = (10_000, 100_000, 1_000_000)
+PLAYERS = 500
+
+
+def make_player_rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        fga = rng.randint(0, 30)
+        tpa = rng.randint(0, min(fga, 15))
+        fta = rng.randint(0, 15)
+        fgm = rng.randint(0, fga)
+        tpm = rng.randint(0, min(tpa, fgm))
+        ftm = rng.randint(0, fta)
+        rows.append({
+            "player_id": rng.randint(1, PLAYERS),
+            "points": 2 * (fgm - tpm) + 3 * tpm + ftm,
+            "assists": rng.randint(0, 15),
+            "rebounds_total": rng.randint(0, 20),
+            "field_goals_made": fgm,
+            "field_goals_attempted": fga,
+            "three_pointers_made": tpm,
+            "three_pointers_attempted": tpa,
+            "free_throws_made": ftm,
+            "free_throws_attempted": fta,
+            "win": rng.randint(0, 1),
+        })
+    return rows
+
+
+def make_team_rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        team_score = rng.randint(80, 140)
+        opponent_score = rng.randint(80, 140)
+        rows.append({
+            "teamId": rng.randint(1, 30),
+            "win": int(team_score > opponent_score),
+            "team_score": team_score,
+            "opponent_score": opponent_score,
+            "field_goals_made": rng.randint(30, 50),
+            "field_goals_attempted": rng.randint(80, 100),
+            "three_pointers_made": rng.randint(5, 20),
+            "three_pointers_attempted": rng.randint(25, 45),
+            "free_throws_made": rng.randint(10, 25),
+            "free_throws_attempted": rng.randint(20, 30),
+            "assists": rng.randint(15, 35),
+            "blocks": rng.randint(0, 10),
+            "steals": rng.randint(2, 12),
+            "turnovers": rng.randint(5, 20),
+            "rebounds_total": rng.randint(35, 55),
+            "fouls_personal": rng.randint(12, 25),
+        })
+    return rows
+
+
+def to_columns(rows):
+    return {key: np.array([row[key] for row in rows]) for key in rows[0]}
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def grouped_baseline(rows, key, summarize):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[key], []).append(row)
+    return {k: summarize(v) for k, v in groups.items()}
+
+
+def report(name, n, baseline, engine):
+    print(f"{name:<28} {n:>9,} rows  python {baseline * 1000:9.1f} ms  "
+          f"numpy {engine * 1000:9.1f} ms  x{baseline / engine:5.1f}")
+
+
+def main():
+    print(f"{'benchmark':<28} {'size':>14}")
+    for n in SIZES:
+        players = make_player_rows(n)
+        teams = make_team_rows(n)
+        player_columns = to_columns(players)
+        team_columns = to_columns(teams)
+
+        base, expected = best_of(lambda: calculate_player_summary(players))
+        fast, actual = best_of(lambda: aggregation.player_summaries(players))
+        assert expected == actual
+        report("player summary (rows)", n, base, fast)
+        fast, actual = best_of(lambda: aggregation.player_summaries(player_columns))
+        assert expected == actual
+        report("player summary (columns)", n, base, fast)
+
+        base, expected = best_of(lambda: calculate_clutch_summary(players))
+        fast, actual = best_of(lambda: aggregation.clutch_summaries(player_columns))
+        assert expected == actual
+        report("clutch summary (columns)", n, base, fast)
+
+        base, expected = best_of(lambda: calculate_team_stats(teams))
+        fast, actual = best_of(lambda: aggregation.team_summaries(team_columns))
+        assert expected == actual
+        report("team stats (columns)", n, base, fast)
+
+        base, expected = best_of(lambda: grouped_baseline(players, "player_id", calculate_player_summary))
+        fast, actual = best_of(lambda: aggregation.player_summaries(player_columns, group_by="player_id"))
+        assert expected == actual
+        report(f"{PLAYERS} players grouped", n, base, fast)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Batch endpoints vs N single calls, against a running backend.
+
+For each N the same players are summarized once with N concurrent
+/player_statistics (or /get_clutch_factor) requests and once with a single
+request to the /batch variant.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_batch --username <user> --password <password> --player-ids 2544,201939,...
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.load_test import login
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    response = await coro
+    return time.perf_counter() - started, response
+
+
+async def singles(client, path, player_ids, body, headers):
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.post(path, json={**body, "player_id": player_id}, headers=headers)
+        for player_id in player_ids
+    ))
+    assert all(response.status_code == 200 for response in responses)
+    return time.perf_counter() - started
+
+
+async def batch(client, path, player_ids, body, headers):
+    elapsed, response = await timed(
+        client.post(f"{path}/batch", json={**body, "player_ids": player_ids}, headers=headers)
+    )
+    assert response.status_code == 200, response.text
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--player-ids", required=True, help="comma separated player ids")
+    parser.add_argument("--start-date", default="2015-10-01")
+    parser.add_argument("--end-date", default="2024-06-30")
+    parser.add_argument("--sizes", default="1,5,10,25,50")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    all_ids = [int(player_id) for player_id in args.player_ids.split(",")]
+    body = {"start_date": args.start_date, "end_date": args.end_date}
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as client:
+        headers = {"Authorization": f"Bearer {await login(client, args.username, args.password)}"}
+        for path in ("/player_statistics", "/get_clutch_factor"):
+            print(path)
+            for n in map(int, args.sizes.split(",")):
+                player_ids = all_ids[:n]
+                single_time = min([await singles(client, path, player_ids, body, headers) for _ in range(args.repeat)])
+                batch_time = min([await batch(client, path, player_ids, body, headers) for _ in range(args.repeat)])
+                print(f"  n={len(player_ids):<4} {len(player_ids)} singles {single_time * 1000:8.1f} ms  "
+                      f"batch {batch_time * 1000:8.1f} ms  x{single_time / batch_time:5.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
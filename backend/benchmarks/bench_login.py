@@ -0,0 +1,83 @@
+"""
+Login throughput under concurrent load, against a running backend.
+
+Each level fires a burst of /login requests while a probe keeps calling
+/teams, so the report shows both login throughput (and how many requests
+were shed with 503) and how much the burst slows down other endpoints.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_login --username <user> --password <password>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)] * 1000 if values else 0.0
+
+
+async def run_level(client, username, password, concurrency, requests_per_worker):
+    latencies = []
+    status_counts = {}
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async def worker():
+        for _ in range(requests_per_worker):
+            started = time.perf_counter()
+            response = await client.post("/login", json={"username": username, "password": password})
+            latencies.append(time.perf_counter() - started)
+            status_counts[response.status_code] = status_counts.get(response.status_code, 0) + 1
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/teams")
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": status_counts.get(200, 0),
+        "shed": status_counts.get(503, 0),
+        "throughput": status_counts.get(200, 0) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 0.95),
+        "probe_p95_ms": percentile(probe_latencies, 0.95),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--levels", default="1,4,16,64,256")
+    parser.add_argument("--requests", type=int, default=4, help="requests per worker")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as client:
+        for level in map(int, args.levels.split(",")):
+            result = await run_level(client, args.username, args.password, level, args.requests)
+            print(f"c={result['concurrency']:<4} {result['throughput']:7.1f} logins/s  "
+                  f"ok {result['ok']:<5} shed {result['shed']:<5} "
+                  f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                  f"/teams p95 {result['probe_p95_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Chart series payloads: row dicts + stdlib JSON vs columnar + orjson.
+
+Builds /teams_statistics-shaped responses with all_categories for growing
+series lengths and reports body size (raw and gzipped at the middleware's
+level) and render time for:
+
+- rows: the current shape through FastAPI's JSONResponse;
+- rows-fast: the current shape through FastJSONResponse;
+- columnar: the ``"format": "columnar"`` shape through FastJSONResponse.
+
+Run from the backend folder:
+
+    python -m benchmarks.bench_serialization
+"""
+import gzip
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.matchups import MATCHUP_CATEGORIES, MatchupSeries
+from app.responses import GZIP_COMPRESS_LEVEL, FastJSONResponse, orjson
+
+SIZES = (10, 100, 1_000, 10_000)
+REPEAT = 20
+
+
+def make_series(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        row = {category: rng.randint(0, 40) for category in MATCHUP_CATEGORIES}
+        row["team_score"] = rng.randint(80, 140)
+        for category in ("field_goals_percentage", "three_pointers_percentage", "free_throws_percentage"):
+            row[category] = round(rng.random(), 3)
+        rows.append(row)
+    return MatchupSeries(rows)
+
+
+def make_response(series, n, columnar):
+    return {
+        side: {
+            "id": team_id,
+            "name": {"data": [{"full_name": "Los Angeles Lakers"}], "count": None},
+            "stats": series.last_games("assists", n, columnar),
+            "all_stats": series.all_categories(n, columnar),
+        }
+        for side, team_id in (("first_team", 1610612747), ("second_team", 1610612738))
+    }
+
+
+def render_rows(content):
+    # What a plain dict return does: jsonable_encoder, then json.dumps.
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def render_fast(content):
+    return FastJSONResponse(content).body
+
+
+def timed(fn, content):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        body = fn(content)
+    return (time.perf_counter() - started) / REPEAT * 1000, body
+
+
+def main():
+    print(f"serializer: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'games':>7} {'shape':<10} {'bytes':>11} {'gzipped':>10} {'render ms':>10}")
+    for n in SIZES:
+        series = make_series(n)
+        for shape, fn, columnar in (
+            ("rows", render_rows, False),
+            ("rows-fast", render_fast, False),
+            ("columnar", render_fast, True),
+        ):
+            content = make_response(series, n, columnar)
+            elapsed, body = timed(fn, content)
+            compressed = len(gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL))
+            print(f"{n:>7} {shape:<10} {len(body):>11,} {compressed:>10,} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
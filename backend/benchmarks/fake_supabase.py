@@ -0,0 +1,499 @@
+"""
+In-memory stand-in for the ``supabase`` client, for offline benchmarks.
+
+Implements the query-builder subset the backend uses: select, eq, neq,
+gt, gte, lt, lte, in_, or_ (with nested and/or), ilike, order, limit, range, single,
+maybe_single, insert and update, plus storage ``list``/``get_public_url``
+and ``rpc`` for the players_range_totals function of
+backend/sql/summary_functions.sql.
+Tables are NumPy columns, so the synthetic 1.5M-row ``player_statistics``
+stays small in memory. ``eq``/``in_`` filters on large tables are served
+from a sorted index built on first use, so fetching one player's games
+doesn't scan every row.
+
+``install(db)`` swaps the client factories used by app.main, and must run
+before app.main is imported:
+
+    db = FakeDatabase(generate())
+    install(db)
+    from app.main import app
+"""
+import asyncio
+import itertools
+import os
+import re
+import time
+
+import numpy as np
+
+# Tables at least this long get sorted indexes for eq / in_ filters.
+INDEX_MIN_ROWS = 10_000
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _array(values):
+    values = list(values)
+    present = [v for v in values if v is not None]
+    if present and len(present) == len(values):
+        if all(isinstance(v, bool) for v in present):
+            return np.array(values, dtype=bool)
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+            return np.array(values, dtype=np.int64)
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            return np.array(values, dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class FakeTable:
+    def __init__(self, columns):
+        """``columns`` maps column name -> array (or list) of equal length."""
+        self.columns = {name: np.asarray(values) if not isinstance(values, list) else _array(values)
+                        for name, values in columns.items()}
+        self._indexes = {}
+        self._ids = itertools.count(len(self) + 1)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def index(self, column):
+        """(sort order, sorted values) for ``column``, built on first use."""
+        if column not in self._indexes:
+            values = self.columns[column]
+            order = np.argsort(values, kind="stable")
+            self._indexes[column] = (order, values[order])
+        return self._indexes[column]
+
+    def lookup(self, column, values):
+        order, sorted_values = self.index(column)
+        values = np.asarray(values, dtype=sorted_values.dtype)
+        lo = np.searchsorted(sorted_values, values, side="left")
+        hi = np.searchsorted(sorted_values, values, side="right")
+        if not len(values):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([order[a:b] for a, b in zip(lo, hi)]))
+
+    def insert(self, rows):
+        start = len(self)
+        names = set(self.columns) | {name for row in rows for name in row}
+        if "id" in self.columns:
+            rows = [{"id": next(self._ids), **row} for row in rows]
+        for name in names:
+            existing = self.columns.get(name)
+            if existing is None:
+                existing = np.full(start, None, dtype=object)
+            added = _array(row.get(name) for row in rows)
+            if existing.dtype != added.dtype:
+                existing, added = existing.astype(object), added.astype(object)
+            self.columns[name] = np.concatenate((existing, added))
+        self._indexes.clear()
+        return np.arange(start, len(self))
+
+    def update(self, positions, values):
+        for name, value in values.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = np.full(len(self), None, dtype=object)
+            if column.dtype != object and not isinstance(value, (int, float)):
+                column = self.columns[name] = column.astype(object)
+            column[positions] = value
+        self._indexes.clear()
+
+    def rows(self, positions, columns):
+        names = list(self.columns) if columns is None else columns
+        values = [self._python(self.columns[name][positions]) if name in self.columns
+                  else [None] * len(positions) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    @staticmethod
+    def _python(array):
+        if array.dtype.kind == "f":
+            return [None if v != v else v for v in array.tolist()]
+        return array.tolist()
+
+
+class FakeDatabase:
+    def __init__(self, tables, buckets=None, latency_ms=0.0):
+        """``tables`` maps name -> {column: values}; ``buckets`` maps name -> file names."""
+        self.tables = {name: FakeTable(columns) for name, columns in tables.items()}
+        self.buckets = {name: list(files) for name, files in (buckets or {}).items()}
+        self.latency = latency_ms / 1000
+        self.queries = 0
+
+    def table(self, name):
+        if name not in self.tables:
+            raise FakeAPIError(f'relation "public.{name}" does not exist')
+        return self.tables[name]
+
+
+def _ilike(pattern):
+    regex = "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+    return re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL)
+
+
+def _split_top_level(text):
+    """Split 'a,b(c,d),e' on the commas outside parentheses."""
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "," and not depth:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    parts.append(current.strip())
+    return [part for part in parts if part]
+
+
+def _parse_logic(text):
+    """PostgREST logic-tree syntax: 'col.op.value' or 'and(...)' / 'or(...)', comma separated."""
+    alternatives = []
+    for part in _split_top_level(text):
+        if part.startswith(("and(", "or(")) and part.endswith(")"):
+            op, _, inner = part.partition("(")
+            alternatives.append((op, None, _parse_logic(inner[:-1])))
+        else:
+            column, op, value = part.split(".", 2)
+            if len(value) >= 2 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            alternatives.append((op, column, value))
+    return alternatives
+
+
+def _coerce(value, column):
+    """or_() filter values arrive as strings; match the column's type."""
+    if column.dtype.kind in "iu":
+        return int(value)
+    if column.dtype.kind == "f":
+        return float(value)
+    return value
+
+
+class QueryBuilder:
+    def __init__(self, db, table):
+        self.db = db
+        self.table_name = table
+        self.columns = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.count = None
+        self.mode = None
+        self.payload = None
+        self.result_mode = "all"
+
+    # -- building --------------------------------------------------------
+
+    def select(self, columns="*", count=None):
+        self.mode = self.mode or "select"
+        if columns.strip() != "*":
+            self.columns = [column.strip() for column in columns.split(",") if column.strip()]
+        return self
+
+    def insert(self, rows):
+        self.mode = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        self.mode = "update"
+        self.payload = values
+        return self
+
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def ilike(self, column, pattern):
+        return self._filter("ilike", column, pattern)
+
+    def or_(self, filters):
+        """PostgREST ``or`` syntax: 'col.op.value, and(col.op.value, ...)'."""
+        self.filters.append(("or", None, _parse_logic(filters)))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.count = size
+        return self
+
+    def range(self, start, end):
+        self.offset = start
+        self.count = end - start + 1
+        return self
+
+    def single(self):
+        self.result_mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.result_mode = "maybe_single"
+        return self
+
+    # -- running ---------------------------------------------------------
+
+    def _mask(self, table, positions, op, column, value):
+        if op in ("or", "and"):
+            mask = np.full(len(positions), op == "and")
+            for sub_op, sub_column, raw in value:
+                if sub_column is not None:
+                    raw = _coerce(raw, table.columns[sub_column])
+                sub_mask = self._mask(table, positions, sub_op, sub_column, raw)
+                mask = mask & sub_mask if op == "and" else mask | sub_mask
+            return mask
+
+        values = table.columns[column][positions]
+        if op == "eq":
+            return values == value
+        if op == "neq":
+            return values != value
+        if op == "gt":
+            return values > value
+        if op == "gte":
+            return values >= value
+        if op == "lt":
+            return values < value
+        if op == "lte":
+            return values <= value
+        if op == "in":
+            return np.isin(values, np.asarray(value, dtype=values.dtype if values.dtype != object else object))
+        if op == "ilike":
+            pattern = _ilike(value)
+            return np.fromiter((v is not None and bool(pattern.match(str(v))) for v in values), bool, len(values))
+        raise FakeAPIError(f"Unsupported filter '{op}'")
+
+    def _positions(self, table):
+        filters = list(self.filters)
+        positions = None
+        if len(table) >= INDEX_MIN_ROWS:
+            for i, (op, column, value) in enumerate(filters):
+                if op in ("eq", "in") and column in table.columns and table.columns[column].dtype != object:
+                    positions = table.lookup(column, [value] if op == "eq" else value)
+                    del filters[i]
+                    break
+        if positions is None:
+            positions = np.arange(len(table))
+        for op, column, value in filters:
+            positions = positions[self._mask(table, positions, op, column, value)]
+        return positions
+
+    def _sorted(self, table, positions):
+        if not self.orders or not len(positions):
+            return positions
+        keys = []
+        for column, desc in reversed(self.orders):
+            key = table.columns[column][positions]
+            if key.dtype == object:
+                key = np.unique(key.astype(str), return_inverse=True)[1]
+            if desc:
+                key = -np.unique(key, return_inverse=True)[1]
+            keys.append(key)
+        return positions[np.lexsort(keys)]
+
+    def _run(self):
+        self.db.queries += 1
+        table = self.db.table(self.table_name)
+
+        if self.mode == "insert":
+            rows = table.rows(table.insert(self.payload), None)
+            return FakeResponse(rows)
+
+        positions = self._sorted(table, self._positions(table))
+        if self.mode == "update":
+            table.update(positions, self.payload)
+            return FakeResponse(table.rows(positions, None))
+
+        positions = positions[self.offset:]
+        if self.count is not None:
+            positions = positions[:self.count]
+        rows = table.rows(positions, self.columns)
+
+        if self.result_mode == "single":
+            if len(rows) != 1:
+                raise FakeAPIError(f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+            return FakeResponse(rows[0])
+        if self.result_mode == "maybe_single":
+            if len(rows) > 1:
+                raise FakeAPIError("JSON object requested, multiple rows returned")
+            return FakeResponse(rows[0] if rows else None)
+        return FakeResponse(rows)
+
+    def execute(self):
+        return self._run()
+
+
+class AsyncQueryBuilder(QueryBuilder):
+    async def execute(self):
+        if self.db.latency:
+            await asyncio.sleep(self.db.latency)
+        return self._run()
+
+
+def players_range_totals(db, params):
+    """players_range_totals from backend/sql/summary_functions.sql."""
+    from app.aggregation import PLAYER_FIELDS
+
+    table = db.table("player_statistics")
+    positions = table.lookup("player_id", params["p_player_ids"])
+    dates = table.columns["game_date"][positions]
+    if params.get("p_start_date"):
+        positions = positions[dates >= str(params["p_start_date"])[:10]]
+        dates = table.columns["game_date"][positions]
+    if params.get("p_end_date"):
+        positions = positions[dates <= str(params["p_end_date"])[:10]]
+    player_ids, groups = np.unique(table.columns["player_id"][positions], return_inverse=True)
+    games = np.bincount(groups, minlength=len(player_ids))
+    sums = {
+        field: np.bincount(groups, weights=table.columns[field][positions], minlength=len(player_ids))
+        for field in PLAYER_FIELDS
+    }
+    return [
+        {"player_id": int(player_id), "games": int(games[i]), **{field: float(sums[field][i]) for field in PLAYER_FIELDS}}
+        for i, player_id in enumerate(player_ids)
+    ]
+
+
+FUNCTIONS = {"players_range_totals": players_range_totals}
+
+
+class RpcBuilder:
+    def __init__(self, db, function, params):
+        self.db = db
+        self.function = function
+        self.params = params or {}
+
+    def _run(self):
+        if self.function not in FUNCTIONS:
+            raise FakeAPIError(f"Could not find the function public.{self.function}")
+        return FakeResponse(FUNCTIONS[self.function](self.db, self.params))
+
+    def execute(self):
+        return self._run()
+
+
+class AsyncRpcBuilder(RpcBuilder):
+    async def execute(self):
+        if self.db.latency:
+            await asyncio.sleep(self.db.latency)
+        return self._run()
+
+
+class FakeBucket:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def list(self, path=None, options=None):
+        options = options or {}
+        offset = options.get("offset", 0)
+        limit = options.get("limit", 100)
+        return [{"name": name, "updated_at": None} for name in self.db.buckets.get(self.name, [])[offset:offset + limit]]
+
+    def get_public_url(self, path):
+        return f"https://fake.supabase.local/storage/v1/object/public/{self.name}/{path}"
+
+
+class AsyncFakeBucket(FakeBucket):
+    async def list(self, path=None, options=None):
+        return super().list(path, options)
+
+    async def get_public_url(self, path):
+        return super().get_public_url(path)
+
+
+class FakeStorage:
+    def __init__(self, db, bucket_class):
+        self.db = db
+        self.bucket_class = bucket_class
+
+    def from_(self, bucket):
+        return self.bucket_class(self.db, bucket)
+
+
+class FakePostgrest:
+    async def aclose(self):
+        pass
+
+    def aclose_sync(self):
+        pass
+
+
+class FakeClient:
+    builder_class = QueryBuilder
+    rpc_class = RpcBuilder
+    bucket_class = FakeBucket
+
+    def __init__(self, db):
+        self.db = db
+        self.storage = FakeStorage(db, self.bucket_class)
+        self.postgrest = FakePostgrest()
+
+    def table(self, name):
+        return self.builder_class(self.db, name)
+
+    def rpc(self, function, params=None):
+        return self.rpc_class(self.db, function, params)
+
+
+class FakeAsyncClient(FakeClient):
+    builder_class = AsyncQueryBuilder
+    rpc_class = AsyncRpcBuilder
+    bucket_class = AsyncFakeBucket
+
+
+def install(db):
+    """Point app.main's client factories at ``db``. Call before importing app.main."""
+    import supabase
+
+    import app.repository
+
+    os.environ.setdefault("SUPABASE_URL", "https://fake.supabase.local")
+    os.environ.setdefault("SUPABASE_KEY", "fake-key")
+    os.environ.setdefault("SECRET_KEY", "offline-benchmark-secret-key-0123456789")
+    # Request logs would drown the report; LOG_LEVEL=INFO brings them back.
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Cheap hashes keep /login about the request path; bench_login measures hashing.
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    # Results another run left in the shared cache came from another dataset.
+    os.environ.setdefault("DATASET_VERSION", f"offline-{os.getpid()}-{time.time_ns()}")
+
+    async def create_async_supabase(url, key):
+        return FakeAsyncClient(db)
+
+    supabase.create_client = lambda url, key, *args, **kwargs: FakeClient(db)
+    app.repository.create_async_supabase = create_async_supabase
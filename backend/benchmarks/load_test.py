@@ -0,0 +1,85 @@
+"""
+Concurrency load test against a running backend.
+
+Each endpoint is driven at increasing concurrency levels and the
+throughput and latency are reported per level. With the async repository
+throughput should keep climbing with concurrency until the Supabase
+connection pool (SUPABASE_MAX_CONNECTIONS) is saturated.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.load_test --username <user> --password <password>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+ENDPOINTS = {
+    "/player_statistics": {"player_id": 2544, "start_date": "2015-10-01", "end_date": "2024-06-30"},
+    "/get_clutch_factor": {"player_id": 2544, "start_date": "2015-10-01", "end_date": "2024-06-30"},
+    "/teams_statistics": {"teamAId": 1610612747, "teamBId": 1610612738, "numGames": 10, "statistic": "assists"},
+    "/favourite_team_data": {"team_id": 1610612747},
+    "/favourite_player_data": {"player_id": 2544},
+}
+
+
+async def login(client, username, password):
+    response = await client.post("/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["token"]
+
+
+async def run_level(client, path, body, headers, concurrency, requests_per_worker):
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in range(requests_per_worker):
+            started = time.perf_counter()
+            response = await client.post(path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--levels", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=10, help="requests per worker")
+    parser.add_argument("--endpoint", action="append", choices=list(ENDPOINTS))
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as client:
+        headers = {"Authorization": f"Bearer {await login(client, args.username, args.password)}"}
+        for path in args.endpoint or ENDPOINTS:
+            print(path)
+            for level in map(int, args.levels.split(",")):
+                result = await run_level(client, path, ENDPOINTS[path], headers, level, args.requests)
+                print(f"  c={result['concurrency']:<4} {result['throughput']:8.1f} req/s  "
+                      f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                      f"errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
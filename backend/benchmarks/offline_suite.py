@@ -0,0 +1,319 @@
+"""
+Offline load test of every read endpoint, against a fake Supabase.
+
+Generates the synthetic dataset (benchmarks/synthetic.py), serves it
+through the in-memory client in benchmarks/fake_supabase.py, and runs
+the app in-process over httpx's ASGI transport, lifespan included. No
+network, credentials or Supabase project are needed. With ``--url`` the
+same scenarios run against a live backend instead, which must already
+hold a dataset matching ``--scale``/``--seed``.
+
+Each scenario sends seeded random parameters (players, team pairs, date
+ranges, categories) at each concurrency level. p50/p95/p99 latency,
+throughput and errors are printed and saved to
+benchmarks/results/<timestamp>.json. ``--compare`` prints the change
+against an earlier results file.
+
+Run from the backend folder:
+
+    python -m benchmarks.offline_suite --scale 0.25 --levels 1,8,32
+    python -m benchmarks.offline_suite --compare benchmarks/results/<earlier>.json
+
+Client and server share one event loop in-process, so latencies include
+client overhead; compare runs with each other, not with production.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_supabase import FakeDatabase, install
+from benchmarks.synthetic import FIRST_TEAM_ID, TEAM_NAMES, generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+LEADERBOARD_STATS = ("average_points", "average_assists", "average_rebounds", "field_goal_percentage")
+
+SERIES_CATEGORIES = (
+    "assists", "turnovers", "team_score", "q1_points", "q4_points",
+    "field_goals_percentage", "three_pointers_percentage", "rebounds_total", "blocks",
+)
+
+
+class Scenarios:
+    """Request builders per scenario; each returns (method, path, httpx kwargs)."""
+
+    def __init__(self, rng, player_ids, player_names, first_day, last_day):
+        self.rng = rng
+        self.player_ids = player_ids
+        self.player_names = player_names
+        # Date ranges cover the active players' current stint.
+        self.first_day = first_day
+        self.last_day = last_day
+        self.credentials = None
+
+    def team_pair(self):
+        first, second = self.rng.sample(range(len(TEAM_NAMES)), 2)
+        return FIRST_TEAM_ID + first, FIRST_TEAM_ID + second
+
+    def date_range(self):
+        span = (self.last_day - self.first_day).days
+        start = self.first_day + timedelta(days=self.rng.randrange(span))
+        end = start + timedelta(days=self.rng.randrange(90, 4 * 365))
+        return {"start_date": start.isoformat(), "end_date": min(end, self.last_day).isoformat()}
+
+    def player_range(self):
+        return {"player_id": self.rng.choice(self.player_ids), **self.date_range()}
+
+    def matchup(self):
+        first, second = self.team_pair()
+        return {
+            "teamAId": first,
+            "teamBId": second,
+            "numGames": self.rng.choice((5, 10, 20, 40)),
+            "statistic": self.rng.choice(SERIES_CATEGORIES),
+        }
+
+    def all(self):
+        rng = self.rng
+        return {
+            "POST /login": lambda: ("POST", "/login", {"json": self.credentials}),
+            "GET /teams": lambda: ("GET", "/teams", {}),
+            "GET /teams?search": lambda: ("GET", "/teams", {"params": {"search": rng.choice(TEAM_NAMES)[1][:4]}}),
+            "GET /players page": lambda: ("GET", "/players", {"params": {"limit": 100, "fields": "player_id,name"}}),
+            "GET /players?search": lambda: (
+                "GET", "/players", {"params": {"search": rng.choice(self.player_names)[:4]}}
+            ),
+            "GET /player-image": lambda: ("GET", "/player-image", {"params": {"name": rng.choice(self.player_names)}}),
+            "GET /users/info": lambda: ("GET", "/users/info", {}),
+            "POST /teams_statistics": lambda: ("POST", "/teams_statistics", {"json": self.matchup()}),
+            "GET /teams_statistics": lambda: ("GET", "/teams_statistics", {"params": self.matchup()}),
+            "GET /teams_statistics columnar": lambda: (
+                "GET", "/teams_statistics",
+                {"params": {**self.matchup(), "all_categories": True, "format": "columnar"}},
+            ),
+            "POST /player_statistics": lambda: ("POST", "/player_statistics", {"json": self.player_range()}),
+            "GET /player_statistics": lambda: ("GET", "/player_statistics", {"params": self.player_range()}),
+            "GET /player_statistics/games": lambda: (
+                "GET", "/player_statistics/games", {"params": {"player_id": rng.choice(self.player_ids)}}
+            ),
+            "POST /get_clutch_factor": lambda: ("POST", "/get_clutch_factor", {"json": self.player_range()}),
+            "GET /get_clutch_factor": lambda: ("GET", "/get_clutch_factor", {"params": self.player_range()}),
+            "POST /player_statistics/batch": lambda: (
+                "POST", "/player_statistics/batch",
+                {"json": {"player_ids": rng.sample(self.player_ids, 10), **self.date_range()}},
+            ),
+            "POST /get_clutch_factor/batch": lambda: (
+                "POST", "/get_clutch_factor/batch",
+                {"json": {"player_ids": rng.sample(self.player_ids, 10), **self.date_range()}},
+            ),
+            "POST /teams_statistics/batch": lambda: (
+                "POST", "/teams_statistics/batch",
+                {"json": {
+                    "pairs": [dict(zip(("teamAId", "teamBId"), self.team_pair())) for _ in range(5)],
+                    "numGames": 10,
+                    "statistic": "assists",
+                    "all_categories": True,
+                }},
+            ),
+            "POST /favourite_team_data": lambda: (
+                "POST", "/favourite_team_data", {"json": {"team_id": self.team_pair()[0]}}
+            ),
+            "GET /favourite_team_data": lambda: (
+                "GET", "/favourite_team_data", {"params": {"team_id": self.team_pair()[0]}}
+            ),
+            "POST /favourite_player_data": lambda: (
+                "POST", "/favourite_player_data", {"json": {"player_id": rng.choice(self.player_ids)}}
+            ),
+            "GET /favourite_player_data": lambda: (
+                "GET", "/favourite_player_data", {"params": {"player_id": rng.choice(self.player_ids)}}
+            ),
+            "GET /leaderboard": lambda: (
+                "GET", "/leaderboard",
+                {"params": {"stat": rng.choice(LEADERBOARD_STATS), "min_games": 10, **self.date_range()}},
+            ),
+            "GET /metrics": lambda: ("GET", "/metrics", {}),
+        }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+async def run_level(client, build, headers, concurrency, requests_per_worker):
+    latencies = []
+    statuses = {}
+
+    async def worker():
+        for _ in range(requests_per_worker):
+            method, path, kwargs = build()
+            started = time.perf_counter()
+            response = await client.request(method, path, headers=headers, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+@asynccontextmanager
+async def open_client(args, tables, buckets):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=300) as client:
+            yield client
+        return
+
+    install(FakeDatabase(tables, buckets, latency_ms=args.latency_ms))
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://offline", timeout=300) as client:
+            yield client
+
+
+async def wait_ready(client, poll_seconds=0.1):
+    """Poll /readyz until warm-up has finished and return its timings."""
+    while True:
+        response = await client.get("/readyz")
+        if response.status_code == 200:
+            return response.json()["timings"]
+        await asyncio.sleep(poll_seconds)
+
+
+async def sign_in(client, rng):
+    """Register a throwaway user and return (credentials, auth headers)."""
+    suffix = rng.randrange(10**9)
+    credentials = {"username": f"bench{suffix}", "password": f"bench-password-{suffix}"}
+    await client.post("/register", json={
+        **credentials,
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "email": f"bench{suffix}@example.com",
+    })
+    response = await client.post("/login", json=credentials)
+    response.raise_for_status()
+    return credentials, {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def dataset_summary(tables):
+    return {name: len(next(iter(columns.values()))) for name, columns in tables.items()}
+
+
+def print_level(result):
+    print(f"  c={result['concurrency']:<4} {result['throughput']:9.1f} req/s  "
+          f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+          f"p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}")
+
+
+def compare(current, previous):
+    """Print per scenario and level how throughput and tail latency moved."""
+    print(f"\ncompared with {previous['started_at']}")
+    for name, levels in current["scenarios"].items():
+        before = {level["concurrency"]: level for level in previous["scenarios"].get(name, [])}
+        for level in levels:
+            old = before.get(level["concurrency"])
+            if old is None:
+                continue
+            deltas = "  ".join(
+                f"{key} {_change(old[key], level[key])}" for key in ("throughput", "p50_ms", "p95_ms", "p99_ms")
+            )
+            print(f"  {name:<32} c={level['concurrency']:<4} {deltas}")
+
+
+def _change(old, new):
+    return f"{(new - old) / old * 100:+7.1f}%" if old else "    n/a"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="benchmark a running backend instead of the in-process fake")
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of the 24 synthetic seasons")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--levels", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=20, help="requests per worker")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated Supabase round trip")
+    parser.add_argument("--scenario", action="append", help="only run scenarios containing this text")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tables, buckets = generate(args.scale, args.seed)
+    generated_in = time.perf_counter() - started
+    print(f"dataset: {dataset_summary(tables)} in {generated_in:.1f} s")
+
+    active = tables["active_players"]
+    players = tables["player_statistics"]
+    days = players["game_date"][np.isin(players["player_id"], active["player_id"])].astype("datetime64[D]")
+    rng = random.Random(args.seed)
+    builders = Scenarios(
+        rng,
+        [int(pid) for pid in active["player_id"]],
+        [f"{first} {last}" for first, last in zip(active["first_name"], active["last_name"])],
+        days.min().item(),
+        days.max().item(),
+    )
+    scenarios = builders.all()
+    if args.scenario:
+        scenarios = {name: build for name, build in scenarios.items() if any(s in name for s in args.scenario)}
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {**vars(args), "python": platform.python_version()},
+        "dataset": dataset_summary(tables),
+        "scenarios": {},
+    }
+    async with open_client(args, tables, buckets) as client:
+        report["startup"] = await wait_ready(client)
+        print(f"startup: {report['startup']}")
+        builders.credentials, headers = await sign_in(client, rng)
+        for name, build in scenarios.items():
+            print(name)
+            results = report["scenarios"][name] = []
+            for level in map(int, args.levels.split(",")):
+                result = await run_level(client, build, headers, level, args.requests)
+                results.append(result)
+                print_level(result)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults saved to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,240 @@
+"""
+Synthetic NBA dataset for the offline benchmarks.
+
+Shaped like the Supabase tables the backend reads, with the same column
+names. At full scale it produces 24 seasons of 82 rounds of 15 games:
+
+- ``team_statistics``: ~59k rows, one per team per game. Scores,
+  quarters, shooting splits and percentages are consistent with each
+  other, and both sides of a game agree on the result;
+- ``player_statistics``: ~1.5M rows, 25 per team-game. Players stay with
+  one team for a four-season stint;
+- ``teams``, ``active_players`` (players of the last stint), an empty
+  ``users`` table, and a ``Player images`` bucket listing most players.
+
+Generation is vectorized and seeded, so two runs with the same arguments
+benchmark the same data. ``scale`` shrinks the number of seasons.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+TEAM_NAMES = (
+    ("Atlanta", "Hawks"), ("Boston", "Celtics"), ("Cleveland", "Cavaliers"),
+    ("New Orleans", "Pelicans"), ("Chicago", "Bulls"), ("Dallas", "Mavericks"),
+    ("Denver", "Nuggets"), ("Golden State", "Warriors"), ("Houston", "Rockets"),
+    ("Los Angeles", "Clippers"), ("Los Angeles", "Lakers"), ("Miami", "Heat"),
+    ("Milwaukee", "Bucks"), ("Minnesota", "Timberwolves"), ("Brooklyn", "Nets"),
+    ("New York", "Knicks"), ("Orlando", "Magic"), ("Indiana", "Pacers"),
+    ("Philadelphia", "76ers"), ("Phoenix", "Suns"), ("Portland", "Trail Blazers"),
+    ("Sacramento", "Kings"), ("San Antonio", "Spurs"), ("Oklahoma City", "Thunder"),
+    ("Toronto", "Raptors"), ("Utah", "Jazz"), ("Memphis", "Grizzlies"),
+    ("Washington", "Wizards"), ("Detroit", "Pistons"), ("Charlotte", "Hornets"),
+)
+FIRST_TEAM_ID = 1610612737
+
+FIRST_NAMES = ("James", "Luka", "Kevin", "Stephen", "Nikola", "Jayson", "Devin", "Anthony",
+               "Damian", "Jimmy", "Kawhi", "Paul", "Chris", "Tyrese", "Jalen", "Zion")
+LAST_NAMES = ("Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Wilson",
+              "Anderson", "Thomas", "Moore", "Martin", "Jackson", "White", "Harris", "Clark")
+POSITIONS = ("Guard", "Forward", "Center", "Guard-Forward", "Forward-Center")
+
+SEASONS = 24
+ROUNDS = 82
+PLAYERS_PER_GAME = 25
+STINT_SEASONS = 4
+FIRST_SEASON = 2001
+PLAYER_ID_BASE = 1_000_000
+IMAGE_SHARE = 0.9
+
+USER_COLUMNS = (
+    "first_name", "last_name", "username", "email", "hashed_password",
+    "favourite_team_id", "favourite_player_id", "favourite_team_name", "favourite_player_name",
+)
+
+
+def player_id(team, season, slot):
+    return PLAYER_ID_BASE + team * 1000 + (season // STINT_SEASONS) * PLAYERS_PER_GAME + slot
+
+
+def _schedule(rng, seasons):
+    """(season, day, home team, away team) per game; every round pairs all 30 teams."""
+    teams = len(TEAM_NAMES)
+    rounds = seasons * ROUNDS
+    pairs = np.argsort(rng.random((rounds, teams)), axis=1).reshape(rounds, teams // 2, 2)
+    season = np.repeat(np.arange(seasons), ROUNDS * (teams // 2))
+    round_in_season = np.tile(np.repeat(np.arange(ROUNDS), teams // 2), seasons)
+    return season, round_in_season, pairs[..., 0].ravel(), pairs[..., 1].ravel()
+
+
+def _dates(season, round_in_season):
+    starts = np.array([date(FIRST_SEASON + s, 10, 25) for s in range(season.max() + 1)], dtype="datetime64[D]")
+    days = starts[season] + round_in_season * 2
+    return days.astype("U10")
+
+
+def _shooting(rng, n):
+    fga = rng.integers(75, 100, n)
+    tpa = rng.integers(20, 45, n)
+    fta = rng.integers(12, 32, n)
+    fgm = rng.binomial(fga, 0.46)
+    tpm = np.minimum(rng.binomial(tpa, 0.36), fgm)
+    ftm = rng.binomial(fta, 0.77)
+    return fgm, fga, tpm, tpa, ftm, fta
+
+
+def _quarters(rng, score):
+    shares = rng.dirichlet((8, 8, 8, 8), len(score))
+    quarters = np.floor(shares * score[:, None]).astype(np.int64)
+    quarters[:, 3] += score - quarters.sum(axis=1)
+    return quarters
+
+
+def team_statistics(rng, seasons):
+    season, round_in_season, home, away = _schedule(rng, seasons)
+    games = len(season)
+    game_id = 20_000_000 + np.arange(games)
+    game_date = _dates(season, round_in_season)
+
+    # Two rows per game: home side first, then away.
+    team = np.concatenate((home, away))
+    opponent = np.concatenate((away, home))
+    fgm, fga, tpm, tpa, ftm, fta = _shooting(rng, 2 * games)
+    score = 2 * fgm + tpm + ftm
+
+    # No ties: the home side makes one more free throw.
+    tied = np.flatnonzero(score[:games] == score[games:])
+    ftm[tied] += 1
+    fta[tied] = np.maximum(fta[tied], ftm[tied])
+    score[tied] += 1
+
+    opponent_score = np.concatenate((score[games:], score[:games]))
+    quarters = _quarters(rng, score)
+    n = 2 * games
+    return {
+        "game_id": np.concatenate((game_id, game_id)),
+        "game_date": np.concatenate((game_date, game_date)),
+        "teamId": FIRST_TEAM_ID + team,
+        "opponent_team_id": FIRST_TEAM_ID + opponent,
+        "home": np.repeat((1, 0), games),
+        "win": (score > opponent_score).astype(np.int64),
+        "team_score": score,
+        "opponent_score": opponent_score,
+        "q1_points": quarters[:, 0],
+        "q2_points": quarters[:, 1],
+        "q3_points": quarters[:, 2],
+        "q4_points": quarters[:, 3],
+        "field_goals_made": fgm,
+        "field_goals_attempted": fga,
+        "field_goals_percentage": np.round(fgm / fga, 3),
+        "three_pointers_made": tpm,
+        "three_pointers_attempted": tpa,
+        "three_pointers_percentage": np.round(tpm / tpa, 3),
+        "free_throws_made": ftm,
+        "free_throws_attempted": fta,
+        "free_throws_percentage": np.round(ftm / fta, 3),
+        "assists": rng.integers(15, 35, n),
+        "blocks": rng.integers(1, 10, n),
+        "steals": rng.integers(3, 13, n),
+        "turnovers": rng.integers(8, 20, n),
+        "rebounds_total": rng.integers(32, 55, n),
+        "fouls_personal": rng.integers(14, 26, n),
+    }, np.concatenate((season, season))
+
+
+def player_statistics(rng, teams, season):
+    """PLAYERS_PER_GAME rows per team row, each player on their team's roster for that stint."""
+    rows = len(teams["game_id"])
+    slot = np.tile(np.arange(PLAYERS_PER_GAME), rows)
+    repeat = lambda column: np.repeat(column, PLAYERS_PER_GAME)
+    team = repeat(teams["teamId"] - FIRST_TEAM_ID)
+    n = len(slot)
+
+    fga = rng.integers(0, 22, n)
+    tpa = np.minimum(rng.integers(0, 10, n), fga)
+    fta = rng.integers(0, 9, n)
+    fgm = rng.binomial(fga, 0.46)
+    tpm = np.minimum(rng.binomial(tpa, 0.36), fgm)
+    ftm = rng.binomial(fta, 0.77)
+    return {
+        "player_id": player_id(team, repeat(season), slot),
+        "game_id": repeat(teams["game_id"]),
+        "game_date": repeat(teams["game_date"]),
+        "teamId": repeat(teams["teamId"]),
+        "home": repeat(teams["home"]),
+        "win": repeat(teams["win"]),
+        "points": 2 * fgm + tpm + ftm,
+        "assists": rng.integers(0, 12, n),
+        "rebounds_total": rng.integers(0, 15, n),
+        "field_goals_made": fgm,
+        "field_goals_attempted": fga,
+        "three_pointers_made": tpm,
+        "three_pointers_attempted": tpa,
+        "free_throws_made": ftm,
+        "free_throws_attempted": fta,
+    }
+
+
+def teams_table():
+    rows = []
+    for i, (city, nickname) in enumerate(TEAM_NAMES):
+        rows.append({
+            "id": FIRST_TEAM_ID + i,
+            "full_name": f"{city} {nickname}",
+            "abbreviation": nickname[:3].upper(),
+            "nickname": nickname,
+            "city": city,
+            "year_founded": 1946 + i,
+            "logo_url": f"https://cdn.nba.com/logos/nba/{FIRST_TEAM_ID + i}/primary/L/logo.svg",
+        })
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+def active_players_table(rng, seasons):
+    """Players of the last stint, with trivia for /favourite_player_data."""
+    stint = seasons - 1
+    rows = []
+    for team in range(len(TEAM_NAMES)):
+        for slot in range(PLAYERS_PER_GAME):
+            pid = int(player_id(team, stint, slot))
+            rows.append({
+                "player_id": pid,
+                "first_name": FIRST_NAMES[pid % len(FIRST_NAMES)],
+                "last_name": f"{LAST_NAMES[(pid // 7) % len(LAST_NAMES)]} {pid % 1000}",
+                "jersey": str(slot),
+                "team_id": FIRST_TEAM_ID + team,
+                "country": "USA",
+                "birthdate": str(date(1990, 1, 1) + timedelta(days=int(rng.integers(0, 3650)))),
+                "height": f"6-{int(rng.integers(0, 12))}",
+                "position": POSITIONS[slot % len(POSITIONS)],
+                "draft_team_id": int(FIRST_TEAM_ID + rng.integers(0, len(TEAM_NAMES))) if slot % 4 else -1,
+                "draft_number": int(rng.integers(1, 61)),
+                "draft_year": int(rng.integers(2008, 2024)),
+            })
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+def users_table():
+    return {
+        "id": np.empty(0, dtype=np.int64),
+        **{column: np.empty(0, dtype=object) for column in USER_COLUMNS},
+    }
+
+
+def generate(scale=1.0, seed=0):
+    """Tables (name -> {column: array}) and buckets (name -> file names)."""
+    rng = np.random.default_rng(seed)
+    seasons = max(STINT_SEASONS, round(SEASONS * scale))
+    team_rows, season = team_statistics(rng, seasons)
+    player_rows = player_statistics(rng, team_rows, season)
+    active = active_players_table(rng, seasons)
+    with_image = rng.random(len(active["player_id"])) < IMAGE_SHARE
+    images = [f"{pid}.png" for pid, keep in zip(active["player_id"], with_image) if keep]
+    tables = {
+        "team_statistics": team_rows,
+        "player_statistics": player_rows,
+        "teams": teams_table(),
+        "active_players": active,
+        "users": users_table(),
+    }
+    return tables, {"Player images": images}
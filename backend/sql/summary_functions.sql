@@ -0,0 +1,125 @@
+-- Summary totals for SUMMARY_BACKEND=postgres (see app/pushdown.py).
+-- Run once in the Supabase SQL editor. Each function aggregates on the
+-- server and returns totals, which PostgREST exposes as
+-- /rpc/player_summary_totals, /rpc/clutch_summary_totals and
+-- /rpc/players_range_totals. Sums are cast to numeric so the declared
+-- column types hold whatever the source types. players_range_totals is
+-- also used by /leaderboard with any SUMMARY_BACKEND.
+
+create index if not exists player_statistics_player_date
+    on player_statistics (player_id, game_date);
+create index if not exists team_statistics_game_home
+    on team_statistics (game_id, home);
+
+create or replace function player_summary_totals(
+    p_player_id bigint,
+    p_start_date date default null,
+    p_end_date date default null
+)
+returns table (
+    player_id bigint,
+    games bigint,
+    points numeric,
+    assists numeric,
+    rebounds_total numeric,
+    field_goals_made numeric,
+    field_goals_attempted numeric,
+    three_pointers_made numeric,
+    three_pointers_attempted numeric,
+    free_throws_made numeric,
+    free_throws_attempted numeric
+)
+language sql stable
+as $$
+    select
+        s.player_id::bigint,
+        count(*),
+        sum(s.points)::numeric,
+        sum(s.assists)::numeric,
+        sum(s.rebounds_total)::numeric,
+        sum(s.field_goals_made)::numeric,
+        sum(s.field_goals_attempted)::numeric,
+        sum(s.three_pointers_made)::numeric,
+        sum(s.three_pointers_attempted)::numeric,
+        sum(s.free_throws_made)::numeric,
+        sum(s.free_throws_attempted)::numeric
+    from player_statistics s
+    where s.player_id = p_player_id
+      and (p_start_date is null or s.game_date::date >= p_start_date)
+      and (p_end_date is null or s.game_date::date <= p_end_date)
+    group by s.player_id
+$$;
+
+create or replace function clutch_summary_totals(
+    p_player_id bigint,
+    p_start_date date default null,
+    p_end_date date default null,
+    p_margin integer default 5
+)
+returns table (
+    player_id bigint,
+    games bigint,
+    points numeric,
+    field_goals_made numeric,
+    field_goals_attempted numeric,
+    win numeric
+)
+language sql stable
+as $$
+    select
+        p.player_id::bigint,
+        count(*),
+        sum(p.points)::numeric,
+        sum(p.field_goals_made)::numeric,
+        sum(p.field_goals_attempted)::numeric,
+        sum(p.win::int)::numeric
+    from player_statistics p
+    join team_statistics t on t.game_id = p.game_id and t.home = p.home
+    where p.player_id = p_player_id
+      and (p_start_date is null or p.game_date::date >= p_start_date)
+      and (p_end_date is null or p.game_date::date <= p_end_date)
+      and abs(t.team_score - t.opponent_score) <= p_margin
+    group by p.player_id
+$$;
+
+-- Per-player totals of many players at once, for /leaderboard
+-- (SupabaseRepository.players_range_totals). Players without games in the
+-- range are left out.
+create or replace function players_range_totals(
+    p_player_ids bigint[],
+    p_start_date date default null,
+    p_end_date date default null
+)
+returns table (
+    player_id bigint,
+    games bigint,
+    points numeric,
+    assists numeric,
+    rebounds_total numeric,
+    field_goals_made numeric,
+    field_goals_attempted numeric,
+    three_pointers_made numeric,
+    three_pointers_attempted numeric,
+    free_throws_made numeric,
+    free_throws_attempted numeric
+)
+language sql stable
+as $$
+    select
+        s.player_id::bigint,
+        count(*),
+        sum(s.points)::numeric,
+        sum(s.assists)::numeric,
+        sum(s.rebounds_total)::numeric,
+        sum(s.field_goals_made)::numeric,
+        sum(s.field_goals_attempted)::numeric,
+        sum(s.three_pointers_made)::numeric,
+        sum(s.three_pointers_attempted)::numeric,
+        sum(s.free_throws_made)::numeric,
+        sum(s.free_throws_attempted)::numeric
+    from player_statistics s
+    where s.player_id = any(p_player_ids)
+      and (p_start_date is null or s.game_date::date >= p_start_date)
+      and (p_end_date is null or s.game_date::date <= p_end_date)
+    group by s.player_id
+$$;
@@ -0,0 +1,23 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.auth import UserCache  # noqa: E402
+
+
+def test_user_cache_from_many_threads():
+    # Dependencies run on threadpool threads; a tiny cache evicts on almost every call.
+    cache = UserCache(ttl=60, max_size=4)
+
+    def work(i):
+        for j in range(2000):
+            username = f"user{(i + j) % 16}"
+            assert cache.get(username, lambda name: {"username": name})["username"] == username
+            if j % 7 == 0:
+                cache.invalidate(username)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(8)))
+    assert len(cache.users) <= 4
+    assert cache.hits + cache.misses == 8 * 2000
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.clutch import ClutchIndex
+
+
+class TeamGames:
+    def __init__(self, rows):
+        self.rows = rows
+        self.requested = []
+
+    async def team_games_by_ids(self, game_ids, columns):
+        self.requested.append(set(game_ids))
+        return [row for row in self.rows if row["game_id"] in game_ids]
+
+
+def test_games_without_team_rows_are_fetched_once():
+    repository = TeamGames([
+        {"game_id": 1, "home": 1, "team_score": 100, "opponent_score": 98},
+        {"game_id": 1, "home": 0, "team_score": 98, "opponent_score": 100},
+    ])
+    index = ClutchIndex()
+    asyncio.run(index.ensure(repository, [1, 2]))
+    asyncio.run(index.ensure(repository, [1, 2]))
+
+    assert repository.requested == [{1, 2}]
+    assert index.misses == 2 and index.hits == 2
+    assert index.is_clutch(1, 1) and not index.is_clutch(2, 1)
@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+from app.ingest import StoreSink, column_name, ingest
+from app.store import ColumnarStore
+from benchmarks import synthetic
+
+# Headers of PlayerStatistics.csv / TeamStatistics.csv and the columns they load into.
+PLAYER_HEADERS = {
+    "firstName": "first_name",
+    "lastName": "last_name",
+    "personId": "player_id",
+    "gameId": "game_id",
+    "gameDate": "game_date",
+    "playerteamCity": "player_team_city",
+    "playerteamName": "player_team_name",
+    "opponentteamCity": "opponent_team_city",
+    "opponentteamName": "opponent_team_name",
+    "gameType": "game_type",
+    "gameLabel": "game_label",
+    "gameSubLabel": "game_sub_label",
+    "seriesGameNumber": "series_game_number",
+    "win": "win",
+    "home": "home",
+    "numMinutes": "num_minutes",
+    "points": "points",
+    "assists": "assists",
+    "blocks": "blocks",
+    "steals": "steals",
+    "fieldGoalsAttempted": "field_goals_attempted",
+    "fieldGoalsMade": "field_goals_made",
+    "fieldGoalsPercentage": "field_goals_percentage",
+    "threePointersAttempted": "three_pointers_attempted",
+    "threePointersMade": "three_pointers_made",
+    "threePointersPercentage": "three_pointers_percentage",
+    "freeThrowsAttempted": "free_throws_attempted",
+    "freeThrowsMade": "free_throws_made",
+    "freeThrowsPercentage": "free_throws_percentage",
+    "reboundsDefensive": "rebounds_defensive",
+    "reboundsOffensive": "rebounds_offensive",
+    "reboundsTotal": "rebounds_total",
+    "foulsPersonal": "fouls_personal",
+    "turnovers": "turnovers",
+    "plusMinusPoints": "plus_minus_points",
+}
+
+TEAM_HEADERS = {
+    "gameId": "game_id",
+    "gameDate": "game_date",
+    "teamCity": "team_city",
+    "teamName": "team_name",
+    "teamId": "teamId",
+    "opponentTeamCity": "opponent_team_city",
+    "opponentTeamName": "opponent_team_name",
+    "opponentTeamId": "opponent_team_id",
+    "home": "home",
+    "win": "win",
+    "teamScore": "team_score",
+    "opponentScore": "opponent_score",
+    "assists": "assists",
+    "blocks": "blocks",
+    "steals": "steals",
+    "fieldGoalsAttempted": "field_goals_attempted",
+    "fieldGoalsMade": "field_goals_made",
+    "fieldGoalsPercentage": "field_goals_percentage",
+    "threePointersAttempted": "three_pointers_attempted",
+    "threePointersMade": "three_pointers_made",
+    "threePointersPercentage": "three_pointers_percentage",
+    "freeThrowsAttempted": "free_throws_attempted",
+    "freeThrowsMade": "free_throws_made",
+    "freeThrowsPercentage": "free_throws_percentage",
+    "reboundsDefensive": "rebounds_defensive",
+    "reboundsOffensive": "rebounds_offensive",
+    "reboundsTotal": "rebounds_total",
+    "foulsPersonal": "fouls_personal",
+    "turnovers": "turnovers",
+    "plusMinusPoints": "plus_minus_points",
+    "numMinutes": "num_minutes",
+    "q1Points": "q1_points",
+    "q2Points": "q2_points",
+    "q3Points": "q3_points",
+    "q4Points": "q4_points",
+    "benchPoints": "bench_points",
+    "biggestLead": "biggest_lead",
+    "biggestScoringRun": "biggest_scoring_run",
+    "leadChanges": "lead_changes",
+    "pointsFastBreak": "points_fast_break",
+    "pointsFromTurnovers": "points_from_turnovers",
+    "pointsInThePaint": "points_in_the_paint",
+    "pointsSecondChance": "points_second_chance",
+    "timesTied": "times_tied",
+    "timeoutsRemaining": "timeouts_remaining",
+    "seasonWins": "season_wins",
+    "seasonLosses": "season_losses",
+    "coachId": "coach_id",
+}
+
+
+@pytest.mark.parametrize(
+    "header, name", [*PLAYER_HEADERS.items(), *TEAM_HEADERS.items(), ("gameDateTimeEst", "game_date")]
+)
+def test_column_name(header, name):
+    assert column_name(header) == name
+
+
+@pytest.mark.parametrize("table, headers", [("player_statistics", PLAYER_HEADERS), ("team_statistics", TEAM_HEADERS)])
+def test_column_names_cover_the_tables(table, headers):
+    # The synthetic tables use the Supabase column names the API reads. The
+    # player CSV has no team id; the generator adds one that nothing reads.
+    tables, _ = synthetic.generate(0.01)
+    columns = set(tables[table]) - ({"teamId"} if table == "player_statistics" else set())
+    assert columns <= {column_name(header) for header in headers}
+
+
+def test_store_sink_appends_chunks_on_disk(tmp_path):
+    store_dir = str(tmp_path / "store")
+    sink = StoreSink("team_statistics", store_dir, replace=True)
+    sink.write({"teamId": [2, 1], "game_id": [10, 10], "game_date": ["2024-01-02", "2024-01-02"], "team_score": [99, 101]})
+    sink.close()
+
+    sink = StoreSink("team_statistics", store_dir)
+    sink.write({"teamId": [1], "game_id": [11], "game_date": ["2024-01-01"], "team_score": [90]})
+    # No team_score here, and a column the table doesn't have yet.
+    sink.write({"teamId": [2], "game_id": [12], "game_date": ["2024-01-03"], "team_name": ["Celtics"]})
+    sink.close()
+
+    table = ColumnarStore(store_dir).table("team_statistics")
+    assert table.column("teamId").tolist() == [1, 1, 2, 2]
+    assert table.column("game_id").tolist() == [11, 10, 10, 12]
+    np.testing.assert_array_equal(table.column("team_score"), [90, 101, 99, np.nan])
+    assert table.column("team_name").tolist() == ["", "", "", "Celtics"]
+    assert not (tmp_path / "store.team_statistics.spool").exists()
+
+
+def test_store_sink_keeps_numeric_columns_numeric_after_an_empty_chunk(tmp_path):
+    # Pre-1979 chunks have no three-point data at all.
+    store_dir = str(tmp_path / "store")
+    sink = StoreSink("player_statistics", store_dir, replace=True)
+    sink.write({"player_id": [1, 1], "game_id": [10, 11], "game_date": ["1978-01-02", "1978-01-03"],
+                "three_pointers_made": [None, None]})
+    sink.write({"player_id": [1, 1], "game_id": [12, 13], "game_date": ["1980-01-02", "1980-01-03"],
+                "three_pointers_made": [2, 3]})
+    sink.close()
+
+    column = ColumnarStore(store_dir).table("player_statistics").column("three_pointers_made")
+    assert column.dtype == np.float64
+    np.testing.assert_array_equal(column, [np.nan, np.nan, 2, 3])
+
+
+def test_store_sink_appends_after_rows_without_a_date(tmp_path):
+    store_dir = str(tmp_path / "store")
+    sink = StoreSink("team_statistics", store_dir, replace=True)
+    sink.write({"teamId": [1, 1], "game_id": [10, 11], "game_date": ["2024-01-02", None], "team_score": [99, 98]})
+    sink.close()
+
+    sink = StoreSink("team_statistics", store_dir)
+    assert sink.latest_date() == "2024-01-02"
+    assert sink.existing_pairs(sink.latest_date()) == {(10, 1)}
+
+    csv_path = tmp_path / "TeamStatistics.csv"
+    csv_path.write_text("gameId,gameDate,teamId,teamScore\n10,2024-01-02,1,99\n12,2024-01-05,1,101\n")
+    report = ingest(str(csv_path), "team_statistics", sink)
+    assert report["rows_written"] == 1
+    assert ColumnarStore(store_dir).table("team_statistics").column("game_id").tolist() == [10, 12, 11]
@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.aggregation import PLAYER_FIELDS, group_totals, to_matrix
+from app.repository import StoreRepository, SupabaseRepository
+from app.store import ColumnarStore, swap_store, write_arrays
+from benchmarks.fake_supabase import FakeAsyncClient, FakeDatabase
+from benchmarks.synthetic import generate
+
+RANGES = [
+    (None, None),
+    ("2010-01-01", "2012-06-30"),
+    (None, "2005-12-31"),
+    ("2019-10-01", None),
+    ("1980-01-01", "1980-12-31"),
+]
+
+
+@pytest.fixture(scope="module")
+def tables():
+    tables, _ = generate(scale=0.1, seed=3)
+    return tables
+
+
+@pytest.fixture(scope="module")
+def store(tables, tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("store") / "store"
+    tmp_dir = str(out_dir) + ".tmp"
+    meta = {"version": "test", "tables": {}}
+    for table in ("player_statistics", "team_statistics"):
+        arrays = {name: np.asarray(values) for name, values in tables[table].items()}
+        arrays["game_date"] = arrays["game_date"].astype("datetime64[D]")
+        meta["tables"][table] = write_arrays(tmp_dir, table, arrays)
+    swap_store(tmp_dir, str(out_dir), meta)
+    return ColumnarStore(str(out_dir))
+
+
+def expected_totals(tables, player_ids, start_date, end_date):
+    """The leaderboard's original path: every row as a dict, then one group-by."""
+    columns = tables["player_statistics"]
+    dates = np.asarray(columns["game_date"])
+    mask = np.isin(columns["player_id"], player_ids)
+    if start_date:
+        mask &= dates >= start_date
+    if end_date:
+        mask &= dates <= end_date
+    rows = [
+        {name: columns[name][i] for name in ("player_id", *PLAYER_FIELDS)}
+        for i in np.flatnonzero(mask)
+    ]
+    keys, counts, totals = group_totals(to_matrix(rows, PLAYER_FIELDS), [row["player_id"] for row in rows])
+    return np.asarray(keys, dtype=np.int64), counts, totals
+
+
+def assert_same_totals(actual, expected):
+    for got, want in zip(actual, expected):
+        np.testing.assert_array_equal(np.asarray(got), np.asarray(want))
+
+
+def leaderboard_players(tables):
+    # Active players plus the first and last player of the table, so spans touch both ends.
+    player_ids = np.asarray(tables["player_statistics"]["player_id"])
+    return sorted({*map(int, tables["active_players"]["player_id"]), int(player_ids.min()), int(player_ids.max())})
+
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_store_range_totals_match_rows(tables, store, start_date, end_date):
+    player_ids = leaderboard_players(tables)
+    repository = StoreRepository(store, None)
+    actual = asyncio.run(repository.players_range_totals(player_ids, start_date, end_date))
+    assert_same_totals(actual, expected_totals(tables, player_ids, start_date, end_date))
+
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_supabase_range_totals_match_rows(tables, start_date, end_date):
+    player_ids = leaderboard_players(tables)
+    repository = SupabaseRepository(FakeAsyncClient(FakeDatabase(tables)))
+    actual = asyncio.run(repository.players_range_totals(player_ids, start_date, end_date))
+    assert_same_totals(actual, expected_totals(tables, player_ids, start_date, end_date))
@@ -0,0 +1,96 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.aggregation import PLAYER_FIELDS
+from app.clutch import ClutchIndex
+from app.pushdown import SQLITE_COLUMNS, SQLITE_INDEXES, SqliteSummaries
+from app.statistics import calculate_clutch_summary, calculate_player_summary
+
+PLAYER_ID = 201939
+
+# (game_id, game_date, home, team_score, opponent_score): margins 3, 12, 5 and 20.
+GAMES = [
+    (1, "2023-01-02", 1, 110, 107),
+    (2, "2023-01-05", 0, 120, 108),
+    (3, "2023-02-10", 1, 99, 104),
+    (4, "2023-03-01", 0, 130, 110),
+]
+
+
+def player_rows():
+    rows = []
+    for i, (game_id, game_date, home, team_score, opponent_score) in enumerate(GAMES):
+        row = {"player_id": PLAYER_ID, "game_id": game_id, "game_date": game_date, "home": home}
+        row.update({field: 3 + i * 2 + j for j, field in enumerate(PLAYER_FIELDS)})
+        row["win"] = int(team_score > opponent_score)
+        rows.append(row)
+    return rows
+
+
+def team_rows():
+    return [
+        {"game_id": game_id, "home": home, "team_score": team_score, "opponent_score": opponent_score}
+        for game_id, _, home, team_score, opponent_score in GAMES
+    ]
+
+
+class TeamGames:
+    async def team_games_by_ids(self, game_ids, columns):
+        return [row for row in team_rows() if row["game_id"] in game_ids]
+
+
+@pytest.fixture(scope="module")
+def sqlite_summaries(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pushdown") / "summaries.sqlite"
+    with sqlite3.connect(path) as connection:
+        for table, rows in (("player_statistics", player_rows()), ("team_statistics", team_rows())):
+            columns = SQLITE_COLUMNS[table]
+            connection.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+            connection.executemany(
+                f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})",
+                [[row[column] for column in columns] for row in rows],
+            )
+        for statement in SQLITE_INDEXES:
+            connection.execute(statement)
+    connection.close()
+    return SqliteSummaries(str(path))
+
+
+def in_range(start_date, end_date):
+    return [
+        row for row in player_rows()
+        if (start_date is None or row["game_date"] >= start_date) and (end_date is None or row["game_date"] <= end_date)
+    ]
+
+
+def index_clutch_summary(start_date, end_date, margin):
+    rows = in_range(start_date, end_date)
+    index = ClutchIndex()
+    asyncio.run(index.ensure(TeamGames(), {row["game_id"] for row in rows}))
+    return calculate_clutch_summary(index.clutch_games(rows, margin))
+
+
+RANGES = [
+    (None, None),
+    ("2023-01-01", "2023-01-31"),
+    # Games, but none within the margin.
+    ("2023-01-04", "2023-01-06"),
+    ("2023-03-01", None),
+    # No games at all.
+    ("2024-01-01", "2024-12-31"),
+]
+
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+@pytest.mark.parametrize("margin", [0, 5])
+def test_clutch_summary_parity(sqlite_summaries, start_date, end_date, margin):
+    pushed_down = asyncio.run(sqlite_summaries.clutch_summary(PLAYER_ID, start_date, end_date, margin))
+    assert pushed_down == index_clutch_summary(start_date, end_date, margin)
+
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_player_summary_parity(sqlite_summaries, start_date, end_date):
+    pushed_down = asyncio.run(sqlite_summaries.player_summary(PLAYER_ID, start_date, end_date))
+    assert pushed_down == calculate_player_summary(in_range(start_date, end_date))
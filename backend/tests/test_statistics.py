@@ -0,0 +1,16 @@
+from app.aggregation import EMPTY_CLUTCH_SUMMARY, clutch_summaries
+from app.statistics import calculate_clutch_summary
+
+
+def clutch_row(points, made, attempted, win):
+    return {"points": points, "field_goals_made": made, "field_goals_attempted": attempted, "win": win}
+
+
+def test_clutch_summary_of_empty_range():
+    assert calculate_clutch_summary([]) == EMPTY_CLUTCH_SUMMARY
+
+
+def test_clutch_summary_matches_vectorized():
+    rows = [clutch_row(20, 8, 15, 1), clutch_row(7, 3, 11, 0), clutch_row(31, 12, 20, 1)]
+    assert calculate_clutch_summary(rows) == clutch_summaries(rows)
+    assert calculate_clutch_summary([]) == clutch_summaries([])
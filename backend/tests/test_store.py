@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from app.prefix_index import PlayerPrefixSums
+from app.store import ColumnarStore, column_array, swap_store, write_arrays
+
+DATES = ["2024-01-01", "2024-01-05", "2024-02-01", "2024-03-01"]
+
+
+@pytest.fixture
+def table(tmp_path):
+    tmp_dir = str(tmp_path / "store.tmp")
+    columns = {"player_id": [7, 7, 7, 8], "game_id": [1, 2, 3, 4], "game_date": DATES, "points": [10, 20, 30, 40]}
+    arrays = {name: column_array(name, values) for name, values in columns.items()}
+    meta = {"version": "1", "tables": {"player_statistics": write_arrays(tmp_dir, "player_statistics", arrays)}}
+    swap_store(tmp_dir, str(tmp_path / "store"), meta)
+    return ColumnarStore(str(tmp_path / "store")).table("player_statistics")
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (None, None, (0, 3)),
+    ("", "", (0, 3)),
+    ("", "2024-01-31", (0, 2)),
+    ("2024-01-02", "", (1, 3)),
+    ("2024-01-02", "2024-02-01", (1, 3)),
+])
+def test_key_range_ignores_empty_bounds(table, start, end, expected):
+    # Supabase skips the filter for a falsy bound; so must the store.
+    assert table.key_range(7, start, end) == expected
+
+
+def test_prefix_sums_ignore_empty_bounds():
+    rows = [{"game_id": i, "game_date": day, "points": 10} for i, day in enumerate(DATES)]
+    sums = PlayerPrefixSums(rows)
+    assert sums.totals("", "")[0] == sums.totals()[0] == 4
+    assert sums.totals("", "2024-01-31")[0] == 2
+    np.testing.assert_array_equal(sums.totals("2024-02-01", "")[1], sums.totals("2024-02-01")[1])
@@ -0,0 +1,49 @@
+import importlib
+
+import pytest
+
+from app import team_form
+from app.aggregation import TEAM_FIELDS
+from app.team_form import TeamForm
+
+
+def _games(n):
+    rows = []
+    for i in range(n):
+        row = {field: 10 + i for field in TEAM_FIELDS}
+        row.update(game_id=100 + i, game_date=f"2024-01-{i + 1:02d}", win=i % 2)
+        rows.append(row)
+    return rows
+
+
+def test_string_rows_match_typed_rows():
+    # Rows stored before the typed loader hold numeric strings.
+    typed = _games(12)
+    strings = [{key: str(value) for key, value in row.items()} for row in typed]
+    form = TeamForm(strings, (5, 10))
+    assert form.records == TeamForm(typed, (5, 10)).records
+    # A refresh returning the same games as typed rows adds nothing.
+    form.append(typed[-3:])
+    assert [game_id for game_id, _, _ in form.games] == [row["game_id"] for row in typed[-10:]]
+
+
+def test_windows_always_cover_the_endpoint(monkeypatch):
+    monkeypatch.setenv("TEAM_FORM_WINDOWS", "3,5")
+    module = importlib.reload(team_form)
+    try:
+        assert module.TEAM_FORM_WINDOWS == (3, 5, module.TEAM_FORM_GAMES)
+        form = module.TeamForm(_games(12))
+        assert form.record(module.TEAM_FORM_GAMES)["games"] == module.TEAM_FORM_GAMES
+    finally:
+        monkeypatch.delenv("TEAM_FORM_WINDOWS")
+        importlib.reload(team_form)
+
+
+def test_windows_must_be_positive(monkeypatch):
+    monkeypatch.setenv("TEAM_FORM_WINDOWS", "0,5")
+    try:
+        with pytest.raises(RuntimeError):
+            importlib.reload(team_form)
+    finally:
+        monkeypatch.delenv("TEAM_FORM_WINDOWS")
+        importlib.reload(team_form)